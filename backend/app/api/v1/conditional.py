@@ -0,0 +1,27 @@
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db
+from app.services.version_service import VersionService
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # Comparação fraca (RFC 9110): ignora o prefixo W/
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in tags]
+
+def etag_for(*collections: str):
+    """
+    Dependência de GET condicional: o ETag é derivado só dos contadores de versão das
+    coleções que compõem a resposta (incrementados pelas escritas dos serviços). Se o
+    cliente já tem essa versão (If-None-Match), responde 304 sem executar a consulta.
+    """
+    async def check(request: Request, response: Response, db: AsyncSession = Depends(get_db)) -> str:
+        versions = await VersionService.current(db, collections)
+        etag = 'W/"' + "-".join(f"{name}.{version}" for name, version in versions.items()) + '"'
+        # no-cache: o cliente pode guardar a resposta, mas revalida antes de reutilizá-la
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return etag
+    return check
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from app.core.config import settings
 from app.db.session import get_db
 from app.services.audit_service import AuditService
+from app.services.pagination import split_page
 from pydantic import BaseModel
 import datetime
 from uuid import UUID
@@ -23,5 +25,25 @@ class AuditLogSchema(BaseModel):
 router = APIRouter()
 
 @router.get("/", response_model=List[AuditLogSchema])
-async def list_audit_logs(db: AsyncSession = Depends(get_db)):
-    return await AuditService.get_all(db)
+async def list_audit_logs(
+    response: Response,
+    user: Optional[str] = None,
+    action: Optional[str] = None,
+    impact: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.LIST_DEFAULT_LIMIT, ge=1, le=settings.LIST_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        logs = await AuditService.get_all(
+            db, user=user, action=action, impact=impact,
+            since=since, until=until, cursor=cursor, limit=limit + 1,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logs, cursor = split_page(logs, AuditService.ORDER, limit)
+    # Vazio na última página
+    response.headers["X-Next-Cursor"] = cursor or ""
+    return logs
@@ -1,22 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from uuid import UUID
+from app.api.v1.conditional import etag_for
+from app.core.config import settings
 from app.db.session import get_db
+from app.schemas.batch_schemas import BatchRequest, BatchResultSchema
 from app.schemas.schemas import SchoolClassInDB, SchoolClassCreate, SchoolClassUpdate
 from app.services.academic_service import SchoolClassService
+from app.services.pagination import split_page
 
 router = APIRouter()
 
-@router.get("/", response_model=List[SchoolClassInDB])
-async def list_classes(db: AsyncSession = Depends(get_db)):
-    return await SchoolClassService.get_all(db)
+# A turma traz a disciplina aninhada
+CLASSES = etag_for("school_classes", "subjects")
+
+@router.get("/", response_model=List[SchoolClassInDB], dependencies=[Depends(CLASSES)])
+async def list_classes(
+    response: Response,
+    course_id: Optional[UUID] = None,
+    subject_id: Optional[UUID] = None,
+    semester: Optional[int] = None,
+    shift: Optional[str] = None,
+    campus: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.LIST_DEFAULT_LIMIT, ge=1, le=settings.LIST_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        classes = await SchoolClassService.get_all(
+            db, course_id=course_id, subject_id=subject_id, semester=semester,
+            shift=shift, campus=campus, cursor=cursor, limit=limit + 1,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    classes, cursor = split_page(classes, SchoolClassService.ORDER, limit)
+    # Vazio na última página
+    response.headers["X-Next-Cursor"] = cursor or ""
+    return classes
 
 @router.post("/", response_model=SchoolClassInDB, status_code=status.HTTP_201_CREATED)
 async def create_class(class_in: SchoolClassCreate, db: AsyncSession = Depends(get_db)):
     return await SchoolClassService.create(db, class_in)
 
-@router.get("/{class_id}", response_model=SchoolClassInDB)
+@router.post("/batch", response_model=BatchResultSchema)
+async def batch_classes(request: BatchRequest, db: AsyncSession = Depends(get_db)):
+    # Lote em uma transação; itens inválidos voltam com seus erros
+    try:
+        return await SchoolClassService.batch(db, request)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/{class_id}", response_model=SchoolClassInDB, dependencies=[Depends(CLASSES)])
 async def get_class(class_id: UUID, db: AsyncSession = Depends(get_db)):
     db_class = await SchoolClassService.get_by_id(db, class_id)
     if not db_class:
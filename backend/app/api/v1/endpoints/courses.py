@@ -2,21 +2,24 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
+from app.api.v1.conditional import etag_for
 from app.db.session import get_db
 from app.schemas.schemas import CourseInDB, CourseCreate, CourseUpdate
 from app.services.academic_service import CourseService
 
 router = APIRouter()
 
+COURSES = etag_for("courses")
+
 @router.get("/", response_model=List[CourseInDB])
-async def list_courses(db: AsyncSession = Depends(get_db)):
-    return await CourseService.get_all(db)
+async def list_courses(db: AsyncSession = Depends(get_db), etag: str = Depends(COURSES)):
+    return await CourseService.get_all_cached(db, version=etag)
 
 @router.post("/", response_model=CourseInDB, status_code=status.HTTP_201_CREATED)
 async def create_course(course_in: CourseCreate, db: AsyncSession = Depends(get_db)):
     return await CourseService.create(db, course_in)
 
-@router.get("/{course_id}", response_model=CourseInDB)
+@router.get("/{course_id}", response_model=CourseInDB, dependencies=[Depends(COURSES)])
 async def get_course(course_id: UUID, db: AsyncSession = Depends(get_db)):
     course = await CourseService.get_by_id(db, course_id)
     if not course:
@@ -1,22 +1,74 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from app.core.cache import cache
+from app.db.session import get_db, get_session_factory
+from app.schemas.schedule_schemas import ScheduleCandidate
 from app.services.dashboard_service import DashboardService
 
 router = APIRouter()
 
 @router.get("/stats")
 async def get_dashboard_stats(db: AsyncSession = Depends(get_db)):
-    return await DashboardService.get_stats(db)
+    return await cache.get_or_load("dashboard", "stats", lambda: DashboardService.get_stats(db))
+
+@router.get("/summary")
+async def get_dashboard_summary(
+    response: Response,
+    conflict_limit: int = Query(20, ge=1, le=1000),
+    session_factory=Depends(get_session_factory)
+):
+    # Painéis consultados em paralelo, cada um em sua sessão
+    summary = await DashboardService.get_summary(session_factory, conflict_limit)
+    response.headers["Server-Timing"] = ", ".join(
+        f"{name};dur={elapsed}" for name, elapsed in summary["timings_ms"].items()
+    )
+    return summary
 
 @router.get("/occupancy")
 async def get_occupancy(db: AsyncSession = Depends(get_db)):
-    return await DashboardService.get_occupancy_data(db)
+    return await cache.get_or_load("dashboard", "occupancy", lambda: DashboardService.get_occupancy_data(db))
+
+@router.get("/occupancy/heatmap")
+async def get_occupancy_heatmap(
+    campus: Optional[str] = None,
+    status: Optional[Literal["pending", "approved"]] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    # Ocupação de assentos por bloco, dia e horário, em formato colunar
+    return await cache.get_or_load(
+        "dashboard", ("heatmap", campus, status),
+        lambda: DashboardService.get_occupancy_heatmap(db, campus, status),
+    )
 
 @router.get("/distribution")
 async def get_distribution(db: AsyncSession = Depends(get_db)):
-    return await DashboardService.get_room_distribution(db)
+    return await cache.get_or_load("dashboard", "distribution", lambda: DashboardService.get_room_distribution(db))
 
 @router.get("/conflicts")
-async def get_conflicts(db: AsyncSession = Depends(get_db)):
-    return await DashboardService.get_conflicts(db)
+async def get_conflicts(
+    response: Response,
+    type: Literal["capacity", "overlap"] = "capacity",
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    # Sem limit, todos os conflitos; com limit/offset, a página pedida. Os mais graves
+    # vêm primeiro e X-Total-Count traz o total para a paginação
+    async def load():
+        if type == "overlap":
+            return await DashboardService.get_overlap_conflicts(db, limit, offset)
+        return await DashboardService.count_conflicts(db), await DashboardService.get_conflicts(db, limit, offset)
+
+    total, conflicts = await cache.get_or_load("dashboard", ("conflicts", type, limit, offset), load)
+    response.headers["X-Total-Count"] = str(total)
+    return conflicts
+
+@router.post("/conflicts/check")
+async def check_schedule_conflict(candidate: ScheduleCandidate, db: AsyncSession = Depends(get_db)):
+    # Verificação incremental de uma alocação: só as alocações da mesma sala são lidas
+    try:
+        conflict = await DashboardService.check_schedule(db, **candidate.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"has_conflict": conflict is not None, "conflict": conflict}
@@ -1,22 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from uuid import UUID
+from app.api.v1.conditional import etag_for
+from app.core.config import settings
 from app.db.session import get_db
+from app.models.models import RoomType
+from app.schemas.batch_schemas import BatchRequest, BatchResultSchema
 from app.schemas.schemas import RoomInDB, RoomCreate, RoomUpdate
+from app.services.pagination import split_page
 from app.services.room_service import RoomService
 
 router = APIRouter()
 
+ROOMS = etag_for("rooms")
+
 @router.get("/", response_model=List[RoomInDB])
-async def list_rooms(db: AsyncSession = Depends(get_db)):
-    return await RoomService.get_all(db)
+async def list_rooms(
+    response: Response,
+    campus: Optional[str] = None,
+    building: Optional[str] = None,
+    block: Optional[str] = None,
+    type: Optional[RoomType] = None,
+    is_active: Optional[bool] = None,
+    min_capacity: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.LIST_DEFAULT_LIMIT, ge=1, le=settings.LIST_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    etag: str = Depends(ROOMS),
+):
+    # Uma página por vez; o cursor da seguinte vai em X-Next-Cursor
+    try:
+        rooms = await RoomService.get_all_cached(
+            db, version=etag, campus=campus, building=building, block=block, type=type,
+            is_active=is_active, min_capacity=min_capacity, cursor=cursor, limit=limit + 1,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    rooms, cursor = split_page(rooms, RoomService.ORDER, limit)
+    # Vazio na última página
+    response.headers["X-Next-Cursor"] = cursor or ""
+    return rooms
 
 @router.post("/", response_model=RoomInDB, status_code=status.HTTP_201_CREATED)
 async def create_room(room_in: RoomCreate, db: AsyncSession = Depends(get_db)):
     return await RoomService.create(db, room_in)
 
-@router.get("/{room_id}", response_model=RoomInDB)
+@router.post("/batch", response_model=BatchResultSchema)
+async def batch_rooms(request: BatchRequest, db: AsyncSession = Depends(get_db)):
+    # Lote em uma transação; itens inválidos voltam com seus erros
+    try:
+        return await RoomService.batch(db, request)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/{room_id}", response_model=RoomInDB, dependencies=[Depends(ROOMS)])
 async def get_room(room_id: UUID, db: AsyncSession = Depends(get_db)):
     room = await RoomService.get_by_id(db, room_id)
     if not room:
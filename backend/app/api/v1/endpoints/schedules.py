@@ -1,20 +1,154 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal, Optional
+from dataclasses import asdict
 from uuid import UUID
-from app.db.session import get_db
-from app.schemas.schedule_schemas import ScheduleInDB, ScheduleCreate, ScheduleUpdate
+from app.api.v1.conditional import etag_for
+from app.core.config import settings
+from app.db.session import get_db, get_session_factory
+from app.schemas.schedule_schemas import (
+    ScheduleInDB, ScheduleCreate, ScheduleRunSchema, ScheduleUpdate,
+    SchedulingJobSchema, SimulationRequest, SimulationResultSchema
+)
 from app.services.schedule_service import ScheduleService
+from app.services.job_service import JobService
+from app.services.simulation_service import SimulationService
+from app.services.pagination import split_page
+from app.services.export_service import ExportService
+from app.core.executor import get_executor
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ScheduleInDB])
-async def list_schedules(db: AsyncSession = Depends(get_db)):
-    return await ScheduleService.get_all(db)
+# A alocação traz a sala e a turma (com a disciplina) aninhadas
+SCHEDULES = etag_for("schedules", "rooms", "school_classes", "subjects")
 
-@router.post("/auto-generate", response_model=List[ScheduleInDB])
-async def auto_generate_schedules(db: AsyncSession = Depends(get_db)):
-    return await ScheduleService.run_auto_scheduling(db)
+@router.get("/", response_model=List[ScheduleInDB], dependencies=[Depends(SCHEDULES)])
+async def list_schedules(
+    response: Response,
+    status: Optional[str] = None,
+    room_id: Optional[UUID] = None,
+    school_class_id: Optional[UUID] = None,
+    campus: Optional[str] = None,
+    day: Optional[int] = Query(None, ge=0, le=7),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.LIST_DEFAULT_LIMIT, ge=1, le=settings.LIST_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        schedules = await ScheduleService.get_all(
+            db, status=status, room_id=room_id, school_class_id=school_class_id,
+            campus=campus, day=day, cursor=cursor, limit=limit + 1,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    schedules, cursor = split_page(schedules, ScheduleService.ORDER, limit)
+    # Vazio na última página
+    response.headers["X-Next-Cursor"] = cursor or ""
+    return schedules
+
+@router.get("/export")
+async def export_schedules(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status: Optional[str] = None,
+    room_id: Optional[UUID] = None,
+    school_class_id: Optional[UUID] = None,
+    campus: Optional[str] = None,
+    day: Optional[int] = Query(None, ge=0, le=7),
+    session_factory=Depends(get_session_factory),
+    etag: str = Depends(SCHEDULES),
+):
+    # Ensalamento completo em fluxo, lido do banco por cursor e sem montar a lista em memória
+    batches = ExportService.schedule_rows(
+        session_factory, settings.EXPORT_BATCH_SIZE, status=status, room_id=room_id,
+        school_class_id=school_class_id, campus=campus, day=day,
+    )
+    # Respostas devolvidas diretamente não recebem os cabeçalhos das dependências
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if format == "csv":
+        return StreamingResponse(
+            ExportService.csv(batches), media_type="text/csv; charset=utf-8",
+            headers={**headers, "Content-Disposition": 'attachment; filename="ensalamento.csv"'},
+        )
+    return StreamingResponse(
+        ExportService.ndjson(batches), media_type="application/x-ndjson",
+        headers={**headers, "Content-Disposition": 'attachment; filename="ensalamento.ndjson"'},
+    )
+
+@router.post("/auto-generate", response_model=SchedulingJobSchema, status_code=status.HTTP_202_ACCEPTED)
+async def auto_generate_schedules(
+    algorithm: Literal["greedy", "optimal"] = "greedy",
+    time_budget_ms: int = Query(0, ge=0, le=60000),
+    mode: Literal["full", "incremental"] = "full",
+    partition_by: Optional[Literal["campus"]] = None,
+    portfolio: int = Query(0, ge=0, le=64),
+    seed: int = Query(0, ge=0),
+    force: bool = False,
+    session_factory=Depends(get_session_factory),
+):
+    # Enfileira o ensalamento e retorna o job imediatamente, sem prender sessão nem conexão;
+    # acompanhar por GET /schedules/jobs/{job_id} (resumo em "result" ao terminar)
+    try:
+        return JobService.submit(
+            algorithm=algorithm, mode=mode, time_budget_ms=time_budget_ms,
+            partition_by=partition_by, portfolio=portfolio, seed=seed, force=force,
+            session_factory=session_factory,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=SchedulingJobSchema)
+async def get_auto_generate_job(job_id: UUID):
+    job = JobService.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
+
+@router.get("/runs", response_model=List[ScheduleRunSchema])
+async def list_schedule_runs(limit: int = Query(20, ge=1, le=200), db: AsyncSession = Depends(get_db)):
+    # Execuções mais recentes, com tempo por fase e contadores
+    return await ScheduleService.get_runs(db, limit)
+
+@router.get("/runs/{run_id}", response_model=ScheduleRunSchema)
+async def get_schedule_run(run_id: int, db: AsyncSession = Depends(get_db)):
+    run = await ScheduleService.get_run(db, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Execução não encontrada")
+    return run
+
+@router.post("/simulate", response_model=SimulationResultSchema)
+async def simulate_schedules(request: SimulationRequest, db: AsyncSession = Depends(get_db)):
+    # What-if: alterações hipotéticas em salas e turmas, calculadas em memória; nada é gravado
+    try:
+        simulation = await SimulationService.simulate(
+            db, request.rooms, request.classes, request.algorithm, request.time_budget_ms,
+            request.seed, executor=get_executor(),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = simulation.result
+    assignments = None
+    if request.include_assignments:
+        assignments = [
+            {
+                "school_class_id": a.school_class_id,
+                "room_id": a.room_id,
+                "days_of_week": list(a.pattern.days_of_week),
+                "start_time": a.pattern.start_time,
+                "end_time": a.pattern.end_time,
+            }
+            for a in result.assignments
+        ]
+    return SimulationResultSchema(
+        algorithm=result.algorithm,
+        metrics=asdict(result.metrics),
+        reference=asdict(simulation.reference.metrics),
+        moved=simulation.moved,
+        infeasible=[asdict(group) for group in result.infeasible],
+        snapshot_cached=simulation.snapshot_cached,
+        assignments=assignments,
+        report=simulation.report.as_dict(),
+    )
 
 @router.post("/{schedule_id}/validate", response_model=ScheduleInDB)
 async def validate_schedule(
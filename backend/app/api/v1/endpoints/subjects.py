@@ -1,22 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from uuid import UUID
+from app.api.v1.conditional import etag_for
+from app.core.config import settings
 from app.db.session import get_db
+from app.models.models import RoomType
+from app.schemas.batch_schemas import BatchRequest, BatchResultSchema
 from app.schemas.schemas import SubjectInDB, SubjectCreate, SubjectUpdate
+from app.services.pagination import split_page
 from app.services.academic_service import SubjectService
 
 router = APIRouter()
 
+# A disciplina lista os ids dos cursos
+SUBJECTS = etag_for("subjects", "courses")
+
 @router.get("/", response_model=List[SubjectInDB])
-async def list_subjects(db: AsyncSession = Depends(get_db)):
-    return await SubjectService.get_all(db)
+async def list_subjects(
+    response: Response,
+    course_id: Optional[UUID] = None,
+    required_room_type: Optional[RoomType] = None,
+    offered_month: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.LIST_DEFAULT_LIMIT, ge=1, le=settings.LIST_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    etag: str = Depends(SUBJECTS),
+):
+    try:
+        subjects = await SubjectService.get_all_cached(
+            db, version=etag, course_id=course_id, required_room_type=required_room_type,
+            offered_month=offered_month, cursor=cursor, limit=limit + 1,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    subjects, cursor = split_page(subjects, SubjectService.ORDER, limit)
+    # Vazio na última página
+    response.headers["X-Next-Cursor"] = cursor or ""
+    return subjects
 
 @router.post("/", response_model=SubjectInDB, status_code=status.HTTP_201_CREATED)
 async def create_subject(subject_in: SubjectCreate, db: AsyncSession = Depends(get_db)):
     return await SubjectService.create(db, subject_in)
 
-@router.get("/{subject_id}", response_model=SubjectInDB)
+@router.post("/batch", response_model=BatchResultSchema)
+async def batch_subjects(request: BatchRequest, db: AsyncSession = Depends(get_db)):
+    # Lote em uma transação; itens inválidos voltam com seus erros
+    try:
+        return await SubjectService.batch(db, request)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/{subject_id}", response_model=SubjectInDB, dependencies=[Depends(SUBJECTS)])
 async def get_subject(subject_id: UUID, db: AsyncSession = Depends(get_db)):
     db_subject = await SubjectService.get_by_id(db, subject_id)
     if not db_subject:
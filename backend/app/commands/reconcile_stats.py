@@ -0,0 +1,39 @@
+"""
+Reconciliação dos contadores do dashboard (StatsService).
+
+Recalcula todos os contadores a partir das tabelas, lista as divergências em relação
+aos valores gravados e regrava os contadores. Útil após cargas feitas direto no banco
+ou para verificar periodicamente se as escritas mantiveram os contadores corretos.
+
+Uso (na pasta backend):
+    python -m app.commands.reconcile_stats           # corrige e lista divergências
+    python -m app.commands.reconcile_stats --check   # só verifica; código 1 se houver divergência
+"""
+import argparse
+import asyncio
+import sys
+from typing import Callable, List, Optional
+
+from app.db.session import AsyncSessionLocal
+from app.services.stats_service import StatsService
+
+
+async def main(argv: Optional[List[str]] = None, session_factory: Callable = AsyncSessionLocal) -> int:
+    parser = argparse.ArgumentParser(description="Reconcilia os contadores do dashboard")
+    parser.add_argument("--check", action="store_true", help="não corrige; sai com código 1 se houver divergência")
+    args = parser.parse_args(argv)
+
+    async with session_factory() as db:
+        drift = await StatsService.reconcile(db, fix=not args.check)
+
+    for name, (stored, actual) in drift.items():
+        print(f"{name}: gravado={stored} real={actual}")
+    if not drift:
+        print("Contadores consistentes")
+    elif not args.check:
+        print(f"{len(drift)} contador(es) corrigido(s)")
+    return 1 if drift and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
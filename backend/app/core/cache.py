@@ -0,0 +1,141 @@
+"""
+Cache em processo para leituras frequentes (listas de referência e painéis do dashboard).
+
+As entradas ficam em um backend plugável (CacheBackend); o padrão é um LRU em memória
+com TTL. A invalidação é feita por namespace: cada namespace tem um contador de geração
+que faz parte da chave, e as escritas dos serviços incrementam esse contador após o
+commit. Entradas de gerações antigas nunca mais são lidas e saem por TTL ou LRU; uma
+leitura que começou antes de uma escrita grava na geração antiga, sem reviver dados velhos.
+
+Um backend compartilhado (fora do processo) só precisa implementar CacheBackend,
+mantendo os contadores de geração fora do LRU.
+"""
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+MISSING = object()
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        """Valor armazenado, ou MISSING se ausente ou expirado."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl_s: float) -> None:
+        ...
+
+    @abstractmethod
+    async def counter(self, name: str) -> int:
+        """Contador de geração (0 se nunca incrementado); não é removido por LRU nem TTL."""
+
+    @abstractmethod
+    async def incr(self, name: str) -> int:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def info(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU em memória com TTL por entrada; também serve de substituto em testes."""
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self.evictions = 0
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl_s: float) -> None:
+        self._entries[key] = (self.clock() + ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    async def incr(self, name: str) -> int:
+        self._counters[name] = self._counters.get(name, 0) + 1
+        return self._counters[name]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._counters.clear()
+
+    def info(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "evictions": self.evictions}
+
+
+class Cache:
+    def __init__(self, backend: CacheBackend, ttl_s: float = 30):
+        self.backend = backend
+        self.ttl_s = ttl_s
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "invalidations": 0})
+
+    async def _key(self, namespace: str, key: Hashable) -> str:
+        generation = await self.backend.counter(f"generation:{namespace}")
+        return f"{namespace}:{generation}:{key!r}"
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_s: Optional[float] = None,
+    ) -> Any:
+        """
+        Valor em cache ou, na falta, o resultado de loader(), que é armazenado. O valor
+        é compartilhado entre chamadas: quem o recebe não deve alterá-lo.
+        """
+        cache_key = await self._key(namespace, key)
+        value = await self.backend.get(cache_key)
+        if value is not MISSING:
+            self._stats[namespace]["hits"] += 1
+            return value
+        self._stats[namespace]["misses"] += 1
+        value = await loader()
+        await self.backend.set(cache_key, value, self.ttl_s if ttl_s is None else ttl_s)
+        return value
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Descarta as entradas dos namespaces (chamar após o commit da escrita)."""
+        for namespace in namespaces:
+            await self.backend.incr(f"generation:{namespace}")
+            self._stats[namespace]["invalidations"] += 1
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+        self._stats.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_s": self.ttl_s,
+            **self.backend.info(),
+            "namespaces": {namespace: dict(counts) for namespace, counts in sorted(self._stats.items())},
+        }
+
+
+cache = Cache(MemoryCacheBackend(settings.CACHE_MAX_ENTRIES), settings.CACHE_TTL_S)
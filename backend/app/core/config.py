@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Ensalament API"
@@ -15,6 +15,34 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    # Ensalamento: padrões de encontro semanais considerados pelo alocador.
+    # Ex.: [{"days_of_week": [1, 2, 3], "start_time": "19:00", "end_time": "22:00"},
+    #       {"days_of_week": [4, 5, 6], "start_time": "19:00", "end_time": "22:00"}]
+    SCHEDULE_MEETING_PATTERNS: List[Dict[str, Any]] = [
+        {"days_of_week": [1, 2, 3], "start_time": "19:00", "end_time": "22:00"},
+    ]
+
+    # Jobs de ensalamento em segundo plano: "process" (padrão) ou "thread"
+    SCHEDULER_EXECUTOR: str = "process"
+    SCHEDULER_MAX_WORKERS: int = 2
+
+    # Simulação (what-if): validade máxima do snapshot em cache, além das versões das entradas
+    SIMULATION_SNAPSHOT_TTL_S: int = 300
+
+    # Cache de leituras (listas de referência e dashboard), invalidado pelas escritas
+    CACHE_TTL_S: int = 30
+    CACHE_MAX_ENTRIES: int = 1024
+
+    # Listagens paginadas por cursor: tamanho padrão e maior "limit" aceito por página
+    LIST_DEFAULT_LIMIT: int = 100
+    LIST_MAX_LIMIT: int = 500
+
+    # Exportação em fluxo: linhas lidas do cursor do banco e escritas por bloco
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Lotes de criação/alteração/remoção: máximo de itens por operação
+    BATCH_MAX_ITEMS: int = 5000
+
     # Security
     SECRET_KEY: str = "supersecretkey"
     ALGORITHM: str = "HS256"
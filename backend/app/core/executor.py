@@ -0,0 +1,28 @@
+"""
+Pool de execução para o trabalho de CPU do ensalamento (fora do event loop).
+
+SCHEDULER_EXECUTOR escolhe entre processos (padrão, paralelismo real) e threads.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+
+_executor: Optional[Executor] = None
+
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if settings.SCHEDULER_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(max_workers=settings.SCHEDULER_MAX_WORKERS)
+        else:
+            _executor = ProcessPoolExecutor(max_workers=settings.SCHEDULER_MAX_WORKERS)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
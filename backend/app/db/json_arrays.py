@@ -0,0 +1,13 @@
+from sqlalchemy import Integer, cast, func
+
+
+def int_elements(column, dialect: str):
+    """
+    Expande uma coluna JSON com um array de inteiros (ex.: Schedule.days_of_week) em uma
+    linha por elemento, no banco. Devolve a função tabular e o elemento convertido em Integer.
+    """
+    if dialect == "postgresql":
+        elements = func.json_array_elements_text(column).table_valued("value")
+    else:
+        elements = func.json_each(column).table_valued("value")
+    return elements, cast(elements.c.value, Integer)
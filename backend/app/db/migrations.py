@@ -0,0 +1,86 @@
+"""
+Colunas novas (e restrições relaxadas) em tabelas já existentes.
+
+Base.metadata.create_all só cria as tabelas que faltam: uma coluna acrescentada a um
+modelo não chega aos bancos já implantados. Cada coluna assim é registrada em COLUMNS e
+adicionada na inicialização, depois do create_all, apenas onde ainda não existe; colunas
+que passaram a aceitar NULL ficam em NULLABLE. Rodar de novo não altera nada.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+@dataclass(frozen=True)
+class AddColumn:
+    table: str
+    column: str
+    ddl: str  # tipo e restrições da coluna, como no ALTER TABLE
+    index: Optional[str] = None  # nome do índice a criar sobre a coluna
+
+
+@dataclass(frozen=True)
+class DropNotNull:
+    table: str
+    column: str
+
+
+# Em ordem de criação; nunca remover entradas: bancos antigos ainda podem precisar delas
+COLUMNS: List[AddColumn] = [
+    AddColumn("school_classes", "campus", "VARCHAR(100)"),
+    AddColumn("schedule_runs", "report", "JSON"),
+    # create_all roda antes: schedule_runs já existe quando a referência é criada
+    AddColumn("schedules", "run_id", "INTEGER REFERENCES schedule_runs (id)", index="ix_schedules_run_id"),
+    # Execuções gravadas antes do staging já tinham sido publicadas
+    AddColumn("schedule_runs", "status", "VARCHAR(20) NOT NULL DEFAULT 'published'"),
+]
+
+# Só no PostgreSQL: o SQLite não altera restrições de colunas existentes
+NULLABLE: List[DropNotNull] = [
+    # Execuções em staging ainda não têm fingerprint
+    DropNotNull("schedule_runs", "fingerprint"),
+]
+
+
+def _pending(connection) -> Tuple[List[AddColumn], List[DropNotNull]]:
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    columns: Dict[str, Dict[str, dict]] = {}
+
+    def existing(table: str) -> Dict[str, dict]:
+        if table not in columns:
+            columns[table] = {column["name"]: column for column in inspector.get_columns(table)}
+        return columns[table]
+
+    # Tabela ausente é criada completa pelo create_all
+    missing = [
+        change for change in COLUMNS
+        if change.table in tables and change.column not in existing(change.table)
+    ]
+    not_null = [
+        change for change in NULLABLE
+        if change.table in tables
+        and not existing(change.table).get(change.column, {"nullable": True})["nullable"]
+    ]
+    return missing, not_null
+
+
+async def upgrade_schema(conn: AsyncConnection) -> List[str]:
+    """Aplica as alterações pendentes e devolve as aplicadas ("tabela.coluna")."""
+    postgresql = conn.dialect.name == "postgresql"
+    # No PostgreSQL, IF NOT EXISTS protege instâncias que sobem ao mesmo tempo
+    guard = "IF NOT EXISTS " if postgresql else ""
+    missing, not_null = await conn.run_sync(_pending)
+    applied = []
+    for change in missing:
+        await conn.execute(text(f"ALTER TABLE {change.table} ADD COLUMN {guard}{change.column} {change.ddl}"))
+        if change.index:
+            await conn.execute(text(f"CREATE INDEX IF NOT EXISTS {change.index} ON {change.table} ({change.column})"))
+        applied.append(f"{change.table}.{change.column}")
+    if postgresql:
+        for change in not_null:
+            await conn.execute(text(f"ALTER TABLE {change.table} ALTER COLUMN {change.column} DROP NOT NULL"))
+            applied.append(f"{change.table}.{change.column} (null)")
+    return applied
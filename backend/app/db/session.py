@@ -30,3 +30,7 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+# Fábrica de sessões, para rotinas que abrem várias sessões em paralelo
+def get_session_factory():
+    return AsyncSessionLocal
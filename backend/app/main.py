@@ -2,6 +2,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
 from app.db.session import engine, Base
+from app.db.migrations import upgrade_schema
+from app.core.cache import cache
+from app.core.executor import shutdown_executor
 import logging
 
 # Configure logging
@@ -21,6 +24,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cabeçalhos de paginação e medições lidos pelo frontend
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Server-Timing"],
 )
 
 # Startup event to create tables
@@ -30,8 +35,16 @@ async def on_startup():
     async with engine.begin() as conn:
         # Note: In a production environment, use Alembic migrations instead
         await conn.run_sync(Base.metadata.create_all)
+        # create_all não altera tabelas existentes: colunas novas são adicionadas aqui
+        applied = await upgrade_schema(conn)
+    if applied:
+        logger.info("Colunas adicionadas: %s", ", ".join(applied))
     logger.info("Tabelas criadas com sucesso.")
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    shutdown_executor()
+
 app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/")
@@ -41,3 +54,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/health/cache")
+async def cache_stats():
+    # Acertos, faltas e invalidações por namespace do cache de leituras
+    return cache.stats()
@@ -66,6 +66,8 @@ class SchoolClass(Base):
     shift: Mapped[str] = mapped_column(String(50))
     semester: Mapped[int] = mapped_column(Integer)
     students_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Campus onde a turma é ofertada (opcional; usado no ensalamento particionado)
+    campus: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     
     course_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("courses.id"))
     course = relationship("Course", back_populates="classes")
@@ -75,6 +77,9 @@ class SchoolClass(Base):
     
     schedules = relationship("Schedule", back_populates="school_class")
 
+# Status das propostas gravadas por uma execução ainda não publicada
+STAGED = "staged"
+
 class Schedule(Base):
     __tablename__ = "schedules"
 
@@ -82,7 +87,9 @@ class Schedule(Base):
     days_of_week: Mapped[list] = mapped_column(JSON)  # Array de dias: [1, 2, 3] = Seg, Ter, Qua
     start_time: Mapped[str] = mapped_column(String(5))
     end_time: Mapped[str] = mapped_column(String(5))
-    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, approved, rejected
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, approved, rejected, staged
+    # Execução do ensalamento que gerou a proposta; "staged" = ainda não publicada
+    run_id: Mapped[Optional[int]] = mapped_column(ForeignKey("schedule_runs.id"), nullable=True, index=True)
 
     room_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("rooms.id"))
     school_class_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("school_classes.id"))
@@ -101,3 +108,40 @@ class AuditLog(Base):
     ip: Mapped[str] = mapped_column(String(50))
     impact: Mapped[str] = mapped_column(String(20)) # Alta, Média, Baixa
     details: Mapped[dict] = mapped_column(JSON, nullable=True)
+
+class SchedulingChange(Base):
+    """Registro de alterações que afetam o ensalamento (consumido pelo modo incremental)"""
+    __tablename__ = "scheduling_changes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    entity: Mapped[str] = mapped_column(String(20))  # room, class, subject
+    entity_id: Mapped[uuid.UUID] = mapped_column()
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+class CollectionVersion(Base):
+    """Contador de versão por coleção, incrementado na mesma transação de cada escrita"""
+    __tablename__ = "collection_versions"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)  # rooms, school_classes, ...
+    version: Mapped[int] = mapped_column(Integer, default=0)
+
+class ScheduleRun(Base):
+    """Execução do ensalamento automático, com o fingerprint das entradas usadas"""
+    __tablename__ = "schedule_runs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    algorithm: Mapped[str] = mapped_column(String(20))
+    mode: Mapped[str] = mapped_column(String(20))  # full, incremental
+    status: Mapped[str] = mapped_column(String(20), default="staging")  # staging, published, failed
+    fingerprint: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
+    metrics: Mapped[dict] = mapped_column(JSON, nullable=True)
+    # Tempo por fase (ms) e contadores: {"timings_ms": {...}, "counters": {...}}
+    report: Mapped[dict] = mapped_column(JSON, nullable=True)
+
+class DashboardCounter(Base):
+    """Contadores materializados do dashboard, mantidos pelas escritas (ver StatsService)"""
+    __tablename__ = "dashboard_counters"
+
+    name: Mapped[str] = mapped_column(String(80), primary_key=True)  # rooms, conflicts, block.capacity:<bloco>, ...
+    value: Mapped[int] = mapped_column(Integer, default=0)
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from uuid import UUID
+from typing import Any, Dict, List, Literal, Optional
+from app.core.config import settings
+
+class BatchRequest(BaseModel):
+    # Itens de criação e alteração chegam crus e são validados um a um, para um item
+    # inválido virar erro no resultado em vez de rejeitar o lote inteiro
+    create: List[Dict[str, Any]] = Field(default_factory=list, max_length=settings.BATCH_MAX_ITEMS)
+    update: List[Dict[str, Any]] = Field(default_factory=list, max_length=settings.BATCH_MAX_ITEMS)  # cada item com "id"
+    delete: List[UUID] = Field(default_factory=list, max_length=settings.BATCH_MAX_ITEMS)
+    # True: qualquer item inválido cancela o lote inteiro
+    atomic: bool = False
+
+class BatchItemResult(BaseModel):
+    op: Literal["create", "update", "delete"]
+    index: int  # posição do item na lista da operação
+    id: Optional[UUID] = None
+    status: Literal["created", "updated", "deleted", "skipped", "error"]
+    errors: List[str] = []
+
+class BatchResultSchema(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+    failed: int
+    items: List[BatchItemResult]
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from uuid import UUID
-from typing import Optional, List
-from .schemas import RoomInDB, SchoolClassInDB
+from typing import Any, Literal, Optional, List, Dict
+import datetime
+from .schemas import RoomInDB, RoomType, SchoolClassInDB
 
 class ScheduleBase(BaseModel):
     days_of_week: List[int]  # Array de dias: [1, 2, 3] para Seg, Ter, Qua
@@ -21,9 +22,137 @@ class ScheduleUpdate(BaseModel):
     room_id: Optional[UUID] = None
     status: Optional[str] = None
 
+class ScheduleCandidate(BaseModel):
+    """Alocação a verificar contra as existentes da sala (schedule_id ao editar uma alocação)"""
+    days_of_week: List[int]
+    start_time: str
+    end_time: str
+    room_id: UUID
+    school_class_id: UUID
+    schedule_id: Optional[UUID] = None
+
 class ScheduleInDB(ScheduleBase):
     id: UUID
     room: Optional[RoomInDB] = None
     school_class: Optional[SchoolClassInDB] = None
     
     model_config = ConfigDict(from_attributes=True)
+
+class PlanMetricsSchema(BaseModel):
+    allocated: int
+    total_waste: int
+    overcapacity_rows: int
+    overcapacity_seats: int
+
+class RunReportSchema(BaseModel):
+    timings_ms: Dict[str, float] = {}
+    counters: Dict[str, int] = {}
+
+class InfeasibleGroupSchema(BaseModel):
+    class_ids: List[UUID]
+    students: int
+    required_room_type: Optional[str] = None
+    reason: str  # room_type (não alocado) ou capacity (alocado superlotado)
+
+class AutoScheduleSummary(BaseModel):
+    """Resumo enxuto de uma execução do ensalamento (sem reidratar as alocações)"""
+    algorithm: str
+    created: int
+    reused: int = 0
+    metrics: PlanMetricsSchema
+    # Métricas do guloso para comparação (modo optimal)
+    baseline: Optional[PlanMetricsSchema] = None
+    conflicts_removed: Optional[int] = None
+    # Modo portfólio: seed vencedora e placar de cada variante
+    seed: int = 0
+    variants: Optional[List[Dict[str, Any]]] = None
+    infeasible: List[InfeasibleGroupSchema] = []
+    # Entradas inalteradas: propostas da execução anterior mantidas sem recálculo
+    memoized: bool = False
+    # Execução registrada; detalhes em GET /schedules/runs/{run_id}
+    run_id: Optional[int] = None
+    report: Optional[RunReportSchema] = None
+
+class ScheduleRunSchema(BaseModel):
+    """Execução registrada do ensalamento, com tempo por fase e contadores"""
+    id: int
+    created_at: Optional[datetime.datetime] = None
+    algorithm: str
+    mode: str
+    status: str  # staging, published, failed
+    # Entradas e parâmetros da execução publicada; execuções seguintes com o mesmo
+    # fingerprint reaproveitam o plano (memoized) em vez de criar outra execução
+    fingerprint: Optional[str] = None
+    metrics: Optional[PlanMetricsSchema] = None
+    report: Optional[RunReportSchema] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class SchedulingJobSchema(BaseModel):
+    id: UUID
+    state: str  # queued, running, succeeded, failed
+    phase: Optional[str] = None
+    progress: float
+    algorithm: str
+    mode: str
+    partition_by: Optional[str] = None
+    portfolio: int = 0
+    seed: int = 0
+    submitted_at: datetime.datetime
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
+    timings_ms: Dict[str, float] = {}
+    metrics: Optional[PlanMetricsSchema] = None
+    infeasible: List[InfeasibleGroupSchema] = []
+    memoized: bool = False
+    run_id: Optional[int] = None
+    # Resumo da execução, quando o job termina com sucesso
+    result: Optional[AutoScheduleSummary] = None
+    error: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class RoomOverride(BaseModel):
+    """Alteração hipotética de uma sala; campos omitidos ou nulos ficam como estão"""
+    id: UUID
+    capacity: Optional[int] = Field(None, ge=0)
+    type: Optional[RoomType] = None
+    campus: Optional[str] = None
+    # False simula o fechamento da sala; True, a reabertura de uma sala inativa
+    is_active: Optional[bool] = None
+
+class ClassOverride(BaseModel):
+    """Alteração hipotética de uma turma ainda não aprovada; campos omitidos ou nulos ficam como estão"""
+    id: UUID
+    students_count: Optional[int] = Field(None, ge=0)
+    required_room_type: Optional[RoomType] = None
+    campus: Optional[str] = None
+    # True retira a turma da simulação
+    removed: bool = False
+
+class SimulationRequest(BaseModel):
+    rooms: List[RoomOverride] = []
+    classes: List[ClassOverride] = []
+    algorithm: Literal["greedy", "optimal"] = "greedy"
+    time_budget_ms: int = Field(0, ge=0, le=60000)
+    seed: int = Field(0, ge=0)
+    # False devolve só as métricas, sem a lista de alocações
+    include_assignments: bool = True
+
+class SimulatedAssignment(BaseModel):
+    school_class_id: UUID
+    room_id: UUID
+    days_of_week: List[int]
+    start_time: str
+    end_time: str
+
+class SimulationResultSchema(BaseModel):
+    """Plano simulado (nada é gravado) e comparação com o plano sem alterações"""
+    algorithm: str
+    metrics: PlanMetricsSchema
+    reference: PlanMetricsSchema
+    moved: int
+    infeasible: List[InfeasibleGroupSchema] = []
+    snapshot_cached: bool
+    assignments: Optional[List[SimulatedAssignment]] = None
+    report: RunReportSchema
@@ -81,6 +81,7 @@ class SchoolClassBase(BaseModel):
     shift: str
     semester: int
     students_count: int = 0
+    campus: Optional[str] = None
     course_id: UUID
     subject_id: Optional[UUID] = None
 
@@ -92,6 +93,7 @@ class SchoolClassUpdate(BaseModel):
     shift: Optional[str] = None
     semester: Optional[int] = None
     students_count: Optional[int] = None
+    campus: Optional[str] = None
     course_id: Optional[UUID] = None
     subject_id: Optional[UUID] = None
 
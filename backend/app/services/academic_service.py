@@ -1,8 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.models.models import Course, SchoolClass, Subject
-from app.schemas.schemas import CourseCreate, CourseUpdate, SchoolClassCreate, SchoolClassUpdate, SubjectCreate, SubjectUpdate
-from typing import List, Optional
+from sqlalchemy import delete, insert, update
+from app.core.cache import cache
+from app.models.models import Course, RoomType, Schedule, SchoolClass, Subject, subject_courses
+from app.schemas.batch_schemas import BatchRequest
+from app.schemas.schemas import CourseCreate, CourseInDB, CourseUpdate, SubjectInDB, SchoolClassCreate, SchoolClassUpdate, SubjectCreate, SubjectUpdate
+from app.services.batch import Batch
+from app.services.change_log_service import ChangeLogService
+from app.services.pagination import paginate
+from app.services.stats_service import StatsService
+from app.services.version_service import VersionService
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 class CourseService:
@@ -11,6 +19,13 @@ class CourseService:
         result = await db.execute(select(Course))
         return result.scalars().all()
 
+    @staticmethod
+    async def get_all_cached(db: AsyncSession, version: Optional[str] = None) -> List[CourseInDB]:
+        """Lista de cursos servida do cache (por versão, ver RoomService); invalidada pelas escritas de cursos."""
+        async def load():
+            return [CourseInDB.model_validate(course) for course in await CourseService.get_all(db)]
+        return await cache.get_or_load("courses", ("all", version), load)
+
     @staticmethod
     async def get_by_id(db: AsyncSession, course_id: UUID) -> Optional[Course]:
         result = await db.execute(select(Course).filter(Course.id == course_id))
@@ -20,7 +35,9 @@ class CourseService:
     async def create(db: AsyncSession, course_in: CourseCreate) -> Course:
         db_course = Course(**course_in.model_dump())
         db.add(db_course)
+        await VersionService.bump(db, "courses")
         await db.commit()
+        await cache.invalidate("courses", "subjects")
         await db.refresh(db_course)
         return db_course
 
@@ -34,7 +51,9 @@ class CourseService:
         for field, value in update_data.items():
             setattr(db_course, field, value)
             
+        await VersionService.bump(db, "courses")
         await db.commit()
+        await cache.invalidate("courses", "subjects")
         await db.refresh(db_course)
         return db_course
 
@@ -45,14 +64,39 @@ class CourseService:
             return False
         
         await db.delete(db_course)
+        await VersionService.bump(db, "courses")
         await db.commit()
+        await cache.invalidate("courses", "subjects")
         return True
 
 class SchoolClassService:
+    ORDER = (SchoolClass.name, SchoolClass.id)
+
     @staticmethod
-    async def get_all(db: AsyncSession) -> List[SchoolClass]:
+    async def get_all(
+        db: AsyncSession,
+        course_id: Optional[UUID] = None,
+        subject_id: Optional[UUID] = None,
+        semester: Optional[int] = None,
+        shift: Optional[str] = None,
+        campus: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SchoolClass]:
+        """Turmas filtradas no banco, paginadas por cursor (sem limit, todas as restantes)."""
         from sqlalchemy.orm import selectinload
-        result = await db.execute(select(SchoolClass).options(selectinload(SchoolClass.subject)))
+        query = select(SchoolClass).options(selectinload(SchoolClass.subject))
+        if course_id is not None:
+            query = query.filter(SchoolClass.course_id == course_id)
+        if subject_id is not None:
+            query = query.filter(SchoolClass.subject_id == subject_id)
+        if semester is not None:
+            query = query.filter(SchoolClass.semester == semester)
+        if shift is not None:
+            query = query.filter(SchoolClass.shift == shift)
+        if campus is not None:
+            query = query.filter(SchoolClass.campus == campus)
+        result = await db.execute(paginate(query, SchoolClassService.ORDER, cursor, limit))
         return result.scalars().all()
 
     @staticmethod
@@ -69,7 +113,11 @@ class SchoolClassService:
     async def create(db: AsyncSession, class_in: SchoolClassCreate) -> SchoolClass:
         db_class = SchoolClass(**class_in.model_dump())
         db.add(db_class)
+        await db.flush()
+        await StatsService.add(db, classes=SchoolClass.id == db_class.id)
+        await VersionService.bump(db, "school_classes")
         await db.commit()
+        await cache.invalidate("dashboard")
         await db.refresh(db_class)
         # Refetch to load relationships
         return await SchoolClassService.get_by_id(db, db_class.id)
@@ -81,10 +129,15 @@ class SchoolClassService:
             return None
         
         update_data = class_in.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_class, field, value)
+        # O número de alunos muda os conflitos de capacidade das alocações da turma
+        async with StatsService.track(db, schedules=Schedule.school_class_id == class_id):
+            for field, value in update_data.items():
+                setattr(db_class, field, value)
+        ChangeLogService.record(db, "class", db_class.id)
             
+        await VersionService.bump(db, "school_classes")
         await db.commit()
+        await cache.invalidate("dashboard")
         await db.refresh(db_class)
         # Refetch to load relationships
         return await SchoolClassService.get_by_id(db, db_class.id)
@@ -95,15 +148,70 @@ class SchoolClassService:
         if not db_class:
             return False
         
-        await db.delete(db_class)
+        async with StatsService.track(
+            db, classes=SchoolClass.id == class_id, schedules=Schedule.school_class_id == class_id
+        ):
+            await db.delete(db_class)
+        ChangeLogService.record(db, "class", class_id)
+        await VersionService.bump(db, "school_classes")
         await db.commit()
+        await cache.invalidate("dashboard")
         return True
 
+    @staticmethod
+    async def batch(db: AsyncSession, request: BatchRequest) -> Dict[str, Any]:
+        """Cria, altera e remove turmas em lote, em uma única transação (ver app.services.batch)."""
+        batch = Batch(request, SchoolClassCreate, SchoolClassUpdate)
+        await batch.check_exists(db, SchoolClass, "Turma não encontrada")
+        await batch.check_unused(db, Schedule.school_class_id, "Turma possui alocações")
+        await batch.check_references(db, "course_id", Course, "Curso não encontrado: {ids}")
+        await batch.check_references(db, "subject_id", Subject, "Disciplina não encontrada: {ids}")
+        if not batch.writable():
+            return batch.results()
+
+        async with batch.write(db) as (creates, updates, deletes):
+            if deletes:
+                ids = [item.id for item in deletes]
+                async with StatsService.track(db, classes=SchoolClass.id.in_(ids)):
+                    await db.execute(delete(SchoolClass).filter(SchoolClass.id.in_(ids)))
+                ChangeLogService.record(db, "class", *ids)
+            if updates:
+                ids = [item.id for item in updates]
+                rows = [item.values() for item in updates if item.data.model_fields_set]
+                # O número de alunos muda os conflitos de capacidade das alocações das turmas
+                async with StatsService.track(db, schedules=Schedule.school_class_id.in_(ids)):
+                    if rows:
+                        await db.execute(update(SchoolClass), rows)
+                ChangeLogService.record(db, "class", *ids)
+            if creates:
+                await db.execute(insert(SchoolClass), [item.values() for item in creates])
+                await StatsService.add(db, classes=SchoolClass.id.in_([item.id for item in creates]))
+            await VersionService.bump(db, "school_classes")
+        await cache.invalidate("dashboard")
+        return batch.results()
+
 class SubjectService:
+    ORDER = (Subject.code, Subject.id)
+
     @staticmethod
-    async def get_all(db: AsyncSession) -> List[dict]:
+    async def get_all(
+        db: AsyncSession,
+        course_id: Optional[UUID] = None,
+        required_room_type: Optional[RoomType] = None,
+        offered_month: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Disciplinas filtradas no banco, paginadas por cursor (sem limit, todas as restantes)."""
         from sqlalchemy.orm import selectinload
-        result = await db.execute(select(Subject).options(selectinload(Subject.courses)))
+        query = select(Subject).options(selectinload(Subject.courses))
+        if course_id is not None:
+            query = query.filter(Subject.courses.any(Course.id == course_id))
+        if required_room_type is not None:
+            query = query.filter(Subject.required_room_type == required_room_type)
+        if offered_month is not None:
+            query = query.filter(Subject.offered_month == offered_month)
+        result = await db.execute(paginate(query, SubjectService.ORDER, cursor, limit))
         subjects = result.scalars().all()
         # Transformar para o formato que o schema espera
         return [
@@ -119,6 +227,16 @@ class SubjectService:
             for s in subjects
         ]
 
+    @staticmethod
+    async def get_all_cached(db: AsyncSession, version: Optional[str] = None, **filters: Any) -> List[SubjectInDB]:
+        """
+        Lista (ou página) de disciplinas servida do cache (por versão, ver RoomService);
+        invalidada pelas escritas de disciplinas e cursos.
+        """
+        async def load():
+            return [SubjectInDB.model_validate(subject) for subject in await SubjectService.get_all(db, **filters)]
+        return await cache.get_or_load("subjects", (version, tuple(sorted(filters.items()))), load)
+
     @staticmethod
     async def get_by_id(db: AsyncSession, subject_id: UUID) -> Optional[dict]:
         from sqlalchemy.orm import selectinload
@@ -152,7 +270,9 @@ class SubjectService:
             db_subject.courses = result.scalars().all()
             
         db.add(db_subject)
+        await VersionService.bump(db, "subjects")
         await db.commit()
+        await cache.invalidate("subjects")
         await db.refresh(db_subject)
         return await SubjectService.get_by_id(db, db_subject.id)
 
@@ -177,8 +297,11 @@ class SubjectService:
         if course_ids is not None:
             result = await db.execute(select(Course).filter(Course.id.in_(course_ids)))
             db_subject.courses = result.scalars().all()
+        ChangeLogService.record(db, "subject", db_subject.id)
             
+        await VersionService.bump(db, "subjects")
         await db.commit()
+        await cache.invalidate("subjects")
         await db.refresh(db_subject)
         return await SubjectService.get_by_id(db, db_subject.id)
 
@@ -190,5 +313,51 @@ class SubjectService:
             return False
         
         await db.delete(db_subject)
+        ChangeLogService.record(db, "subject", subject_id)
+        await VersionService.bump(db, "subjects")
         await db.commit()
+        await cache.invalidate("subjects")
         return True
+
+    @staticmethod
+    async def batch(db: AsyncSession, request: BatchRequest) -> Dict[str, Any]:
+        """Cria, altera e remove disciplinas em lote, em uma única transação (ver app.services.batch)."""
+        batch = Batch(request, SubjectCreate, SubjectUpdate)
+        await batch.check_exists(db, Subject, "Disciplina não encontrada")
+        await batch.check_unused(db, SchoolClass.subject_id, "Disciplina vinculada a turmas")
+        await batch.check_unique(db, Subject, "code", "Já existe disciplina com o código '{value}'")
+        await batch.check_references(db, "course_ids", Course, "Curso não encontrado: {ids}")
+        if not batch.writable():
+            return batch.results()
+
+        async with batch.write(db) as (creates, updates, deletes):
+            # Alterações que trazem course_ids regravam os vínculos da disciplina com os cursos
+            relinked = [item for item in updates if "course_ids" in item.data.model_fields_set]
+            if deletes:
+                ids = [item.id for item in deletes]
+                await db.execute(delete(subject_courses).filter(subject_courses.c.subject_id.in_(ids)))
+                await db.execute(delete(Subject).filter(Subject.id.in_(ids)))
+                ChangeLogService.record(db, "subject", *ids)
+            if updates:
+                rows = [item.values("course_ids") for item in updates]
+                rows = [row for row in rows if len(row) > 1]
+                if rows:
+                    await db.execute(update(Subject), rows)
+                if relinked:
+                    await db.execute(
+                        delete(subject_courses)
+                        .filter(subject_courses.c.subject_id.in_([item.id for item in relinked]))
+                    )
+                ChangeLogService.record(db, "subject", *[item.id for item in updates])
+            if creates:
+                await db.execute(insert(Subject), [item.values("course_ids") for item in creates])
+            links = [
+                {"subject_id": item.id, "course_id": course_id}
+                for item in creates + relinked
+                for course_id in dict.fromkeys(item.data.course_ids or [])
+            ]
+            if links:
+                await db.execute(insert(subject_courses), links)
+            await VersionService.bump(db, "subjects")
+        await cache.invalidate("subjects")
+        return batch.results()
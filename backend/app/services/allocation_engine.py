@@ -0,0 +1,706 @@
+"""
+Motor de alocação em memória para o ensalamento automático.
+
+Não acessa o banco: recebe salas e turmas em estruturas leves (RoomSpec/ClassSpec)
+e devolve as atribuições turma -> (sala, horário). A heurística é a mesma do
+ensalamento guloso original (best fit em sala vazia, empacotamento do grupo e
+fallback de compartilhamento global), mas as buscas usam índices ordenados por
+capacidade em vez de varrer todas as salas para cada turma.
+
+A semana é discretizada em uma grade de células (dia, faixa de horário). Cada sala
+guarda um bitset das células ocupadas e um array com os assentos usados por célula,
+de modo que "a sala está livre nestas células" é um AND bit a bit.
+
+O tipo de sala exigido pela disciplina é uma restrição: as salas compatíveis com cada
+tipo são pré-calculadas uma vez por execução (FeasibilityIndex) e cada tipo tem seus
+próprios índices de capacidade, então as buscas só tocam candidatos viáveis. Grupos
+sem nenhuma sala compatível são detectados antes da alocação e reportados.
+"""
+import bisect
+import heapq
+import random
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.services.run_report import RunReport
+
+
+@dataclass(frozen=True)
+class RoomSpec:
+    id: UUID
+    capacity: int
+    room_type: Optional[str] = None
+    campus: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ClassSpec:
+    id: UUID
+    students_count: int
+    # Turmas com a mesma chave (disciplina, mês de oferta) são alocadas em conjunto
+    group_key: Optional[Hashable] = None
+    required_room_type: Optional[str] = None
+    subject_id: Optional[UUID] = None
+    campus: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class MeetingPattern:
+    """Encontro semanal candidato: dias da semana (1 = Segunda) e faixa de horário."""
+    days_of_week: Tuple[int, ...]
+    start_time: str
+    end_time: str
+
+
+DEFAULT_PATTERN = MeetingPattern(days_of_week=(1, 2, 3), start_time="19:00", end_time="22:00")
+
+
+@dataclass(frozen=True)
+class Assignment:
+    school_class_id: UUID
+    room_id: UUID
+    pattern: MeetingPattern = DEFAULT_PATTERN
+
+
+@dataclass(frozen=True)
+class Reservation:
+    """Ocupação pré-existente de uma sala (ex.: alocação já aprovada)."""
+    room_id: UUID
+    days_of_week: Tuple[int, ...]
+    start_time: str
+    end_time: str
+    students: int
+
+
+@dataclass
+class SchedulingSnapshot:
+    """Entrada completa do alocador, sem objetos ORM."""
+    rooms: List[RoomSpec]
+    classes: List[ClassSpec]
+    reservations: List[Reservation] = field(default_factory=list)
+    patterns: List[MeetingPattern] = field(default_factory=lambda: [DEFAULT_PATTERN])
+
+
+@dataclass(frozen=True)
+class PlanMetrics:
+    allocated: int = 0
+    # Assentos vazios nas posições (sala, horário) usadas pelo plano
+    total_waste: int = 0
+    # Turmas em posições cuja ocupação passa da capacidade
+    overcapacity_rows: int = 0
+    overcapacity_seats: int = 0
+
+
+@dataclass
+class AllocationResult:
+    algorithm: str
+    assignments: List[Assignment]
+    metrics: PlanMetrics
+    # Métricas do guloso para o mesmo snapshot, quando outro algoritmo foi usado
+    baseline: Optional[PlanMetrics] = None
+    # Estatísticas da fase de busca local (local_search.SearchStats), se executada
+    search: Optional[Any] = None
+    # Propostas pending preservadas pelo modo incremental
+    reused: int = 0
+    # Variante usada e, no modo portfólio, o placar de cada variante
+    seed: int = 0
+    variants: Optional[List[Dict[str, Any]]] = None
+    # Grupos detectados como inviáveis na pré-checagem
+    infeasible: List["InfeasibleGroup"] = field(default_factory=list)
+    # Resultado reaproveitado da execução anterior (entradas inalteradas)
+    memoized: bool = False
+    # Tempo por fase e contadores do cálculo
+    report: RunReport = field(default_factory=RunReport)
+    # Execução registrada (ScheduleRun), preenchido pelo serviço ao gravar
+    run_id: Optional[int] = None
+    # Resultado compartilhado de uma execução idêntica já em andamento (single-flight)
+    shared: bool = False
+
+
+@dataclass(frozen=True)
+class InfeasibleGroup:
+    """
+    Grupo sem solução viável. reason="room_type": nenhuma sala ativa do tipo exigido
+    (o grupo não é alocado); reason="capacity": a turma é maior que a maior sala
+    compatível (é alocada, mas ficará superlotada).
+    """
+    class_ids: Tuple[UUID, ...]
+    students: int
+    required_room_type: Optional[str]
+    reason: str
+
+
+def to_minutes(value: str) -> int:
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class TimeGrid:
+    """
+    Grade de células (dia, faixa elementar de horário).
+
+    As faixas elementares vêm da quebra dos horários dos padrões em todos os seus
+    limites, então padrões que se sobrepõem no tempo compartilham células.
+    """
+
+    def __init__(self, patterns: Sequence[MeetingPattern]):
+        if not patterns:
+            raise ValueError("A grade precisa de pelo menos um padrão de horário")
+        self.patterns: List[MeetingPattern] = list(patterns)
+
+        boundaries = sorted(
+            {to_minutes(p.start_time) for p in self.patterns}
+            | {to_minutes(p.end_time) for p in self.patterns}
+        )
+        self.slots: List[Tuple[int, int]] = list(zip(boundaries, boundaries[1:]))
+        self.days: List[int] = sorted({day for p in self.patterns for day in p.days_of_week})
+        self._day_index = {day: i for i, day in enumerate(self.days)}
+        self.size = len(self.days) * len(self.slots)
+
+        self.pattern_cells: List[List[int]] = [
+            self.cells(p.days_of_week, p.start_time, p.end_time) for p in self.patterns
+        ]
+        self.pattern_masks: List[int] = [self.mask_of(cells) for cells in self.pattern_cells]
+
+    @classmethod
+    def from_config(cls, patterns: Iterable[dict]) -> "TimeGrid":
+        return cls([
+            MeetingPattern(
+                days_of_week=tuple(p["days_of_week"]),
+                start_time=p["start_time"],
+                end_time=p["end_time"],
+            )
+            for p in patterns
+        ])
+
+    def cells(self, days_of_week: Iterable[int], start_time: str, end_time: str) -> List[int]:
+        """Células tocadas por um horário; dias fora da grade são ignorados."""
+        start, end = to_minutes(start_time), to_minutes(end_time)
+        slots = [i for i, (s, e) in enumerate(self.slots) if s < end and start < e]
+        n_slots = len(self.slots)
+        return sorted(
+            self._day_index[day] * n_slots + slot
+            for day in set(days_of_week or [])
+            if day in self._day_index
+            for slot in slots
+        )
+
+    @staticmethod
+    def mask_of(cells: Iterable[int]) -> int:
+        mask = 0
+        for cell in cells:
+            mask |= 1 << cell
+        return mask
+
+
+class RoomOccupancy:
+    """Ocupação de uma sala: bitset de células ocupadas + assentos usados por célula."""
+
+    __slots__ = ("busy", "seats")
+
+    def __init__(self, size: int):
+        self.busy = 0
+        self.seats = array("i", [0]) * size
+
+    def is_free(self, mask: int) -> bool:
+        return self.busy & mask == 0
+
+    def add(self, cells: Iterable[int], students: int) -> None:
+        for cell in cells:
+            self.seats[cell] += students
+            if self.seats[cell]:
+                self.busy |= 1 << cell
+
+    def peak(self, cells: Iterable[int]) -> int:
+        return max((self.seats[cell] for cell in cells), default=0)
+
+
+def room_accepts(required: Optional[str], offered: Optional[str]) -> bool:
+    """Turma sem exigência ou sala sem tipo definido são compatíveis com qualquer tipo."""
+    return required is None or offered is None or required == offered
+
+
+class FeasibilityIndex:
+    """
+    Salas compatíveis por tipo exigido, como listas de ranks ordenadas (maior
+    capacidade primeiro). Calculado uma vez por execução; o snapshot só contém salas
+    ativas, então tipo e capacidade são as únicas restrições restantes.
+    """
+
+    def __init__(self, rooms: Sequence[RoomSpec]):
+        self._rooms = rooms
+        self._ranks: Dict[Optional[str], List[int]] = {}
+
+    def ranks(self, required: Optional[str]) -> List[int]:
+        ranks = self._ranks.get(required)
+        if ranks is None:
+            ranks = [rank for rank, room in enumerate(self._rooms) if room_accepts(required, room.room_type)]
+            self._ranks[required] = ranks
+        return ranks
+
+    def is_unrestricted(self, required: Optional[str]) -> bool:
+        return len(self.ranks(required)) == len(self._rooms)
+
+    def max_capacity(self, required: Optional[str]) -> int:
+        ranks = self.ranks(required)
+        return self._rooms[ranks[0]].capacity if ranks else 0
+
+    def check(self, groups: Iterable[List[ClassSpec]]) -> List[InfeasibleGroup]:
+        report: List[InfeasibleGroup] = []
+        for group in groups:
+            by_type: Dict[Optional[str], List[ClassSpec]] = defaultdict(list)
+            for spec in group:
+                by_type[spec.required_room_type].append(spec)
+            for required, specs in by_type.items():
+                largest = self.max_capacity(required)
+                if not self.ranks(required):
+                    reason = "room_type"
+                elif any(spec.students_count > largest for spec in specs):
+                    specs = [spec for spec in specs if spec.students_count > largest]
+                    reason = "capacity"
+                else:
+                    continue
+                report.append(InfeasibleGroup(
+                    class_ids=tuple(spec.id for spec in specs),
+                    students=sum(spec.students_count for spec in specs),
+                    required_room_type=required,
+                    reason=reason,
+                ))
+        return report
+
+
+class CapacityIndex:
+    """
+    Salas livres ordenadas por (capacidade, rank).
+
+    O rank é a posição da sala na lista ordenada por capacidade decrescente, o que
+    reproduz o desempate da varredura original (primeira sala encontrada vence).
+    visited conta as salas candidatas examinadas pelas consultas.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, int]]):
+        self._keys: List[Tuple[int, int]] = sorted(entries)
+        self.visited = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def best_fit(self, demand: int) -> Optional[int]:
+        """Rank da menor sala livre com capacidade >= demand, ou None."""
+        i = bisect.bisect_left(self._keys, (demand, -1))
+        if i == len(self._keys):
+            return None
+        self.visited += 1
+        return self._keys[i][1]
+
+    def discard(self, capacity: int, rank: int) -> None:
+        key = (capacity, rank)
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+
+class RemainingIndex:
+    """
+    Heap de capacidade restante (maior primeiro) com invalidação preguiçosa.
+
+    Cada atualização empilha uma nova entrada; entradas obsoletas são descartadas
+    na consulta, mantendo custo amortizado O(log n). visited conta as entradas
+    examinadas pelas consultas, obsoletas ou não.
+    """
+
+    def __init__(self, remaining: List[int], ranks: Optional[Iterable[int]] = None):
+        self._remaining = remaining
+        if ranks is None:
+            ranks = range(len(remaining))
+        self._heap = [(-remaining[rank], rank) for rank in ranks]
+        heapq.heapify(self._heap)
+        self.visited = 0
+
+    def update(self, rank: int, value: int) -> None:
+        if self._remaining[rank] == value:
+            return
+        self._remaining[rank] = value
+        heapq.heappush(self._heap, (-value, rank))
+
+    def largest(self) -> Optional[Tuple[int, int]]:
+        """(capacidade restante, rank) da sala com mais espaço livre."""
+        heap = self._heap
+        while heap:
+            neg_value, rank = heap[0]
+            self.visited += 1
+            if self._remaining[rank] == -neg_value:
+                return -neg_value, rank
+            heapq.heappop(heap)
+        return None
+
+
+def build_allocation_queue(classes: Iterable[ClassSpec], seed: int = 0) -> List[List[ClassSpec]]:
+    """
+    Agrupamento cooperativo: turmas com a mesma group_key formam um grupo, as demais
+    entram sozinhas. A fila é ordenada pelo total de alunos (menor para maior) para que
+    grupos menores garantam salas "na medida" antes dos grandes.
+
+    seed != 0 produz variantes determinísticas da ordem (usadas no modo portfólio):
+    decrescente, crescente com ruído ou embaralhada, conforme seed % 3.
+    """
+    grouped: Dict[Hashable, List[ClassSpec]] = defaultdict(list)
+    singles: List[List[ClassSpec]] = []
+    for spec in classes:
+        if spec.group_key is not None:
+            grouped[spec.group_key].append(spec)
+        else:
+            singles.append([spec])
+
+    queue = list(grouped.values()) + singles
+    total = lambda group: sum(c.students_count for c in group)
+    if seed == 0:
+        queue.sort(key=total)
+        return queue
+
+    rng = random.Random(seed)
+    variant = seed % 3
+    if variant == 1:
+        queue.sort(key=total, reverse=True)
+    elif variant == 2:
+        queue.sort(key=lambda group: total(group) * rng.uniform(0.85, 1.15))
+    else:
+        rng.shuffle(queue)
+    return queue
+
+
+# Posição candidata: (rank da sala, índice do padrão de horário)
+Slot = Tuple[int, int]
+
+
+class _TypeView:
+    """Índices de salas livres e de capacidade restante, por padrão, de um tipo de sala."""
+
+    __slots__ = ("ranks", "members", "free", "remaining")
+
+    def __init__(self, ranks: List[int], free: List[CapacityIndex], remaining: List[RemainingIndex]):
+        self.ranks = ranks
+        self.members = set(ranks)
+        self.free = free
+        self.remaining = remaining
+
+
+class AllocationEngine:
+    """Alocação gulosa sobre um conjunto fixo de salas e uma grade de horários."""
+
+    def __init__(self, rooms: Iterable[RoomSpec], grid: Optional[TimeGrid] = None, seed: int = 0):
+        self.grid = grid or TimeGrid([DEFAULT_PATTERN])
+        self.seed = seed
+        rooms = list(rooms)
+        if seed:
+            # Variante: embaralhar antes do sort muda o desempate entre salas iguais
+            random.Random(seed).shuffle(rooms)
+        # Maior para menor; sort estável preserva a ordem de entrada nos empates
+        self.rooms: List[RoomSpec] = sorted(rooms, key=lambda r: r.capacity, reverse=True)
+        self._rank: Dict[UUID, int] = {room.id: rank for rank, room in enumerate(self.rooms)}
+        self._occupancy: List[RoomOccupancy] = [RoomOccupancy(self.grid.size) for _ in self.rooms]
+        self._pattern_index = {pattern: p for p, pattern in enumerate(self.grid.patterns)}
+        self.feasibility = FeasibilityIndex(self.rooms)
+
+        # Um índice de salas livres e um de capacidade restante por padrão de horário
+        self._free: List[CapacityIndex] = [
+            CapacityIndex((room.capacity, rank) for rank, room in enumerate(self.rooms))
+            for _ in self.grid.patterns
+        ]
+        self._remaining: List[RemainingIndex] = [
+            RemainingIndex([room.capacity for room in self.rooms])
+            for _ in self.grid.patterns
+        ]
+        # Índices restritos por tipo exigido, criados sob demanda a partir do estado atual
+        self._views: Dict[Optional[str], _TypeView] = {}
+        # Contadores da alocação (grupos, encaixes, desmembramentos, salas candidatas examinadas)
+        self.report = RunReport()
+
+    def pattern_index(self, pattern: MeetingPattern) -> int:
+        return self._pattern_index[pattern]
+
+    def slot_of(self, assignment: Assignment) -> Slot:
+        return self._rank[assignment.room_id], self._pattern_index[assignment.pattern]
+
+    def load_at(self, slot: Slot) -> int:
+        """Pico de assentos ocupados nas células da posição."""
+        rank, p = slot
+        return self._occupancy[rank].peak(self.grid.pattern_cells[p])
+
+    def is_free(self, slot: Slot) -> bool:
+        rank, p = slot
+        return self._occupancy[rank].is_free(self.grid.pattern_masks[p])
+
+    def free_slots(self) -> List[Slot]:
+        return [
+            (rank, p)
+            for rank in range(len(self.rooms))
+            for p in range(len(self.grid.patterns))
+            if self.is_free((rank, p))
+        ]
+
+    def reserve(self, room_id: UUID, days_of_week: Iterable[int], start_time: str,
+                end_time: str, students: int) -> None:
+        """Registra uma ocupação pré-existente (ex.: alocação já aprovada)."""
+        rank = self._rank.get(room_id)
+        if rank is None:
+            return
+        self._occupy(rank, self.grid.cells(days_of_week, start_time, end_time), students)
+
+    def occupancy(self) -> Dict[UUID, int]:
+        """Pico de assentos ocupados em qualquer célula, por sala."""
+        return {room.id: max(self._occupancy[rank].seats, default=0)
+                for rank, room in enumerate(self.rooms)}
+
+    def _occupy(self, rank: int, cells: List[int], students: int) -> None:
+        room = self.rooms[rank]
+        occupancy = self._occupancy[rank]
+        touched = self.grid.mask_of(cells)
+        was_free = [occupancy.is_free(mask) for mask in self.grid.pattern_masks]
+        occupancy.add(cells, students)
+
+        for p, mask in enumerate(self.grid.pattern_masks):
+            if not mask & touched:
+                continue
+            if was_free[p] and not occupancy.is_free(mask):
+                self._free[p].discard(room.capacity, rank)
+            peak = occupancy.peak(self.grid.pattern_cells[p])
+            self._remaining[p].update(rank, room.capacity - peak)
+            for view in self._views.values():
+                if rank in view.members:
+                    if was_free[p] and not occupancy.is_free(mask):
+                        view.free[p].discard(room.capacity, rank)
+                    view.remaining[p].update(rank, room.capacity - peak)
+
+    def _view(self, required: Optional[str]) -> Optional[_TypeView]:
+        """Índices das salas compatíveis com o tipo; None = todas as salas servem."""
+        if self.feasibility.is_unrestricted(required):
+            return None
+        view = self._views.get(required)
+        if view is None:
+            ranks = self.feasibility.ranks(required)
+            n_patterns = len(self.grid.patterns)
+            view = _TypeView(
+                ranks,
+                [
+                    CapacityIndex((self.rooms[rank].capacity, rank) for rank in ranks if self.is_free((rank, p)))
+                    for p in range(n_patterns)
+                ],
+                [
+                    RemainingIndex([self._remaining_at((rank, p)) for rank in range(len(self.rooms))], ranks)
+                    for p in range(n_patterns)
+                ],
+            )
+            self._views[required] = view
+        return view
+
+    def _remaining_at(self, slot: Slot) -> int:
+        return self.rooms[slot[0]].capacity - self.load_at(slot)
+
+    def _best_fit(self, demand: int, required: Optional[str] = None) -> Optional[Slot]:
+        # Menor sala vazia compatível que comporta a demanda em qualquer padrão; empate pelo padrão
+        view = self._view(required)
+        indices = view.free if view else self._free
+        best: Optional[Tuple[int, int, int]] = None
+        for p, index in enumerate(indices):
+            rank = index.best_fit(demand)
+            if rank is None:
+                continue
+            key = (self.rooms[rank].capacity, p, rank)
+            if best is None or key < best:
+                best = key
+        if best is None:
+            return None
+        return best[2], best[1]
+
+    def _share_fallback(self, required: Optional[str] = None) -> Optional[Slot]:
+        # Posição com maior espaço restante; se todas estiverem superlotadas, a maior sala
+        view = self._view(required)
+        if view is not None and not view.ranks:
+            return None
+        indices = view.remaining if view else self._remaining
+        best: Optional[Tuple[int, int, int]] = None
+        for p, index in enumerate(indices):
+            largest = index.largest()
+            if largest is None:
+                continue
+            key = (-largest[0], p, largest[1])
+            if best is None or key < best:
+                best = key
+        if best is None or -best[0] < 0:
+            return (view.ranks[0] if view else 0), 0
+        return best[2], best[1]
+
+    def _visited(self) -> int:
+        """Salas candidatas examinadas até agora pelos índices de salas livres e de espaço restante."""
+        indices = [*self._free, *self._remaining]
+        for view in self._views.values():
+            indices.extend(view.free)
+            indices.extend(view.remaining)
+        return sum(index.visited for index in indices)
+
+    def place(self, spec: ClassSpec, slot: Slot) -> Assignment:
+        rank, p = slot
+        self._occupy(rank, self.grid.pattern_cells[p], spec.students_count)
+        return Assignment(spec.id, self.rooms[rank].id, self.grid.patterns[p])
+
+    def allocate(self, classes: Iterable[ClassSpec]) -> List[Assignment]:
+        return self.allocate_groups(build_allocation_queue(classes, self.seed))
+
+    def allocate_groups(self, queue: List[List[ClassSpec]]) -> List[Assignment]:
+        """Aloca uma fila já agrupada e ordenada (ver build_allocation_queue)."""
+        if not self.rooms:
+            return []
+
+        assignments: List[Assignment] = []
+        groups = group_fits = split_groups = share_fallbacks = 0
+        # Índices criados durante a alocação começam em zero: a diferença conta só esta chamada
+        visited_before = self._visited()
+        used_checked = 0
+
+        for group in queue:
+            # Turmas sem nenhuma sala compatível ficam de fora (reportadas por FeasibilityIndex)
+            group = [spec for spec in group if self.feasibility.ranks(spec.required_room_type)]
+            if not group:
+                continue
+            groups += 1
+            group_students = sum(c.students_count for c in group)
+            required = group[0].required_room_type
+
+            # TENTATIVA 1: grupo inteiro em uma sala vazia (best fit), se o tipo exigido é comum
+            slot = None
+            if all(spec.required_room_type == required for spec in group):
+                slot = self._best_fit(group_students, required)
+            if slot is not None:
+                group_fits += 1
+                for spec in group:
+                    assignments.append(self.place(spec, slot))
+                continue
+
+            # FALHA DE GRUPO: desmembrar, tentando manter as turmas nas posições do grupo
+            split_groups += 1
+            slots_used_by_group: List[Slot] = []
+            for spec in group:
+                cls_slot = None
+
+                # 1. Posição já usada pelo grupo com espaço suficiente
+                for used in slots_used_by_group:
+                    used_checked += 1
+                    if (self._remaining_at(used) >= spec.students_count
+                            and room_accepts(spec.required_room_type, self.rooms[used[0]].room_type)):
+                        cls_slot = used
+                        break
+
+                # 2. Sala vazia (best fit)
+                if cls_slot is None:
+                    cls_slot = self._best_fit(spec.students_count, spec.required_room_type)
+                    if cls_slot is not None:
+                        slots_used_by_group.append(cls_slot)
+
+                # 3. Compartilhamento global: posição com mais espaço restante
+                if cls_slot is None:
+                    share_fallbacks += 1
+                    cls_slot = self._share_fallback(spec.required_room_type)
+                    if cls_slot not in slots_used_by_group:
+                        slots_used_by_group.append(cls_slot)
+
+                assignments.append(self.place(spec, cls_slot))
+
+        self.report.count(
+            groups=groups,
+            group_fits=group_fits,
+            split_groups=split_groups,
+            share_fallbacks=share_fallbacks,
+            candidates_scanned=self._visited() - visited_before + used_checked,
+        )
+        return assignments
+
+    def evaluate(self, assignments: Iterable[Assignment]) -> PlanMetrics:
+        """Métricas de qualidade do plano sobre a ocupação atual do motor."""
+        rows_per_slot: Dict[Slot, int] = defaultdict(int)
+        for assignment in assignments:
+            rows_per_slot[self.slot_of(assignment)] += 1
+
+        waste = over_rows = over_seats = 0
+        for slot, rows in rows_per_slot.items():
+            remaining = self._remaining_at(slot)
+            if remaining >= 0:
+                waste += remaining
+            else:
+                over_rows += rows
+                over_seats -= remaining
+
+        return PlanMetrics(
+            allocated=sum(rows_per_slot.values()),
+            total_waste=waste,
+            overcapacity_rows=over_rows,
+            overcapacity_seats=over_seats,
+        )
+
+
+ALGORITHMS = ("greedy", "optimal")
+
+
+def build_engine(snapshot: SchedulingSnapshot, seed: int = 0) -> AllocationEngine:
+    engine = AllocationEngine(snapshot.rooms, TimeGrid(snapshot.patterns), seed)
+    for r in snapshot.reservations:
+        engine.reserve(r.room_id, r.days_of_week, r.start_time, r.end_time, r.students)
+    return engine
+
+
+def evaluate_plan(snapshot: SchedulingSnapshot, assignments: List[Assignment]) -> PlanMetrics:
+    """Métricas de um plano arbitrário (ex.: alterado pela busca local)."""
+    engine = build_engine(snapshot)
+    specs = {spec.id: spec for spec in snapshot.classes}
+    for assignment in assignments:
+        engine.place(specs[assignment.school_class_id], engine.slot_of(assignment))
+    return engine.evaluate(assignments)
+
+
+def solve(snapshot: SchedulingSnapshot, algorithm: str = "greedy",
+          time_budget_ms: int = 0, seed: int = 0) -> AllocationResult:
+    """
+    Executa o algoritmo escolhido sobre o snapshot e calcula as métricas do plano.
+    Com time_budget_ms > 0, o plano passa por uma fase de busca local limitada no tempo.
+    seed != 0 seleciona uma variante determinística de ordem e desempate.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Algoritmo desconhecido: {algorithm}")
+
+    report = RunReport()
+    with report.phase("solve.build_engine"):
+        engine = build_engine(snapshot, seed)
+    with report.phase("solve.grouping"):
+        queue = build_allocation_queue(snapshot.classes, seed)
+    # Pré-checagem de viabilidade: uma vez por execução, antes de qualquer algoritmo
+    with report.phase("solve.feasibility"):
+        infeasible = engine.feasibility.check(queue)
+    with report.phase("solve.allocation"):
+        if algorithm == "optimal":
+            from app.services.optimal_allocation import allocate_optimal
+            assignments = allocate_optimal(engine, snapshot.classes)
+        else:
+            assignments = engine.allocate_groups(queue)
+    with report.phase("solve.evaluation"):
+        metrics = engine.evaluate(assignments)
+    result = AllocationResult(
+        algorithm, assignments, metrics, seed=seed, infeasible=infeasible, report=report
+    )
+
+    if time_budget_ms > 0:
+        from app.services.local_search import improve
+        with report.phase("solve.local_search"):
+            result.assignments, result.search = improve(snapshot, assignments, time_budget_ms, seed)
+            result.metrics = evaluate_plan(snapshot, result.assignments)
+        report.count(search_iterations=result.search.iterations)
+
+    if algorithm != "greedy":
+        with report.phase("solve.baseline"):
+            baseline_engine = build_engine(snapshot)
+            result.baseline = baseline_engine.evaluate(baseline_engine.allocate(snapshot.classes))
+    report.merge({}, engine.report.counters)
+    report.count(classes=len(snapshot.classes), rooms=len(snapshot.rooms), assignments=len(result.assignments))
+    return result
@@ -1,12 +1,38 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.models import AuditLog
-from typing import List
+from app.services.pagination import paginate
+from typing import List, Optional
+import datetime
 
 class AuditService:
+    # Mais recentes primeiro; o id desempata registros com o mesmo instante
+    ORDER = (AuditLog.timestamp, AuditLog.id)
+
     @staticmethod
-    async def get_all(db: AsyncSession) -> List[AuditLog]:
-        result = await db.execute(select(AuditLog).order_by(AuditLog.timestamp.desc()))
+    async def get_all(
+        db: AsyncSession,
+        user: Optional[str] = None,
+        action: Optional[str] = None,
+        impact: Optional[str] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[AuditLog]:
+        """Registros filtrados no banco (since inclusivo, until exclusivo), paginados por cursor."""
+        query = select(AuditLog)
+        if user is not None:
+            query = query.filter(AuditLog.user == user)
+        if action is not None:
+            query = query.filter(AuditLog.action == action)
+        if impact is not None:
+            query = query.filter(AuditLog.impact == impact)
+        if since is not None:
+            query = query.filter(AuditLog.timestamp >= since)
+        if until is not None:
+            query = query.filter(AuditLog.timestamp < until)
+        result = await db.execute(paginate(query, AuditService.ORDER, cursor, limit, descending=True))
         return result.scalars().all()
 
     @staticmethod
@@ -0,0 +1,208 @@
+"""
+Lotes de criação, alteração e remoção (salas, turmas e disciplinas).
+
+Cada item é validado pelo seu schema e depois em conjunto com o lote e o banco: ids
+existentes, valores únicos e referências são conferidos com uma consulta por regra, não
+por item. Os serviços gravam os itens válidos em uma única transação, com INSERT e
+UPDATE de várias linhas, e devolvem o resultado de cada item, com os erros dos rejeitados.
+"""
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.schemas.batch_schemas import BatchRequest
+
+DONE = {"create": "created", "update": "updated", "delete": "deleted"}
+
+
+@dataclass
+class BatchItem:
+    op: str  # create, update, delete
+    index: int
+    id: Optional[UUID] = None
+    data: Optional[BaseModel] = None
+    errors: List[str] = field(default_factory=list)
+
+    def values(self, *exclude: str) -> Dict[str, Any]:
+        """Colunas a gravar: na alteração, só os campos enviados."""
+        data = self.data.model_dump(exclude_unset=self.op == "update", exclude=set(exclude))
+        return {"id": self.id, **data}
+
+
+def _messages(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    ]
+
+
+class Batch:
+    def __init__(self, request: BatchRequest, create_schema: Type[BaseModel], update_schema: Type[BaseModel]):
+        self.atomic = request.atomic
+        self.written = False
+        self.creates = [self._parse("create", i, raw, create_schema) for i, raw in enumerate(request.create)]
+        for item in self.creates:
+            item.id = uuid4()
+        self.updates = [self._parse_update(i, raw, update_schema) for i, raw in enumerate(request.update)]
+        self.deletes = [BatchItem("delete", i, id=item_id) for i, item_id in enumerate(request.delete)]
+
+        # Um mesmo registro só pode aparecer uma vez entre alterações e remoções
+        seen: Dict[UUID, List[BatchItem]] = defaultdict(list)
+        for item in self.updates + self.deletes:
+            if item.id is not None:
+                seen[item.id].append(item)
+        for items in seen.values():
+            if len(items) > 1:
+                self.reject(items, "Registro repetido no lote")
+
+    @staticmethod
+    def _parse(op: str, index: int, raw: Dict[str, Any], schema: Type[BaseModel]) -> BatchItem:
+        item = BatchItem(op, index)
+        try:
+            item.data = schema.model_validate(raw)
+        except ValidationError as e:
+            item.errors.extend(_messages(e))
+        return item
+
+    @staticmethod
+    def _parse_update(index: int, raw: Dict[str, Any], schema: Type[BaseModel]) -> BatchItem:
+        raw = dict(raw)
+        raw_id = raw.pop("id", None)
+        item = Batch._parse("update", index, raw, schema)
+        if raw_id is None:
+            item.errors.insert(0, "id: campo obrigatório")
+            return item
+        try:
+            item.id = UUID(str(raw_id))
+        except ValueError:
+            item.errors.insert(0, "id: UUID inválido")
+        return item
+
+    @staticmethod
+    def valid(items: Iterable[BatchItem]) -> List[BatchItem]:
+        return [item for item in items if not item.errors]
+
+    @staticmethod
+    def reject(items: Iterable[BatchItem], message: str, when: Callable[[BatchItem], bool] = lambda item: True) -> None:
+        for item in items:
+            if when(item):
+                item.errors.append(message)
+
+    async def check_exists(self, db: AsyncSession, model: Any, message: str) -> None:
+        """Alterações e remoções precisam de registros existentes."""
+        items = self.valid(self.updates + self.deletes)
+        if not items:
+            return
+        result = await db.execute(select(model.id).filter(model.id.in_([item.id for item in items])))
+        existing = set(result.scalars().all())
+        self.reject(items, message, lambda item: item.id not in existing)
+
+    async def check_unused(self, db: AsyncSession, column: Any, message: str) -> None:
+        """Remoções de registros ainda referenciados por column (ex.: Schedule.room_id)."""
+        items = self.valid(self.deletes)
+        if not items:
+            return
+        result = await db.execute(select(column).filter(column.in_([item.id for item in items])).distinct())
+        used = set(result.scalars().all())
+        self.reject(items, message, lambda item: item.id in used)
+
+    def _assigned(self, name: str) -> List[BatchItem]:
+        """Criações e alterações válidas que atribuem o campo."""
+        return [
+            item for item in self.valid(self.creates + self.updates)
+            if name in item.data.model_fields_set or item.op == "create"
+        ]
+
+    async def check_unique(self, db: AsyncSession, model: Any, name: str, message: str) -> None:
+        """Valores únicos: sem repetição no lote nem em outro registro que continua no banco."""
+        claims: Dict[Any, List[BatchItem]] = defaultdict(list)
+        for item in self._assigned(name):
+            if getattr(item.data, name) is not None:
+                claims[getattr(item.data, name)].append(item)
+        for value, items in claims.items():
+            if len(items) > 1:
+                self.reject(items, f"{name} '{value}' repetido no lote")
+        if not claims:
+            return
+        column = getattr(model, name)
+        result = await db.execute(select(column, model.id).filter(column.in_(list(claims))))
+        owners = dict(result.all())
+        released: Set[UUID] = {item.id for item in self.valid(self.deletes)}
+        for value, items in claims.items():
+            owner = owners.get(value)
+            self.reject(
+                items, message.format(value=value),
+                lambda item: owner is not None and owner != item.id and owner not in released,
+            )
+
+    async def check_references(self, db: AsyncSession, name: str, model: Any, message: str) -> None:
+        """Ids referenciados pelo campo (um id ou lista de ids) precisam existir em model."""
+        wanted: List[Tuple[BatchItem, List[UUID]]] = []
+        for item in self._assigned(name):
+            value = getattr(item.data, name)
+            refs = value if isinstance(value, list) else [value]
+            wanted.append((item, [ref for ref in refs if ref is not None]))
+        refs = {ref for _, item_refs in wanted for ref in item_refs}
+        if not refs:
+            return
+        result = await db.execute(select(model.id).filter(model.id.in_(refs)))
+        existing = set(result.scalars().all())
+        for item, item_refs in wanted:
+            missing = [str(ref) for ref in item_refs if ref not in existing]
+            if missing:
+                item.errors.append(message.format(ids=", ".join(missing)))
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for item in self.creates + self.updates + self.deletes if item.errors)
+
+    def writable(self) -> bool:
+        """Há itens válidos a gravar (no modo atômico, só se nenhum item falhou)."""
+        if self.atomic and self.failed:
+            return False
+        return bool(self.valid(self.creates + self.updates + self.deletes))
+
+    @asynccontextmanager
+    async def write(self, db: AsyncSession):
+        """
+        Entrega os itens válidos (criações, alterações, remoções) para gravação e faz o
+        commit ao final do bloco. Um erro do banco (conflito de escrita concorrente, valor
+        fora do intervalo da coluna...) desfaz o lote inteiro e vira ValueError.
+        """
+        try:
+            yield self.valid(self.creates), self.valid(self.updates), self.valid(self.deletes)
+            await db.commit()
+        except DBAPIError as e:
+            await db.rollback()
+            if isinstance(e, IntegrityError):
+                raise ValueError("Conflito ao gravar o lote; nenhum item foi gravado")
+            raise ValueError("Valor rejeitado pelo banco ao gravar o lote; nenhum item foi gravado")
+        self.written = True
+
+    def results(self) -> Dict[str, Any]:
+        items = []
+        counts = {"created": 0, "updated": 0, "deleted": 0}
+        for item in self.creates + self.updates + self.deletes:
+            if item.errors:
+                status = "error"
+            elif self.written:
+                status = DONE[item.op]
+                counts[status] += 1
+            else:
+                status = "skipped"
+            items.append({
+                "op": item.op,
+                "index": item.index,
+                # Ids gerados para criações não gravadas não existem: não são devolvidos
+                "id": item.id if status != "error" and (item.op != "create" or self.written) else None,
+                "status": status,
+                "errors": item.errors,
+            })
+        return {**counts, "failed": self.failed, "items": items}
@@ -0,0 +1,34 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import delete
+from app.models.models import SchedulingChange
+from app.services.incremental_scheduling import ChangeSet
+from uuid import UUID
+
+class ChangeLogService:
+    """
+    Log de alterações de salas, turmas e disciplinas desde o último ensalamento.
+    Os métodos de escrita apenas adicionam à sessão: o commit é feito pelo chamador,
+    na mesma transação da alteração.
+    """
+
+    @staticmethod
+    def record(db: AsyncSession, entity: str, *entity_ids: UUID) -> None:
+        for entity_id in entity_ids:
+            db.add(SchedulingChange(entity=entity, entity_id=entity_id))
+
+    @staticmethod
+    async def pending(db: AsyncSession) -> ChangeSet:
+        result = await db.execute(
+            select(SchedulingChange.id, SchedulingChange.entity, SchedulingChange.entity_id)
+        )
+        changes = ChangeSet()
+        for change_id, entity, entity_id in result.all():
+            changes.add(entity, entity_id)
+            changes.last_id = max(changes.last_id, change_id)
+        return changes
+
+    @staticmethod
+    async def consume(db: AsyncSession, changes: ChangeSet) -> None:
+        """Remove as alterações já tratadas; as registradas durante a execução permanecem."""
+        await db.execute(delete(SchedulingChange).filter(SchedulingChange.id <= changes.last_id))
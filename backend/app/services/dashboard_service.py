@@ -1,76 +1,162 @@
+import asyncio
+import time
+from app.core.cache import cache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
-from app.models.models import Room, SchoolClass, Schedule, RoomType
-from typing import Dict, Any, List
+from sqlalchemy import func, true
+from app.db.json_arrays import int_elements
+from app.models.models import STAGED, Room, SchoolClass, Schedule, RoomType
+from app.services.overlap_detection import (
+    BookedInterval, OverlapConflict, check_candidate, expand, find_overlaps
+)
+from app.services.stats_service import BLOCK_CAPACITY, BLOCK_ROOMS, BLOCK_SCHEDULED, StatsService
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from uuid import UUID
+
+def _format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
 
 class DashboardService:
     @staticmethod
-    async def get_stats(db: AsyncSession) -> Dict[str, Any]:
-        from sqlalchemy.orm import selectinload
-        
-        # Count rooms
-        rooms_count_result = await db.execute(select(func.count(Room.id)))
-        rooms_count = rooms_count_result.scalar() or 0
-        
-        # Count classes
-        classes_count_result = await db.execute(select(func.count(SchoolClass.id)))
-        classes_count = classes_count_result.scalar() or 0
-        
-        # Count schedules (allocation)
-        schedules_count_result = await db.execute(select(func.count(Schedule.id)))
-        schedules_count = schedules_count_result.scalar() or 0
-        
-        # Detect capacity conflicts
-        schedules_result = await db.execute(
-            select(Schedule)
-            .options(selectinload(Schedule.room), selectinload(Schedule.school_class))
+    def _capacity_conflicts(*columns):
+        """
+        Alocações cuja turma tem mais alunos que a capacidade da sala, resolvidas no
+        banco com um único join; só as linhas em conflito saem do banco.
+        """
+        return (
+            select(*columns)
+            .select_from(Schedule)
+            .join(Room, Schedule.room_id == Room.id)
+            .join(SchoolClass, Schedule.school_class_id == SchoolClass.id)
+            .filter(Schedule.status != STAGED, SchoolClass.students_count > Room.capacity)
         )
-        schedules = schedules_result.scalars().all()
-        
-        conflicts_count = 0
-        for schedule in schedules:
-            if schedule.room and schedule.school_class:
-                if schedule.school_class.students_count > schedule.room.capacity:
-                    conflicts_count += 1
-        
+
+    @staticmethod
+    async def get_stats(db: AsyncSession) -> Dict[str, Any]:
+        # Contadores materializados, mantidos pelas escritas: uma única leitura
+        counters = await StatsService.get(db)
+        classes_count = counters.get("classes", 0)
+        schedules_count = counters.get("schedules", 0)
+
         completion = 0
         if classes_count > 0:
             completion = min(100, int((schedules_count / classes_count) * 100))
 
         return {
-            "total_rooms": rooms_count,
+            "total_rooms": counters.get("rooms", 0),
             "active_classes": classes_count,
-            "pending_conflicts": conflicts_count,
+            "pending_conflicts": counters.get("conflicts", 0),
             "completion_rate": f"{completion}%"
         }
 
     @staticmethod
     async def get_occupancy_data(db: AsyncSession) -> List[Dict[str, Any]]:
-        # Group rooms by block and calculate occupancy
-        # For MVP: Ocupação = count of schedules in that block, Capacidade = sum of room capacities in that block
-        result = await db.execute(
-            select(
-                Room.block,
-                func.sum(Room.capacity).label("total_capacity"),
-                func.count(Schedule.id).label("scheduled_count")
-            )
-            .outerjoin(Schedule, Room.id == Schedule.room_id)
-            .group_by(Room.block)
-        )
-        
+        # Por bloco: Ocupação = alocações nas salas do bloco, Capacidade = soma das capacidades das salas
+        counters = await StatsService.get(db)
         data = []
-        for row in result.all():
+        for name, rooms in sorted(counters.items()):
+            if not name.startswith(BLOCK_ROOMS) or rooms <= 0:
+                continue
+            block = name[len(BLOCK_ROOMS):]
             data.append({
-                "name": row.block,
-                "ocupacao": row.scheduled_count,
-                "capacidade": row.total_capacity or 0
+                "name": block,
+                "ocupacao": counters.get(BLOCK_SCHEDULED + block, 0),
+                "capacidade": counters.get(BLOCK_CAPACITY + block, 0)
             })
-            
+
         if not data:
             return [{"name": "Sem Dados", "ocupacao": 0, "capacidade": 0}]
         return data
 
+    @staticmethod
+    def _days(dialect: str):
+        """Expande Schedule.days_of_week (array JSON) em uma linha por dia, no banco."""
+        return int_elements(Schedule.days_of_week, dialect)
+
+    @staticmethod
+    async def get_occupancy_heatmap(
+        db: AsyncSession, campus: Optional[str] = None, status: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Ocupação de assentos (alunos / capacidade das salas ativas do bloco) por
+        campus, prédio, bloco, dia e faixa de horário, agregada em uma consulta.
+
+        Resposta colunar: blocos e faixas aparecem uma vez em "blocks" e "slots" e as
+        colunas de "columns" referenciam esses índices, uma posição por célula.
+        """
+        blocks = (
+            select(
+                Room.campus, Room.building, Room.block,
+                func.sum(Room.capacity).label("capacity"),
+                func.count(Room.id).label("rooms"),
+            )
+            .filter(Room.is_active == True)
+            .group_by(Room.campus, Room.building, Room.block)
+            .subquery()
+        )
+        days, day = DashboardService._days(db.bind.dialect.name)
+        query = (
+            select(
+                Room.campus, Room.building, Room.block,
+                day.label("day"),
+                Schedule.start_time,
+                Schedule.end_time,
+                func.sum(SchoolClass.students_count).label("students"),
+                func.count(Schedule.id).label("classes"),
+                func.count(func.distinct(Schedule.room_id)).label("rooms_used"),
+                func.max(blocks.c.capacity).label("capacity"),
+                func.max(blocks.c.rooms).label("rooms"),
+            )
+            .select_from(Schedule)
+            .join(days, true())
+            .join(Room, Schedule.room_id == Room.id)
+            .join(SchoolClass, Schedule.school_class_id == SchoolClass.id)
+            .join(blocks, (blocks.c.campus == Room.campus) & (blocks.c.building == Room.building)
+                  & (blocks.c.block == Room.block))
+            .group_by(Room.campus, Room.building, Room.block, day, Schedule.start_time, Schedule.end_time)
+            .order_by(Room.campus, Room.building, Room.block, day, Schedule.start_time, Schedule.end_time)
+        )
+        # Propostas rejeitadas e em staging não ocupam a sala
+        if status is not None:
+            query = query.filter(Schedule.status == status)
+        else:
+            query = query.filter(Schedule.status.not_in([STAGED, "rejected"]))
+        if campus is not None:
+            query = query.filter(Room.campus == campus)
+        result = await db.execute(query)
+
+        block_index: Dict[tuple, int] = {}
+        slot_index: Dict[tuple, int] = {}
+        data: Dict[str, Any] = {
+            "blocks": [],
+            "slots": [],
+            "columns": {name: [] for name in (
+                "block", "day", "slot", "students", "classes", "rooms_used", "utilization"
+            )},
+        }
+        columns = data["columns"]
+        for row in result.all():
+            block_key = (row.campus, row.building, row.block)
+            if block_key not in block_index:
+                block_index[block_key] = len(data["blocks"])
+                data["blocks"].append({
+                    "campus": row.campus, "building": row.building, "block": row.block,
+                    "capacity": row.capacity or 0, "rooms": row.rooms,
+                })
+            slot_key = (row.start_time, row.end_time)
+            if slot_key not in slot_index:
+                slot_index[slot_key] = len(data["slots"])
+                data["slots"].append({"start_time": row.start_time, "end_time": row.end_time})
+            columns["block"].append(block_index[block_key])
+            columns["day"].append(row.day)
+            columns["slot"].append(slot_index[slot_key])
+            columns["students"].append(row.students or 0)
+            columns["classes"].append(row.classes)
+            columns["rooms_used"].append(row.rooms_used)
+            columns["utilization"].append(round((row.students or 0) / row.capacity, 4) if row.capacity else None)
+        data["cells"] = len(columns["day"])
+        return data
+
     @staticmethod
     async def get_room_distribution(db: AsyncSession) -> List[Dict[str, Any]]:
         result = await db.execute(
@@ -90,32 +176,191 @@ class DashboardService:
         return data
 
     @staticmethod
-    async def get_conflicts(db: AsyncSession) -> List[Dict[str, Any]]:
-        from sqlalchemy.orm import selectinload
-        
-        # Buscar todos os schedules com relacionamentos
+    async def count_conflicts(db: AsyncSession) -> int:
+        return (await StatsService.get(db)).get("conflicts", 0)
+
+    @staticmethod
+    async def get_conflicts(db: AsyncSession, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Conflitos de capacidade, dos mais superlotados para os menos; sem limit, todos."""
+        overflow = SchoolClass.students_count - Room.capacity
         result = await db.execute(
-            select(Schedule)
-            .options(selectinload(Schedule.room), selectinload(Schedule.school_class))
+            DashboardService._capacity_conflicts(
+                Schedule.id,
+                SchoolClass.name.label("class_name"),
+                Room.number.label("room_number"),
+                SchoolClass.students_count,
+                Room.capacity,
+            )
+            .order_by(overflow.desc(), Schedule.id)
+            .limit(limit)
+            .offset(offset)
         )
-        schedules = result.scalars().all()
-        
+
         conflicts = []
-        for schedule in schedules:
-            if schedule.room and schedule.school_class:
-                room_capacity = schedule.room.capacity
-                students_count = schedule.school_class.students_count
-                
-                # Detectar conflito de capacidade
-                if students_count > room_capacity:
-                    conflicts.append({
-                        "id": str(schedule.id),
-                        "class_name": schedule.school_class.name,
-                        "room_number": schedule.room.number,
-                        "students": students_count,
-                        "capacity": room_capacity,
-                        "severity": "Alta",
-                        "description": f"Sala {schedule.room.number} tem {room_capacity} vagas mas a turma {schedule.school_class.name} possui {students_count} alunos"
-                    })
-        
+        for row in result.all():
+            conflicts.append({
+                "id": str(row.id),
+                "type": "capacity",
+                "class_name": row.class_name,
+                "room_number": row.room_number,
+                "students": row.students_count,
+                "capacity": row.capacity,
+                "severity": "Alta",
+                "description": f"Sala {row.room_number} tem {row.capacity} vagas mas a turma {row.class_name} possui {row.students_count} alunos"
+            })
+
         return conflicts
+
+    @staticmethod
+    async def get_summary(session_factory: Callable, conflict_limit: int = 20) -> Dict[str, Any]:
+        """
+        Os quatro painéis do dashboard em uma resposta. Cada painel roda em sua própria
+        sessão (conexão do pool) e todos rodam ao mesmo tempo, então o tempo total
+        acompanha o painel mais lento; timings_ms traz o tempo de cada um. Painéis em
+        cache (namespace "dashboard") não abrem sessão.
+        """
+        async def panel(name: str, key: Any, load: Callable) -> Tuple[str, Any, float]:
+            started = time.perf_counter()
+
+            # A sessão só é aberta quando o painel não está em cache
+            async def fetch():
+                async with session_factory() as db:
+                    return await load(db)
+
+            data = await cache.get_or_load("dashboard", key, fetch)
+            return name, data, round((time.perf_counter() - started) * 1000, 1)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            panel("stats", "stats", DashboardService.get_stats),
+            panel("occupancy", "occupancy", DashboardService.get_occupancy_data),
+            panel("distribution", "distribution", DashboardService.get_room_distribution),
+            panel("conflicts", ("summary.conflicts", conflict_limit),
+                  lambda db: DashboardService.get_conflicts(db, conflict_limit)),
+        )
+        summary: Dict[str, Any] = {name: data for name, data, _ in results}
+        summary["timings_ms"] = {name: elapsed for name, _, elapsed in results}
+        summary["timings_ms"]["total"] = round((time.perf_counter() - started) * 1000, 1)
+        return summary
+
+    @staticmethod
+    async def _booked_intervals(db: AsyncSession, room_id: Optional[UUID] = None) -> Tuple[List[BookedInterval], Dict[UUID, int]]:
+        """Intervalos ocupados por sala e dia, e a capacidade de cada sala envolvida."""
+        # Propostas rejeitadas e em staging não ocupam a sala
+        query = (
+            select(
+                Schedule.id,
+                Schedule.room_id,
+                Schedule.days_of_week,
+                Schedule.start_time,
+                Schedule.end_time,
+                SchoolClass.students_count,
+                Room.capacity,
+            )
+            .join(Room, Schedule.room_id == Room.id)
+            .join(SchoolClass, Schedule.school_class_id == SchoolClass.id)
+            .filter(Schedule.status.not_in([STAGED, "rejected"]))
+        )
+        if room_id is not None:
+            query = query.filter(Schedule.room_id == room_id)
+        result = await db.execute(query)
+
+        intervals = []
+        capacities = {}
+        for row in result.all():
+            capacities[row.room_id] = row.capacity
+            intervals.extend(expand(
+                row.id, row.room_id, row.days_of_week, row.start_time, row.end_time, row.students_count
+            ))
+        return intervals, capacities
+
+    @staticmethod
+    async def _describe_overlaps(
+        db: AsyncSession, conflicts: List[OverlapConflict], new_class_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        # Nomes só das salas e turmas da página, não de todas as alocações
+        schedule_ids = {schedule_id for conflict in conflicts for schedule_id in conflict.schedule_ids if schedule_id}
+        room_ids = {conflict.room_id for conflict in conflicts}
+        class_names = {}
+        room_numbers = {}
+        if schedule_ids:
+            result = await db.execute(
+                select(Schedule.id, SchoolClass.name)
+                .join(SchoolClass, Schedule.school_class_id == SchoolClass.id)
+                .filter(Schedule.id.in_(schedule_ids))
+            )
+            class_names = dict(result.all())
+        # Alocação candidata ainda sem id
+        class_names[None] = new_class_name
+        if room_ids:
+            result = await db.execute(select(Room.id, Room.number).filter(Room.id.in_(room_ids)))
+            room_numbers = dict(result.all())
+
+        data = []
+        for conflict in conflicts:
+            room_number = room_numbers.get(conflict.room_id)
+            names = [class_names.get(schedule_id) for schedule_id in conflict.schedule_ids]
+            start, end = _format_minutes(conflict.start), _format_minutes(conflict.end)
+            data.append({
+                "id": f"{conflict.room_id}:{start}:{','.join(map(str, conflict.days))}",
+                "type": "overlap",
+                "room_id": str(conflict.room_id),
+                "room_number": room_number,
+                "schedule_ids": [str(schedule_id) for schedule_id in conflict.schedule_ids if schedule_id],
+                "class_names": names,
+                "days_of_week": conflict.days,
+                "start_time": start,
+                "end_time": end,
+                "students": conflict.peak_students,
+                "capacity": conflict.capacity,
+                "severity": conflict.severity,
+                "description": f"Sala {room_number} tem {len(names)} turmas no mesmo horário ({start}-{end}): "
+                               f"{conflict.peak_students} alunos para {conflict.capacity} vagas"
+            })
+        return data
+
+    @staticmethod
+    async def get_overlap_conflicts(
+        db: AsyncSession, limit: Optional[int] = None, offset: int = 0
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Duplas reservas (mesma sala, dia e horário sobreposto), das mais graves para as
+        mais leves. Retorna o total e a página pedida (sem limit, todas).
+        """
+        intervals, capacities = await DashboardService._booked_intervals(db)
+        conflicts = find_overlaps(intervals, capacities)
+        page = conflicts[offset:] if limit is None else conflicts[offset:offset + limit]
+        return len(conflicts), await DashboardService._describe_overlaps(db, page)
+
+    @staticmethod
+    async def check_schedule(
+        db: AsyncSession,
+        room_id: UUID,
+        school_class_id: UUID,
+        days_of_week: List[int],
+        start_time: str,
+        end_time: str,
+        schedule_id: Optional[UUID] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Verifica uma alocação candidata contra as alocações existentes da mesma sala.
+        schedule_id identifica a alocação sendo editada, que não conflita consigo mesma.
+        """
+        room_result = await db.execute(select(Room.capacity).filter(Room.id == room_id))
+        capacity = room_result.scalar_one_or_none()
+        if capacity is None:
+            raise ValueError("Sala não encontrada")
+        class_result = await db.execute(
+            select(SchoolClass.name, SchoolClass.students_count).filter(SchoolClass.id == school_class_id)
+        )
+        school_class = class_result.one_or_none()
+        if school_class is None:
+            raise ValueError("Turma não encontrada")
+
+        existing, _ = await DashboardService._booked_intervals(db, room_id)
+        existing = [interval for interval in existing if interval.schedule_id != schedule_id]
+        candidate = expand(schedule_id, room_id, days_of_week, start_time, end_time, school_class.students_count)
+        conflict = check_candidate(candidate, existing, capacity)
+        if conflict is None:
+            return None
+        return (await DashboardService._describe_overlaps(db, [conflict], school_class.name))[0]
@@ -0,0 +1,94 @@
+"""
+Exportação das alocações publicadas em NDJSON ou CSV, em fluxo.
+
+As linhas vêm do banco por um cursor do lado do servidor (stream + yield_per), já
+achatadas em colunas simples (sem objetos ORM nem schemas pydantic), e são escritas em
+blocos de batch_size linhas: a memória usada não depende do tamanho do ensalamento.
+"""
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.future import select
+
+from app.models.models import Room, Schedule, SchoolClass, Subject
+from app.services.schedule_service import ScheduleService
+
+EXPORT_FIELDS = [
+    "id", "status", "days_of_week", "start_time", "end_time",
+    "campus", "building", "block", "room", "capacity",
+    "class_name", "shift", "semester", "students_count",
+    "subject_code", "subject_name",
+]
+
+class ExportService:
+    @staticmethod
+    async def schedule_rows(
+        session_factory,
+        batch_size: int,
+        status: Optional[str] = None,
+        room_id: Optional[UUID] = None,
+        school_class_id: Optional[UUID] = None,
+        campus: Optional[str] = None,
+        day: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Alocações publicadas em lotes de até batch_size linhas, ordenadas por campus,
+        sala e horário. Usa sessão própria, que vive enquanto o fluxo é consumido.
+        """
+        async with session_factory() as db:
+            query = (
+                select(
+                    Schedule.id,
+                    Schedule.status,
+                    Schedule.days_of_week,
+                    Schedule.start_time,
+                    Schedule.end_time,
+                    Room.campus,
+                    Room.building,
+                    Room.block,
+                    Room.number.label("room"),
+                    Room.capacity,
+                    SchoolClass.name.label("class_name"),
+                    SchoolClass.shift,
+                    SchoolClass.semester,
+                    SchoolClass.students_count,
+                    Subject.code.label("subject_code"),
+                    Subject.name.label("subject_name"),
+                )
+                .select_from(Schedule)
+                .join(Room, Schedule.room_id == Room.id)
+                .join(SchoolClass, Schedule.school_class_id == SchoolClass.id)
+                .outerjoin(Subject, SchoolClass.subject_id == Subject.id)
+            )
+            query = ScheduleService._filter(
+                query, db.bind.dialect.name, status, room_id, school_class_id, campus, day
+            )
+            query = query.order_by(Room.campus, Room.number, Schedule.start_time, Schedule.id)
+            result = await db.stream(query.execution_options(yield_per=batch_size))
+            async for partition in result.mappings().partitions():
+                yield [{**row, "id": str(row["id"])} for row in partition]
+
+    @staticmethod
+    async def ndjson(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+        """Um objeto JSON por linha; cada lote vira um bloco da resposta."""
+        async for rows in batches:
+            yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+    @staticmethod
+    async def csv(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+        """CSV com cabeçalho; os dias da semana vão em uma coluna, separados por espaço."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        async for rows in batches:
+            for row in rows:
+                writer.writerow({**row, "days_of_week": " ".join(str(day) for day in row["days_of_week"])})
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # Sem alocações, só o cabeçalho
+        if buffer.tell():
+            yield buffer.getvalue()
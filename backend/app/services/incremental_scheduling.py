@@ -0,0 +1,64 @@
+"""
+Seleção das turmas afetadas para o ensalamento incremental.
+
+Em vez de apagar e recalcular todas as propostas pending, o modo incremental realoca
+apenas as turmas atingidas por alterações desde a última execução. As demais propostas
+permanecem com suas linhas e ids e entram no motor como ocupação fixa.
+"""
+from dataclasses import dataclass, field
+from typing import Iterable, Set, Tuple
+from uuid import UUID
+
+from app.services.allocation_engine import ClassSpec
+
+
+@dataclass
+class ChangeSet:
+    rooms: Set[UUID] = field(default_factory=set)
+    classes: Set[UUID] = field(default_factory=set)
+    subjects: Set[UUID] = field(default_factory=set)
+    # Maior id do log lido; usado para consumir só o que foi tratado
+    last_id: int = 0
+
+    def add(self, entity: str, entity_id: UUID) -> None:
+        getattr(self, {"room": "rooms", "class": "classes", "subject": "subjects"}[entity]).add(entity_id)
+
+    def __bool__(self) -> bool:
+        return bool(self.rooms or self.classes or self.subjects)
+
+
+def affected_classes(
+    classes: Iterable[ClassSpec],
+    active_room_ids: Set[UUID],
+    pending: Iterable[Tuple[UUID, UUID]],
+    changes: ChangeSet,
+) -> Set[UUID]:
+    """
+    Turmas que precisam ser realocadas, dado o par (turma, sala) de cada proposta pending:
+
+    - turmas sem proposta pending (novas ou rejeitadas);
+    - turmas alteradas ou cuja disciplina foi alterada;
+    - turmas em salas alteradas, desativadas ou removidas;
+    - todo o grupo cooperativo de qualquer turma afetada, para manter o agrupamento.
+    """
+    classes = list(classes)
+    rooms_by_class = {}
+    for class_id, room_id in pending:
+        rooms_by_class.setdefault(class_id, set()).add(room_id)
+
+    affected: Set[UUID] = set()
+    for spec in classes:
+        rooms = rooms_by_class.get(spec.id)
+        if (
+            not rooms
+            or spec.id in changes.classes
+            or (spec.subject_id is not None and spec.subject_id in changes.subjects)
+            or any(room_id in changes.rooms or room_id not in active_room_ids for room_id in rooms)
+        ):
+            affected.add(spec.id)
+
+    affected_groups = {spec.group_key for spec in classes if spec.id in affected and spec.group_key is not None}
+    for spec in classes:
+        if spec.group_key in affected_groups:
+            affected.add(spec.id)
+    return affected
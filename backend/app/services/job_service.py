@@ -0,0 +1,192 @@
+"""
+Execução do ensalamento automático como job em segundo plano.
+
+O endpoint só registra o job e devolve seu id. O job chama ScheduleService.generate,
+que mantém o single-flight e a execução única por processo: a leitura do snapshot,
+o cálculo no pool de processos (ou threads) fora do event loop e a gravação quando o
+cálculo termina. Nenhuma conexão do pool fica presa durante o cálculo.
+"""
+import asyncio
+import datetime
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from app.db.session import AsyncSessionLocal
+from app.services.allocation_engine import ALGORITHMS, AllocationResult
+from app.services.schedule_service import ScheduleService
+
+logger = logging.getLogger(__name__)
+
+# Jobs finalizados mantidos em memória para consulta
+MAX_FINISHED_JOBS = 100
+# Progresso ao entrar em cada fase de ScheduleService.generate
+PHASE_PROGRESS = {"loading": 0.1, "solving": 0.3, "persisting": 0.9}
+
+
+@dataclass
+class SchedulingJob:
+    id: uuid.UUID
+    algorithm: str
+    mode: str
+    time_budget_ms: int
+    partition_by: Optional[str] = None
+    portfolio: int = 0
+    seed: int = 0
+    force: bool = False
+    state: str = "queued"  # queued, running, succeeded, failed
+    phase: Optional[str] = None  # loading, solving, persisting
+    progress: float = 0.0
+    submitted_at: datetime.datetime = field(
+        default_factory=lambda: datetime.datetime.now(datetime.timezone.utc)
+    )
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    metrics: Optional[Dict[str, Any]] = None
+    infeasible: List[Dict[str, Any]] = field(default_factory=list)
+    # Entradas inalteradas desde a última execução: nada foi recalculado
+    memoized: bool = False
+    run_id: Optional[int] = None
+    # Resumo da execução (ver AutoScheduleSummary)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state in ("succeeded", "failed")
+
+    @property
+    def request_key(self) -> tuple:
+        return (self.algorithm, self.mode, self.time_budget_ms, self.partition_by,
+                self.portfolio, self.seed, self.force)
+
+
+_jobs: "OrderedDict[uuid.UUID, SchedulingJob]" = OrderedDict()
+_tasks: Dict[uuid.UUID, asyncio.Task] = {}
+
+
+class JobService:
+    @staticmethod
+    def submit(
+        algorithm: str = "greedy",
+        mode: str = "full",
+        time_budget_ms: int = 0,
+        partition_by: Optional[str] = None,
+        portfolio: int = 0,
+        seed: int = 0,
+        force: bool = False,
+        session_factory: Callable = AsyncSessionLocal,
+    ) -> SchedulingJob:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Algoritmo deve ser um de: {', '.join(ALGORITHMS)}")
+        if partition_by and portfolio:
+            raise ValueError("partition_by e portfolio não podem ser combinados")
+
+        job = SchedulingJob(
+            id=uuid.uuid4(),
+            algorithm=algorithm,
+            mode=mode,
+            time_budget_ms=time_budget_ms,
+            partition_by=partition_by,
+            portfolio=portfolio,
+            seed=seed,
+            force=force,
+        )
+        # Um pedido idêntico ainda em andamento devolve o mesmo job (generate também
+        # compartilha a execução com chamadas diretas de mesmos parâmetros)
+        for existing in _jobs.values():
+            if not existing.is_finished and existing.request_key == job.request_key:
+                return existing
+
+        _jobs[job.id] = job
+        JobService._prune()
+        # Guardar a referência evita que a task seja coletada antes de terminar
+        task = asyncio.create_task(JobService._run(job, session_factory))
+        _tasks[job.id] = task
+        task.add_done_callback(lambda _: _tasks.pop(job.id, None))
+        return job
+
+    @staticmethod
+    def get(job_id: uuid.UUID) -> Optional[SchedulingJob]:
+        return _jobs.get(job_id)
+
+    @staticmethod
+    async def wait(job_id: uuid.UUID) -> Optional[SchedulingJob]:
+        task = _tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return _jobs.get(job_id)
+
+    @staticmethod
+    def _prune() -> None:
+        finished = [job_id for job_id, job in _jobs.items() if job.is_finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _jobs[job_id]
+
+    @staticmethod
+    def summarize(result: AllocationResult) -> Dict[str, Any]:
+        """Resumo enxuto da execução, sem reidratar as alocações."""
+        return {
+            "algorithm": result.algorithm,
+            "created": len(result.assignments),
+            "reused": result.reused,
+            "metrics": asdict(result.metrics),
+            "baseline": asdict(result.baseline) if result.baseline else None,
+            "conflicts_removed": result.search.conflicts_removed if result.search else None,
+            "seed": result.seed,
+            "variants": result.variants,
+            "infeasible": [asdict(group) for group in result.infeasible],
+            "memoized": result.memoized,
+            "run_id": result.run_id,
+            "report": result.report.as_dict() if result.run_id else None,
+        }
+
+    @staticmethod
+    def _enter_phase(job: SchedulingJob, phase: Optional[str], clock: float) -> float:
+        now = time.perf_counter()
+        if job.phase is not None:
+            job.timings_ms[job.phase] = round((now - clock) * 1000, 1)
+        job.phase = phase
+        job.progress = PHASE_PROGRESS.get(phase, 1.0)
+        return now
+
+    @staticmethod
+    async def _run(job: SchedulingJob, session_factory: Callable) -> None:
+        # O job fica "queued" até a primeira fase: generate roda uma execução por vez no processo
+        clock = started = time.perf_counter()
+
+        def on_phase(phase: str) -> None:
+            nonlocal clock
+            if job.state == "queued":
+                job.state = "running"
+                job.started_at = datetime.datetime.now(datetime.timezone.utc)
+                clock = time.perf_counter()
+            clock = JobService._enter_phase(job, phase, clock)
+
+        try:
+            async with session_factory() as db:
+                result = await ScheduleService.generate(
+                    db, job.algorithm, job.time_budget_ms, incremental=job.mode == "incremental",
+                    partition_by=job.partition_by, portfolio=job.portfolio, seed=job.seed,
+                    force=job.force, on_phase=on_phase,
+                )
+            JobService._enter_phase(job, None, clock)
+            job.metrics = asdict(result.metrics)
+            job.infeasible = [asdict(group) for group in result.infeasible]
+            job.memoized = result.memoized
+            job.run_id = result.run_id
+            job.result = JobService.summarize(result)
+            job.state = "succeeded"
+        except Exception as e:
+            logger.exception("Falha no job de ensalamento %s", job.id)
+            if job.phase is not None:
+                job.timings_ms[job.phase] = round((time.perf_counter() - clock) * 1000, 1)
+            job.state = "failed"
+            job.error = str(e)
+        finally:
+            job.timings_ms["total"] = round((time.perf_counter() - started) * 1000, 1)
+            job.finished_at = datetime.datetime.now(datetime.timezone.utc)
@@ -0,0 +1,255 @@
+"""
+Fase de melhoria por busca local (simulated annealing) sobre um plano já gerado.
+
+O plano é visto como turmas distribuídas em "bins" (sala, padrão de horário). O custo
+de um bin depende só da sua carga, do número de turmas e da capacidade, então mover
+uma turma ou trocar duas turmas de posição altera apenas dois bins: o delta de cada
+movimento é calculado em O(1), sem reavaliar o plano inteiro.
+
+A busca roda até estourar o orçamento de tempo e devolve o melhor plano visto. O melhor
+plano não é copiado a cada melhora: os movimentos feitos desde ele ficam em um diário e
+são desfeitos no fim (ou quando o diário passa do tamanho do plano), em O(1) amortizado
+por movimento.
+"""
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from app.services.allocation_engine import (
+    Assignment, SchedulingSnapshot, build_engine, evaluate_plan, room_accepts
+)
+
+# Pesos do objetivo: cada turma em sala superlotada pesa mais que qualquer desperdício
+CONFLICT_ROW_WEIGHT = 10000
+OVERCAPACITY_SEAT_WEIGHT = 100
+# Probabilidade de tentar troca (swap) em vez de movimento simples
+SWAP_PROBABILITY = 0.3
+# Frequência da checagem de tempo, em iterações
+CLOCK_CHECK_INTERVAL = 256
+
+
+@dataclass(frozen=True)
+class SearchStats:
+    iterations: int
+    elapsed_ms: float
+    conflicts_before: int
+    conflicts_after: int
+
+    @property
+    def conflicts_removed(self) -> int:
+        return self.conflicts_before - self.conflicts_after
+
+
+def bin_cost(load: int, rows: int, capacity: int) -> int:
+    if rows == 0:
+        return 0
+    if load > capacity:
+        return CONFLICT_ROW_WEIGHT * rows + OVERCAPACITY_SEAT_WEIGHT * (load - capacity)
+    return capacity - load
+
+
+class _SearchState:
+    """Estado mutável da busca: bin de cada turma, carga e membros de cada bin."""
+
+    def __init__(self, snapshot: SchedulingSnapshot, assignments: List[Assignment]):
+        engine = build_engine(snapshot)
+        grid = engine.grid
+        self.n_patterns = len(grid.patterns)
+        n_bins = len(engine.rooms) * self.n_patterns
+
+        self.assignments = assignments
+        self.capacity = [0] * n_bins
+        self.load = [0] * n_bins
+        self.room_type = [None] * n_bins
+        for rank, room in enumerate(engine.rooms):
+            for p in range(self.n_patterns):
+                b = rank * self.n_patterns + p
+                self.capacity[b] = room.capacity
+                self.room_type[b] = room.room_type
+                # Carga base: ocupação já aprovada nas células do padrão
+                self.load[b] = engine.load_at((rank, p))
+
+        # Padrões que compartilham células não podem coexistir na mesma sala
+        self.overlaps = [
+            [q for q in range(self.n_patterns)
+             if q != p and grid.pattern_masks[p] & grid.pattern_masks[q]]
+            for p in range(self.n_patterns)
+        ]
+
+        specs = {spec.id: spec for spec in snapshot.classes}
+        self.students: List[int] = []
+        self.required: List = []
+        self.where: List[int] = []
+        self.members: List[List[int]] = [[] for _ in range(n_bins)]
+        self.slot_in_bin: List[int] = []
+        for i, assignment in enumerate(assignments):
+            spec = specs[assignment.school_class_id]
+            rank, p = engine.slot_of(assignment)
+            b = rank * self.n_patterns + p
+            self.students.append(spec.students_count)
+            self.required.append(spec.required_room_type)
+            self.where.append(b)
+            self.slot_in_bin.append(len(self.members[b]))
+            self.members[b].append(i)
+            self.load[b] += spec.students_count
+
+        # Alvos de movimento: só salas compatíveis com o tipo exigido pela turma
+        self.candidates: List[List[int]] = [
+            engine.feasibility.ranks(required) for required in self.required
+        ]
+        self.rooms = engine.rooms
+        self.patterns = grid.patterns
+        self.overloaded: List[int] = []
+        self.overloaded_pos = {}
+        for b in range(n_bins):
+            self._refresh_overloaded(b)
+
+    def cost(self, b: int, extra_load: int = 0, extra_rows: int = 0) -> int:
+        return bin_cost(self.load[b] + extra_load, len(self.members[b]) + extra_rows, self.capacity[b])
+
+    def total_cost(self) -> int:
+        return sum(self.cost(b) for b in range(len(self.load)))
+
+    def accepts(self, i: int, b: int) -> bool:
+        if not room_accepts(self.required[i], self.room_type[b]):
+            return False
+        # Outro padrão sobreposto já em uso na mesma sala
+        base = b - b % self.n_patterns
+        for q in self.overlaps[b % self.n_patterns]:
+            members = self.members[base + q]
+            if members and not (len(members) == 1 and members[0] == i):
+                return False
+        return True
+
+    def _refresh_overloaded(self, b: int) -> None:
+        is_over = bool(self.members[b]) and self.load[b] > self.capacity[b]
+        if is_over and b not in self.overloaded_pos:
+            self.overloaded_pos[b] = len(self.overloaded)
+            self.overloaded.append(b)
+        elif not is_over and b in self.overloaded_pos:
+            idx = self.overloaded_pos.pop(b)
+            last = self.overloaded.pop()
+            if last != b:
+                self.overloaded[idx] = last
+                self.overloaded_pos[last] = idx
+
+    def move(self, i: int, target: int) -> None:
+        source = self.where[i]
+        members = self.members[source]
+        idx = self.slot_in_bin[i]
+        last = members.pop()
+        if last != i:
+            members[idx] = last
+            self.slot_in_bin[last] = idx
+        self.load[source] -= self.students[i]
+
+        self.slot_in_bin[i] = len(self.members[target])
+        self.members[target].append(i)
+        self.load[target] += self.students[i]
+        self.where[i] = target
+
+        self._refresh_overloaded(source)
+        self._refresh_overloaded(target)
+
+    def to_assignments(self, where: List[int]) -> List[Assignment]:
+        return [
+            Assignment(
+                assignment.school_class_id,
+                self.rooms[b // self.n_patterns].id,
+                self.patterns[b % self.n_patterns],
+            )
+            for assignment, b in zip(self.assignments, where)
+        ]
+
+
+def _undo(where: List[int], journal: List[Tuple[int, int]]) -> List[int]:
+    """Cópia de where com os movimentos do diário desfeitos, do último ao primeiro."""
+    where = list(where)
+    for i, previous in reversed(journal):
+        where[i] = previous
+    return where
+
+
+def improve(
+    snapshot: SchedulingSnapshot,
+    assignments: List[Assignment],
+    time_budget_ms: int,
+    seed: int = 0,
+) -> Tuple[List[Assignment], SearchStats]:
+    """Simulated annealing com orçamento de tempo; retorna o melhor plano encontrado."""
+    started = time.perf_counter()
+    state = _SearchState(snapshot, assignments)
+    n_classes, n_bins = len(state.students), len(state.load)
+    conflicts_before = evaluate_plan(snapshot, assignments).overcapacity_rows
+    if n_classes == 0 or n_bins < 2 or time_budget_ms <= 0:
+        return assignments, SearchStats(0, 0.0, conflicts_before, conflicts_before)
+
+    rng = random.Random(seed)
+    deadline = started + time_budget_ms / 1000.0
+    current = best = state.total_cost()
+    # best_where é None enquanto o melhor plano é o atual com o diário desfeito
+    best_where: Optional[List[int]] = None
+    journal: List[Tuple[int, int]] = []  # (turma, bin anterior) desde o melhor plano
+    # Temperatura inicial na escala de uma turma média; resfriamento linear no tempo
+    initial_temperature = max(1.0, sum(state.students) / n_classes)
+    temperature = initial_temperature
+    iterations = 0
+
+    while True:
+        if iterations % CLOCK_CHECK_INTERVAL == 0:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            temperature = initial_temperature * max(1e-3, (deadline - now) / (deadline - started))
+        iterations += 1
+
+        # Foco nos conflitos: metade das vezes parte de uma turma em bin superlotado
+        if state.overloaded and rng.random() < 0.5:
+            members = state.members[rng.choice(state.overloaded)]
+            i = members[rng.randrange(len(members))]
+        else:
+            i = rng.randrange(n_classes)
+        a = state.where[i]
+        s_i = state.students[i]
+
+        if rng.random() < SWAP_PROBABILITY:
+            j = rng.randrange(n_classes)
+            b = state.where[j]
+            if a == b or not state.accepts(i, b) or not state.accepts(j, a):
+                continue
+            diff = state.students[j] - s_i
+            delta = (state.cost(a, diff) - state.cost(a)) + (state.cost(b, -diff) - state.cost(b))
+        else:
+            j = None
+            candidates = state.candidates[i]
+            b = candidates[rng.randrange(len(candidates))] * state.n_patterns + rng.randrange(state.n_patterns)
+            if a == b or not state.accepts(i, b):
+                continue
+            delta = (state.cost(a, -s_i, -1) - state.cost(a)) + (state.cost(b, s_i, 1) - state.cost(b))
+
+        if delta > 0 and rng.random() >= math.exp(-delta / temperature):
+            continue
+
+        state.move(i, b)
+        if j is not None:
+            state.move(j, a)
+        current += delta
+        if current < best:
+            best = current
+            best_where = None
+            journal.clear()
+        elif best_where is None:
+            journal.append((i, a))
+            if j is not None:
+                journal.append((j, b))
+            # Diário maior que o plano: materializa o melhor plano, custo diluído nos movimentos
+            if len(journal) > n_classes:
+                best_where = _undo(state.where, journal)
+                journal.clear()
+
+    improved = state.to_assignments(best_where if best_where is not None else _undo(state.where, journal))
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    conflicts_after = evaluate_plan(snapshot, improved).overcapacity_rows
+    return improved, SearchStats(iterations, round(elapsed_ms, 1), conflicts_before, conflicts_after)
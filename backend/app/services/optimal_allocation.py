@@ -0,0 +1,114 @@
+"""
+Modo de alocação "optimal": atribuição de custo mínimo entre grupos e salas.
+
+Cada grupo cooperativo (turmas da mesma disciplina e mês) é uma linha e cada
+posição livre (sala, padrão de horário) é uma coluna de uma matriz de custo NumPy.
+O custo combina assentos desperdiçados e penalidade de superlotação. O tipo de sala é
+restrição: pares com tipo incompatível recebem um custo maior que o de qualquer
+atribuição só com pares compatíveis, então o solver só os escolhe quando não há
+alternativa (e esses grupos seguem para o guloso). A matriz é resolvida como um
+problema de atribuição (scipy.optimize.linear_sum_assignment, tempo polinomial).
+
+Grupos sem coluna (mais grupos que posições) ou cuja melhor posição não comporta o
+grupo seguem para o guloso do AllocationEngine, que desmembra e compartilha salas.
+"""
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from app.services.allocation_engine import (
+    AllocationEngine, Assignment, ClassSpec, build_allocation_queue, room_accepts
+)
+
+# Pesos por assento: superlotar é muito pior que desperdiçar
+OVERCAPACITY_PENALTY = 1000.0
+
+# Códigos de exigência de tipo por grupo (os demais são tipos de sala)
+ANY_TYPE = -1
+CONFLICTING_TYPES = -2
+
+
+def _requirement(types: Set[str], codes: Dict[str, int]) -> int:
+    if not types:
+        return ANY_TYPE
+    if len(types) > 1:
+        return CONFLICTING_TYPES
+    # Tipo exigido que nenhuma sala oferece: só salas sem tipo servem
+    return codes.get(next(iter(types)), CONFLICTING_TYPES)
+
+
+def build_cost_matrix(
+    demands: np.ndarray,
+    required_types: List[Set[str]],
+    capacities: np.ndarray,
+    room_types: List,
+) -> np.ndarray:
+    """
+    Matriz grupos x posições com desperdício e superlotação. required_types traz, por
+    grupo, os tipos exigidos pelas suas turmas; sala sem tipo aceita qualquer grupo.
+    """
+    diff = capacities[None, :] - demands[:, None]
+    cost = np.where(diff >= 0, diff, -diff * OVERCAPACITY_PENALTY).astype(np.float64)
+
+    # Tipos codificados como inteiros; grupo com turmas de tipos diferentes só cabe em sala sem tipo
+    codes = {t: i for i, t in enumerate({t for t in room_types if t is not None})}
+    required = np.array([_requirement(types, codes) for types in required_types], dtype=np.int64)
+    offered = np.array([codes.get(t, ANY_TYPE) for t in room_types], dtype=np.int64)
+    incompatible = (
+        (required[:, None] != ANY_TYPE)
+        & (offered[None, :] != ANY_TYPE)
+        & (required[:, None] != offered[None, :])
+    )
+    if incompatible.any():
+        # Um único par incompatível custa mais que qualquer atribuição só de pares compatíveis
+        infeasible = cost[~incompatible].max(initial=0.0) * len(demands) + 1.0
+        cost[incompatible] = infeasible
+    return cost
+
+
+def allocate_optimal(engine: AllocationEngine, classes: Iterable[ClassSpec]) -> List[Assignment]:
+    groups = []
+    deferred: List[ClassSpec] = []
+    for group in build_allocation_queue(classes):
+        # Grupos com turma sem sala compatível não viram linha; o guloso descarta só essa turma
+        if all(engine.feasibility.ranks(spec.required_room_type) for spec in group):
+            groups.append(group)
+        else:
+            deferred.extend(group)
+    slots = engine.free_slots()
+    if not engine.rooms:
+        return []
+
+    assignments: List[Assignment] = []
+
+    if slots and groups:
+        demands = np.array([sum(c.students_count for c in group) for group in groups], dtype=np.int64)
+        required_types = [
+            {c.required_room_type for c in group if c.required_room_type is not None} for group in groups
+        ]
+        capacities = np.array([engine.rooms[rank].capacity for rank, _ in slots], dtype=np.int64)
+        room_types = [engine.rooms[rank].room_type for rank, _ in slots]
+
+        cost = build_cost_matrix(demands, required_types, capacities, room_types)
+        rows, cols = linear_sum_assignment(cost)
+        matched = dict(zip(rows.tolist(), cols.tolist()))
+    else:
+        demands = None
+        matched = {}
+
+    for g, group in enumerate(groups):
+        col = matched.get(g)
+        if col is not None:
+            slot = slots[col]
+            # Par incompatível (faltaram posições compatíveis) ou padrões sobrepostos
+            # disputando a mesma sala: revalida antes de aplicar
+            if (capacities[col] >= demands[g] and engine.is_free(slot)
+                    and all(room_accepts(spec.required_room_type, room_types[col]) for spec in group)):
+                assignments.extend(engine.place(spec, slot) for spec in group)
+                continue
+        deferred.extend(group)
+
+    if deferred:
+        assignments.extend(engine.allocate(deferred))
+    return assignments
@@ -0,0 +1,186 @@
+"""
+Detecção de dupla reserva: alocações na mesma sala, no mesmo dia, com faixas de
+horário que se sobrepõem.
+
+Cada alocação vira um intervalo por dia da semana. Os intervalos de cada (sala, dia)
+são ordenados pelo início e varridos uma vez (sweep line), com um heap dos términos
+ativos: o custo é O(n log n) e cada grupo de intervalos encadeados (cluster) sai com o
+pico de alunos simultâneos, que é comparado com a capacidade da sala.
+
+O compartilhamento de sala é permitido (alocação cooperativa), então a severidade
+depende da ocupação combinada: "Alta" se passa da capacidade, "Média" acima de 90% e
+"Baixa" quando as turmas cabem juntas.
+"""
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.services.allocation_engine import to_minutes
+
+SEVERITY_HIGH = "Alta"
+SEVERITY_MEDIUM = "Média"
+SEVERITY_LOW = "Baixa"
+SEVERITY_ORDER = {SEVERITY_HIGH: 0, SEVERITY_MEDIUM: 1, SEVERITY_LOW: 2}
+# Mesmo limiar de "sala quase cheia" do frontend
+NEAR_FULL_RATIO = 0.9
+
+
+@dataclass(frozen=True)
+class BookedInterval:
+    """Ocupação de uma sala em um dia, em minutos desde 00:00 (intervalo [start, end))."""
+    schedule_id: Optional[UUID]
+    room_id: UUID
+    day: int
+    start: int
+    end: int
+    students: int
+
+
+@dataclass
+class OverlapConflict:
+    room_id: UUID
+    schedule_ids: Tuple[UUID, ...]
+    days: List[int]
+    # Janela coberta pelos intervalos sobrepostos
+    start: int
+    end: int
+    peak_students: int
+    capacity: int
+    severity: str
+
+
+def expand(schedule_id: Optional[UUID], room_id: UUID, days_of_week: Optional[Iterable[int]],
+           start_time: str, end_time: str, students: int) -> List[BookedInterval]:
+    """Um intervalo por dia; horários inválidos ou vazios não ocupam a sala."""
+    try:
+        start, end = to_minutes(start_time), to_minutes(end_time)
+    except (AttributeError, ValueError):
+        return []
+    if end <= start:
+        return []
+    return [
+        BookedInterval(schedule_id, room_id, day, start, end, students or 0)
+        for day in sorted(set(days_of_week or []))
+    ]
+
+
+def severity(peak_students: int, capacity: int) -> str:
+    if peak_students > capacity:
+        return SEVERITY_HIGH
+    if peak_students > capacity * NEAR_FULL_RATIO:
+        return SEVERITY_MEDIUM
+    return SEVERITY_LOW
+
+
+def _sweep(intervals: Sequence[BookedInterval]) -> Iterator[Tuple[List[BookedInterval], int]]:
+    """Clusters de intervalos encadeados (ordenados pelo início) e o pico de alunos de cada um."""
+    cluster: List[BookedInterval] = []
+    cluster_end = 0
+    active: List[Tuple[int, int]] = []  # (término, alunos)
+    load = peak = 0
+    for interval in intervals:
+        if cluster and interval.start >= cluster_end:
+            yield cluster, peak
+            cluster, peak = [], 0
+        # Intervalos que terminam antes deste começar saem do conjunto ativo
+        while active and active[0][0] <= interval.start:
+            load -= heapq.heappop(active)[1]
+        heapq.heappush(active, (interval.end, interval.students))
+        load += interval.students
+        peak = max(peak, load)
+        cluster.append(interval)
+        cluster_end = max(cluster_end, interval.end)
+    if cluster:
+        yield cluster, peak
+
+
+def _sort_key(conflict: OverlapConflict) -> tuple:
+    return (
+        SEVERITY_ORDER[conflict.severity],
+        conflict.capacity - conflict.peak_students,
+        str(conflict.room_id),
+        conflict.start,
+    )
+
+
+def find_overlaps(intervals: Iterable[BookedInterval], capacities: Dict[UUID, int]) -> List[OverlapConflict]:
+    """
+    Sobreposições de todas as salas, das mais graves para as mais leves. O mesmo
+    conjunto de alocações sobreposto em vários dias vira um único conflito.
+    """
+    by_room_day: Dict[Tuple[UUID, int], List[BookedInterval]] = defaultdict(list)
+    for interval in intervals:
+        by_room_day[(interval.room_id, interval.day)].append(interval)
+
+    merged: Dict[tuple, OverlapConflict] = {}
+    for (room_id, day), room_intervals in by_room_day.items():
+        if len(room_intervals) < 2:
+            continue
+        room_intervals.sort(key=lambda interval: (interval.start, interval.end))
+        for cluster, peak in _sweep(room_intervals):
+            if len(cluster) < 2:
+                continue
+            ids = tuple(sorted({interval.schedule_id for interval in cluster}, key=str))
+            start = cluster[0].start
+            end = max(interval.end for interval in cluster)
+            key = (room_id, ids, start, end)
+            conflict = merged.get(key)
+            if conflict is None:
+                capacity = capacities.get(room_id, 0)
+                merged[key] = OverlapConflict(room_id, ids, [day], start, end, peak, capacity, "")
+            else:
+                conflict.days.append(day)
+                conflict.peak_students = max(conflict.peak_students, peak)
+
+    conflicts = list(merged.values())
+    for conflict in conflicts:
+        conflict.days.sort()
+        conflict.severity = severity(conflict.peak_students, conflict.capacity)
+    conflicts.sort(key=_sort_key)
+    return conflicts
+
+
+def check_candidate(candidate: Sequence[BookedInterval], existing: Iterable[BookedInterval],
+                    capacity: int) -> Optional[OverlapConflict]:
+    """
+    Verificação incremental de uma única alocação (nova ou editada) contra as já
+    existentes na sala, sem recalcular as demais. None se não há sobreposição.
+    """
+    if not candidate:
+        return None
+    by_day: Dict[int, List[BookedInterval]] = defaultdict(list)
+    for interval in existing:
+        by_day[interval.day].append(interval)
+
+    ids = set()
+    days = []
+    peak = 0
+    for own in candidate:
+        overlapping = [
+            interval for interval in by_day.get(own.day, [])
+            if interval.start < own.end and interval.end > own.start
+        ]
+        if not overlapping:
+            continue
+        days.append(own.day)
+        ids.update(interval.schedule_id for interval in overlapping)
+        intervals = sorted(overlapping + [own], key=lambda interval: (interval.start, interval.end))
+        peak = max(peak, max(cluster_peak for _, cluster_peak in _sweep(intervals)))
+
+    if not days:
+        return None
+    # A candidata entra no conflito mesmo sem id (alocação nova: schedule_id=None)
+    own = candidate[0]
+    ids.add(own.schedule_id)
+    return OverlapConflict(
+        room_id=own.room_id,
+        schedule_ids=tuple(sorted(ids, key=str)),
+        days=days,
+        start=own.start,
+        end=own.end,
+        peak_students=peak,
+        capacity=capacity,
+        severity=severity(peak, capacity),
+    )
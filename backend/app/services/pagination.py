@@ -0,0 +1,75 @@
+"""
+Paginação por cursor (keyset) das listagens.
+
+A página seguinte começa depois da última linha devolvida, comparando as colunas de
+ordenação (sempre terminadas por uma coluna única, como o id) em vez de usar OFFSET:
+o custo não cresce com a página e inserções ou remoções não duplicam nem pulam linhas.
+O cursor é opaco para o cliente: os valores dessas colunas em JSON, em base64 url-safe.
+"""
+import base64
+import datetime
+import json
+import uuid
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime.datetime) else str(value) for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Valores do cursor convertidos para o tipo de cada coluna; ValueError se inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [_load(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+
+
+def _load(column: Any, value: str) -> Any:
+    python_type = column.type.python_type
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    if python_type is datetime.datetime:
+        return datetime.datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def paginate(query, columns: Sequence[Any], cursor: Optional[str] = None,
+             limit: Optional[int] = None, descending: bool = False):
+    """
+    Ordena a consulta pelas colunas e aplica o cursor e o limite. Sem cursor,
+    começa do início; sem limite (uso interno), devolve todas as linhas restantes.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        # (c1, c2) > (v1, v2) expandido, portável entre bancos sem comparação de tuplas
+        branches = []
+        for i, column in enumerate(columns):
+            after = column < values[i] if descending else column > values[i]
+            branches.append(and_(*[columns[j] == values[j] for j in range(i)], after))
+        query = query.filter(or_(*branches))
+    query = query.order_by(*[column.desc() if descending else column for column in columns])
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def split_page(items: Sequence[Any], columns: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Separa a página (consultada com limit + 1 linhas) e o cursor da seguinte. A linha
+    extra só indica que há mais; sem ela, a página é a última e o cursor é None.
+    """
+    if len(items) <= limit:
+        return list(items), None
+    page = list(items[:limit])
+    last = page[-1]
+    if isinstance(last, dict):
+        return page, encode_cursor([last[column.key] for column in columns])
+    return page, encode_cursor([getattr(last, column.key) for column in columns])
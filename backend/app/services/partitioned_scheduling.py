@@ -0,0 +1,124 @@
+"""
+Ensalamento particionado: salas e turmas são divididas por uma chave (ex.: campus) e
+cada partição é resolvida em paralelo em um pool de processos.
+
+As partições trafegam como SchedulingSnapshot (dataclasses com UUIDs e strings), que
+são serializáveis por pickle, nunca como objetos ORM. Turmas sem chave, ou cuja chave
+não tem salas (ou nenhuma sala do tipo exigido), são resolvidas depois, contra todas
+as salas, com a ocupação das partições já registrada.
+"""
+import asyncio
+from collections import defaultdict
+from concurrent.futures import Executor
+from dataclasses import replace
+from typing import Dict, Hashable, List, Tuple
+
+from app.services.allocation_engine import (
+    AllocationResult, ClassSpec, Reservation, SchedulingSnapshot, evaluate_plan, room_accepts, solve
+)
+from app.services.run_report import RunReport
+
+PARTITION_KEYS = ("campus",)
+
+
+def partition_snapshot(
+    snapshot: SchedulingSnapshot, key: str = "campus"
+) -> Tuple[List[SchedulingSnapshot], List[ClassSpec]]:
+    """Divide o snapshot por `key` (atributo de RoomSpec e ClassSpec); retorna (partições, turmas residuais)."""
+    if key not in PARTITION_KEYS:
+        raise ValueError(f"Chave de partição deve ser uma de: {', '.join(PARTITION_KEYS)}")
+
+    rooms: Dict[Hashable, list] = defaultdict(list)
+    room_partition = {}
+    for room in snapshot.rooms:
+        value = getattr(room, key)
+        rooms[value].append(room)
+        room_partition[room.id] = value
+
+    # Tipos de sala presentes em cada partição, para descartar partições sem sala compatível
+    room_types = {value: {room.room_type for room in part} for value, part in rooms.items()}
+
+    classes: Dict[Hashable, list] = defaultdict(list)
+    residual: List[ClassSpec] = []
+    for spec in snapshot.classes:
+        value = getattr(spec, key)
+        if value is None or not any(
+            room_accepts(spec.required_room_type, offered) for offered in room_types.get(value, ())
+        ):
+            residual.append(spec)
+        else:
+            classes[value].append(spec)
+
+    reservations: Dict[Hashable, list] = defaultdict(list)
+    for reservation in snapshot.reservations:
+        if reservation.room_id in room_partition:
+            reservations[room_partition[reservation.room_id]].append(reservation)
+
+    partitions = [
+        SchedulingSnapshot(
+            rooms=rooms[value],
+            classes=classes[value],
+            reservations=reservations[value],
+            patterns=snapshot.patterns,
+        )
+        for value in sorted(classes, key=str)
+    ]
+    return partitions, residual
+
+
+async def solve_partitioned(
+    snapshot: SchedulingSnapshot,
+    executor: Executor,
+    algorithm: str = "greedy",
+    time_budget_ms: int = 0,
+    key: str = "campus",
+) -> AllocationResult:
+    """Resolve as partições em paralelo e junta os planos em um único resultado."""
+    partitions, residual = partition_snapshot(snapshot, key)
+
+    loop = asyncio.get_running_loop()
+    results: List[AllocationResult] = await asyncio.gather(*[
+        loop.run_in_executor(executor, solve, part, algorithm, time_budget_ms)
+        for part in partitions
+    ])
+    assignments = [a for result in results for a in result.assignments]
+
+    if residual:
+        # Turmas sem partição: todas as salas, com a ocupação já decidida pelas partições
+        specs = {spec.id: spec for spec in snapshot.classes}
+        taken = [
+            Reservation(a.room_id, a.pattern.days_of_week, a.pattern.start_time,
+                        a.pattern.end_time, specs[a.school_class_id].students_count)
+            for a in assignments
+        ]
+        rest = SchedulingSnapshot(
+            rooms=snapshot.rooms,
+            classes=residual,
+            reservations=snapshot.reservations + taken,
+            patterns=snapshot.patterns,
+        )
+        rest_result = await loop.run_in_executor(executor, solve, rest, algorithm, time_budget_ms)
+        results.append(rest_result)
+        assignments.extend(rest_result.assignments)
+
+    merged = AllocationResult(
+        algorithm, assignments, evaluate_plan(snapshot, assignments),
+        infeasible=[group for result in results for group in result.infeasible],
+        # Tempos somados entre os workers (tempo de CPU, não de relógio)
+        report=RunReport.combine(result.report for result in results),
+    )
+    merged.report.count(partitions=len(partitions), residual_classes=len(residual))
+    if algorithm != "greedy":
+        baseline = await loop.run_in_executor(executor, solve, snapshot, "greedy")
+        merged.baseline = baseline.metrics
+
+    searches = [result.search for result in results if result.search is not None]
+    if searches:
+        merged.search = replace(
+            searches[0],
+            iterations=sum(s.iterations for s in searches),
+            elapsed_ms=max(s.elapsed_ms for s in searches),
+            conflicts_before=sum(s.conflicts_before for s in searches),
+            conflicts_after=merged.metrics.overcapacity_rows,
+        )
+    return merged
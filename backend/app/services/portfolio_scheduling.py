@@ -0,0 +1,47 @@
+"""
+Modo portfólio: N variantes do alocador (ordens de fila e desempates diferentes,
+definidas pela seed) rodam ao mesmo tempo no pool e o plano de melhor placar vence.
+
+O placar é (turmas em superlotação, assentos desperdiçados); empates ficam com a menor
+seed. Sem busca local (time_budget_ms=0), o resultado é determinístico para um mesmo
+conjunto de seeds.
+"""
+import asyncio
+from concurrent.futures import Executor
+from typing import List, Sequence, Tuple
+
+from app.services.allocation_engine import AllocationResult, PlanMetrics, SchedulingSnapshot, solve
+
+
+def score(metrics: PlanMetrics) -> Tuple[int, int]:
+    return metrics.overcapacity_rows, metrics.total_waste
+
+
+async def solve_portfolio(
+    snapshot: SchedulingSnapshot,
+    executor: Executor,
+    seeds: Sequence[int],
+    algorithm: str = "greedy",
+    time_budget_ms: int = 0,
+) -> AllocationResult:
+    if not seeds:
+        raise ValueError("O portfólio precisa de pelo menos uma seed")
+
+    loop = asyncio.get_running_loop()
+    results: List[AllocationResult] = await asyncio.gather(*[
+        loop.run_in_executor(executor, solve, snapshot, algorithm, time_budget_ms, seed)
+        for seed in seeds
+    ])
+
+    best = min(results, key=lambda result: (score(result.metrics), result.seed))
+    best.variants = [
+        {
+            "seed": result.seed,
+            "overcapacity_rows": result.metrics.overcapacity_rows,
+            "total_waste": result.metrics.total_waste,
+            "elapsed_ms": result.search.elapsed_ms if result.search else None,
+        }
+        for result in results
+    ]
+    best.report.count(portfolio_variants=len(results))
+    return best
@@ -1,16 +1,62 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.models.models import Room
-from app.schemas.schemas import RoomCreate, RoomUpdate
-from typing import List, Optional
+from sqlalchemy import delete, insert, update
+from app.core.cache import cache
+from app.models.models import Room, RoomType, Schedule
+from app.schemas.batch_schemas import BatchRequest
+from app.schemas.schemas import RoomCreate, RoomInDB, RoomUpdate
+from app.services.batch import Batch
+from app.services.change_log_service import ChangeLogService
+from app.services.pagination import paginate
+from app.services.stats_service import StatsService
+from app.services.version_service import VersionService
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 class RoomService:
+    # Ordem estável das listagens: número da sala (único) e id
+    ORDER = (Room.number, Room.id)
+
     @staticmethod
-    async def get_all(db: AsyncSession) -> List[Room]:
-        result = await db.execute(select(Room))
+    async def get_all(
+        db: AsyncSession,
+        campus: Optional[str] = None,
+        building: Optional[str] = None,
+        block: Optional[str] = None,
+        type: Optional[RoomType] = None,
+        is_active: Optional[bool] = None,
+        min_capacity: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Room]:
+        """Salas filtradas no banco, paginadas por cursor (sem limit, todas as restantes)."""
+        query = select(Room)
+        if campus is not None:
+            query = query.filter(Room.campus == campus)
+        if building is not None:
+            query = query.filter(Room.building == building)
+        if block is not None:
+            query = query.filter(Room.block == block)
+        if type is not None:
+            query = query.filter(Room.type == type)
+        if is_active is not None:
+            query = query.filter(Room.is_active == is_active)
+        if min_capacity is not None:
+            query = query.filter(Room.capacity >= min_capacity)
+        result = await db.execute(paginate(query, RoomService.ORDER, cursor, limit))
         return result.scalars().all()
 
+    @staticmethod
+    async def get_all_cached(db: AsyncSession, version: Optional[str] = None, **filters: Any) -> List[RoomInDB]:
+        """
+        Lista (ou página) de salas servida do cache; invalidada pelas escritas de salas.
+        version (o ETag da resposta) entra na chave, para o conteúdo nunca ser mais
+        antigo que a versão anunciada.
+        """
+        async def load():
+            return [RoomInDB.model_validate(room) for room in await RoomService.get_all(db, **filters)]
+        return await cache.get_or_load("rooms", (version, tuple(sorted(filters.items()))), load)
+
     @staticmethod
     async def get_by_id(db: AsyncSession, room_id: UUID) -> Optional[Room]:
         result = await db.execute(select(Room).filter(Room.id == room_id))
@@ -20,7 +66,11 @@ class RoomService:
     async def create(db: AsyncSession, room_in: RoomCreate) -> Room:
         db_room = Room(**room_in.model_dump())
         db.add(db_room)
+        await db.flush()
+        await StatsService.add(db, rooms=Room.id == db_room.id)
+        await VersionService.bump(db, "rooms")
         await db.commit()
+        await cache.invalidate("rooms", "dashboard")
         await db.refresh(db_room)
         return db_room
 
@@ -31,10 +81,15 @@ class RoomService:
             return None
         
         update_data = room_in.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_room, field, value)
+        # Capacidade e bloco mudam os totais do bloco e os conflitos das alocações da sala
+        async with StatsService.track(db, rooms=Room.id == room_id, schedules=Schedule.room_id == room_id):
+            for field, value in update_data.items():
+                setattr(db_room, field, value)
+        ChangeLogService.record(db, "room", db_room.id)
             
+        await VersionService.bump(db, "rooms")
         await db.commit()
+        await cache.invalidate("rooms", "dashboard")
         await db.refresh(db_room)
         return db_room
 
@@ -44,6 +99,40 @@ class RoomService:
         if not db_room:
             return False
         
-        await db.delete(db_room)
+        async with StatsService.track(db, rooms=Room.id == room_id, schedules=Schedule.room_id == room_id):
+            await db.delete(db_room)
+        ChangeLogService.record(db, "room", room_id)
+        await VersionService.bump(db, "rooms")
         await db.commit()
+        await cache.invalidate("rooms", "dashboard")
         return True
+
+    @staticmethod
+    async def batch(db: AsyncSession, request: BatchRequest) -> Dict[str, Any]:
+        """Cria, altera e remove salas em lote, em uma única transação (ver app.services.batch)."""
+        batch = Batch(request, RoomCreate, RoomUpdate)
+        await batch.check_exists(db, Room, "Sala não encontrada")
+        await batch.check_unused(db, Schedule.room_id, "Sala possui alocações")
+        await batch.check_unique(db, Room, "number", "Já existe sala com o número '{value}'")
+        if not batch.writable():
+            return batch.results()
+
+        async with batch.write(db) as (creates, updates, deletes):
+            if deletes:
+                ids = [item.id for item in deletes]
+                async with StatsService.track(db, rooms=Room.id.in_(ids)):
+                    await db.execute(delete(Room).filter(Room.id.in_(ids)))
+                ChangeLogService.record(db, "room", *ids)
+            if updates:
+                ids = [item.id for item in updates]
+                rows = [item.values() for item in updates if item.data.model_fields_set]
+                async with StatsService.track(db, rooms=Room.id.in_(ids), schedules=Schedule.room_id.in_(ids)):
+                    if rows:
+                        await db.execute(update(Room), rows)
+                ChangeLogService.record(db, "room", *ids)
+            if creates:
+                await db.execute(insert(Room), [item.values() for item in creates])
+                await StatsService.add(db, rooms=Room.id.in_([item.id for item in creates]))
+            await VersionService.bump(db, "rooms")
+        await cache.invalidate("rooms", "dashboard")
+        return batch.results()
@@ -0,0 +1,45 @@
+"""
+Instrumentação do ensalamento: tempo por fase e contadores de uma execução.
+
+Puro Python e serializável, para poder ser preenchido também dentro dos workers do
+pool de processos e devolvido junto com o AllocationResult.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator
+
+
+class RunReport:
+    def __init__(self):
+        self.timings_ms: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Mede o bloco; fases repetidas acumulam."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000.0
+            self.timings_ms[name] = round(self.timings_ms.get(name, 0.0) + elapsed, 1)
+
+    def count(self, **counters: int) -> None:
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, timings_ms: Dict[str, float], counters: Dict[str, int]) -> None:
+        for name, value in timings_ms.items():
+            self.timings_ms[name] = round(self.timings_ms.get(name, 0.0) + value, 1)
+        self.count(**counters)
+
+    @classmethod
+    def combine(cls, reports: Iterable["RunReport"]) -> "RunReport":
+        """Soma de vários relatórios (ex.: partições resolvidas em paralelo)."""
+        combined = cls()
+        for report in reports:
+            combined.merge(report.timings_ms, report.counters)
+        return combined
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return {"timings_ms": dict(self.timings_ms), "counters": dict(self.counters)}
@@ -1,23 +1,115 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import insert, text
 from sqlalchemy.orm import selectinload
-from app.models.models import Schedule, Room, SchoolClass
+from app.models.models import STAGED, Schedule, ScheduleRun, Room, SchoolClass
+from app.core.config import settings
+from app.core.cache import cache
+from app.core.executor import get_executor
+from app.db.json_arrays import int_elements
+from app.services.allocation_engine import (
+    ALGORITHMS, AllocationResult, ClassSpec, PlanMetrics, Reservation, RoomSpec,
+    SchedulingSnapshot, TimeGrid, solve
+)
+from app.services.change_log_service import ChangeLogService
+from app.services.pagination import paginate
+from app.services.version_service import SCHEDULING_INPUTS, VersionService
+from app.services.incremental_scheduling import ChangeSet, affected_classes
+from app.services.partitioned_scheduling import solve_partitioned
+from app.services.portfolio_scheduling import solve_portfolio
+from app.services.run_report import RunReport
+from app.services.stats_service import StatsService
 from app.schemas.schemas import SchoolClassInDB # Ajudar a carregar dados relacionados
-from typing import List, Optional
-from uuid import UUID
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass, field, replace
+from concurrent.futures import Executor
+import asyncio
+import hashlib
+import json
+import logging
+import weakref
+from uuid import UUID, uuid4
+
+@dataclass
+class PreparedRun:
+    snapshot: SchedulingSnapshot
+    changes: ChangeSet
+    # None = substituir todas as propostas pending (modo completo)
+    replaced_ids: Optional[List[UUID]] = None
+    reused: int = 0
+    # Versões das coleções de entrada lidas antes do snapshot e parâmetros da execução
+    versions: Dict[str, int] = field(default_factory=dict)
+    options: Optional[Dict[str, Any]] = None
+    # Tempo por fase e contadores, completados pelo cálculo e pela gravação
+    report: RunReport = field(default_factory=RunReport)
+
+logger = logging.getLogger(__name__)
+
+# Chave do advisory lock que serializa a publicação de propostas no PostgreSQL
+PUBLISH_LOCK_KEY = 73_201_001
+# Execuções em andamento neste processo, por parâmetros (single-flight)
+_inflight: Dict[str, asyncio.Future] = {}
+_run_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
 
 class ScheduleService:
+    # Alocações não têm chave natural: a ordem estável das listagens é o id
+    ORDER = (Schedule.id,)
+
     @staticmethod
-    async def get_all(db: AsyncSession) -> List[Schedule]:
+    def _filter(query, dialect: str, status: Optional[str] = None, room_id: Optional[UUID] = None,
+                school_class_id: Optional[UUID] = None, campus: Optional[str] = None, day: Optional[int] = None):
+        """Filtros das listagens de alocações publicadas, aplicados no banco."""
+        query = query.filter(Schedule.status != STAGED)
+        if status is not None:
+            query = query.filter(Schedule.status == status)
+        if room_id is not None:
+            query = query.filter(Schedule.room_id == room_id)
+        if school_class_id is not None:
+            query = query.filter(Schedule.school_class_id == school_class_id)
+        if campus is not None:
+            query = query.filter(Schedule.room_id.in_(select(Room.id).filter(Room.campus == campus)))
+        if day is not None:
+            days, value = int_elements(Schedule.days_of_week, dialect)
+            query = query.filter(select(days.c.value).select_from(days).where(value == day).exists())
+        return query
+
+    @staticmethod
+    async def get_all(
+        db: AsyncSession,
+        status: Optional[str] = None,
+        room_id: Optional[UUID] = None,
+        school_class_id: Optional[UUID] = None,
+        campus: Optional[str] = None,
+        day: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Schedule]:
+        """
+        Alocações publicadas filtradas no banco, paginadas por cursor (sem limit, todas
+        as restantes). campus é o da sala; day seleciona as que incluem o dia da semana.
+        """
+        query = ScheduleService._filter(
+            select(Schedule), db.bind.dialect.name, status, room_id, school_class_id, campus, day
+        )
         # Carregar relacionamentos room e school_class
-        result = await db.execute(
-            select(Schedule).options(
-                selectinload(Schedule.room),
-                selectinload(Schedule.school_class).selectinload(SchoolClass.subject)
-            )
+        query = query.options(
+            selectinload(Schedule.room),
+            selectinload(Schedule.school_class).selectinload(SchoolClass.subject)
         )
+        result = await db.execute(paginate(query, ScheduleService.ORDER, cursor, limit))
         return result.scalars().all()
 
+    @staticmethod
+    async def get_runs(db: AsyncSession, limit: int = 20) -> List[ScheduleRun]:
+        """Execuções mais recentes do ensalamento automático, com seus relatórios."""
+        result = await db.execute(select(ScheduleRun).order_by(ScheduleRun.id.desc()).limit(limit))
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_run(db: AsyncSession, run_id: int) -> Optional[ScheduleRun]:
+        result = await db.execute(select(ScheduleRun).filter(ScheduleRun.id == run_id))
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def create(db: AsyncSession, schedule_data: dict) -> Schedule:
         # Validação 1: Verificar se a sala tem capacidade suficiente
@@ -44,7 +136,11 @@ class ScheduleService:
         
         db_schedule = Schedule(**schedule_data)
         db.add(db_schedule)
+        await db.flush()
+        await StatsService.add(db, schedules=Schedule.id == db_schedule.id)
+        await VersionService.bump(db, "schedules")
         await db.commit()
+        await cache.invalidate("dashboard")
         await db.refresh(db_schedule)
         
         # Recarregar com relacionamentos
@@ -74,10 +170,13 @@ class ScheduleService:
                 raise ValueError("Sala não encontrada")
 
         # Atualizar campos
-        for key, value in schedule_data.items():
-            setattr(db_schedule, key, value)
+        async with StatsService.track(db, schedules=Schedule.id == schedule_id):
+            for key, value in schedule_data.items():
+                setattr(db_schedule, key, value)
             
+        await VersionService.bump(db, "schedules")
         await db.commit()
+        await cache.invalidate("dashboard")
         await db.refresh(db_schedule)
         
         # Retornar com relacionamentos carregados
@@ -98,8 +197,11 @@ class ScheduleService:
         if not db_schedule:
             return False
         
-        await db.delete(db_schedule)
+        async with StatsService.track(db, schedules=Schedule.id == schedule_id):
+            await db.delete(db_schedule)
+        await VersionService.bump(db, "schedules")
         await db.commit()
+        await cache.invalidate("dashboard")
         return True
 
     @staticmethod
@@ -122,195 +224,491 @@ class ScheduleService:
             raise ValueError("Schedule não encontrado")
         
         schedule.status = status
+        await VersionService.bump(db, "schedules")
         await db.commit()
+        await cache.invalidate("dashboard")
         await db.refresh(schedule)
         return schedule
 
     @staticmethod
-    async def run_auto_scheduling(db: AsyncSession) -> List[Schedule]:
+    async def load_snapshot(db: AsyncSession, report: Optional[RunReport] = None) -> SchedulingSnapshot:
         """
-        Algoritmo de ensalamento automático com horários noturnos (19h-22h)
-        Implementa alocação cooperativa: turmas da mesma disciplina e período são agrupadas
+        Carrega a entrada do alocador: salas ativas, turmas ainda não aprovadas e a
+        ocupação das alocações aprovadas, convertidas em estruturas sem ORM.
         """
-        # 1. Buscar IDs de turmas já aprovadas
-        approved_result = await db.execute(
-            select(SchoolClass.id)
-            .join(Schedule)
-            .filter(Schedule.status == "approved")
-        )
-        approved_class_ids = {row[0] for row in approved_result.all()}
-        
-        # 2. Deletar propostas pending antigas
-        from sqlalchemy import delete
-        await db.execute(delete(Schedule).filter(Schedule.status == "pending"))
-        await db.commit()
-        
-        # 3. Buscar todas as turmas e salas ativas
-        rooms_result = await db.execute(select(Room).filter(Room.is_active == True))
-        rooms = list(rooms_result.scalars().all())
-        
+        report = report or RunReport()
+        # Buscar IDs de turmas já aprovadas
+        with report.phase("load.approved_ids"):
+            approved_result = await db.execute(
+                select(SchoolClass.id)
+                .join(Schedule)
+                .filter(Schedule.status == "approved")
+            )
+            approved_class_ids = {row[0] for row in approved_result.all()}
+
+        with report.phase("load.rooms"):
+            rooms_result = await db.execute(select(Room).filter(Room.is_active == True))
+            rooms = rooms_result.scalars().all()
+
         # Buscar turmas, excluindo as já aprovadas, carregando a Disciplina para agrupamento
-        query = select(SchoolClass).options(selectinload(SchoolClass.subject))
-        
-        if approved_class_ids:
-            query = query.filter(SchoolClass.id.not_in(approved_class_ids))
-        
-        classes_result = await db.execute(query)
-        classes = list(classes_result.scalars().all())
-        
-        if not rooms or not classes:
-            return await ScheduleService.get_all(db)
-        
-        # 4. Ordenar salas por capacidade (maior para menor)
-        rooms_sorted = sorted(rooms, key=lambda r: r.capacity, reverse=True)
-        
-        # 5. Definir parâmetros fixos
-        start_time = "19:00"
-        end_time = "22:00"
-        days_of_week = [1, 2, 3]  # Segunda, Terça, Quarta
-        
-        # 6. Preparar controle de ocupação
-        from collections import defaultdict
-        room_occupancy = defaultdict(int)
-        
-        # Carregar ocupação das salas por turmas já aprovadas
-        approved_schedules_details = await db.execute(
-            select(Schedule.room_id, SchoolClass.students_count)
-            .join(SchoolClass, Schedule.school_class_id == SchoolClass.id)
-            .filter(Schedule.status == "approved")
+        with report.phase("load.classes"):
+            query = select(SchoolClass).options(selectinload(SchoolClass.subject))
+            if approved_class_ids:
+                query = query.filter(SchoolClass.id.not_in(approved_class_ids))
+            classes_result = await db.execute(query)
+            classes = classes_result.scalars().all()
+
+        # Ocupação das salas por turmas já aprovadas, com seus horários
+        with report.phase("load.approved_occupancy"):
+            approved_schedules_details = await db.execute(
+                select(
+                    Schedule.room_id,
+                    Schedule.days_of_week,
+                    Schedule.start_time,
+                    Schedule.end_time,
+                    SchoolClass.students_count,
+                )
+                .join(SchoolClass, Schedule.school_class_id == SchoolClass.id)
+                .filter(Schedule.status == "approved")
+            )
+            approved_rows = approved_schedules_details.all()
+
+        with report.phase("load.to_specs"):
+            snapshot = SchedulingSnapshot(
+                rooms=[
+                    RoomSpec(id=room.id, capacity=room.capacity, room_type=room.type, campus=room.campus)
+                    for room in rooms
+                ],
+                classes=[ScheduleService._class_spec(school_class) for school_class in classes],
+                reservations=[
+                    Reservation(room_id, tuple(days or []), start, end, count or 0)
+                    for room_id, days, start, end, count in approved_rows
+                ],
+                patterns=TimeGrid.from_config(settings.SCHEDULE_MEETING_PATTERNS).patterns,
+            )
+        report.count(approved_classes=len(approved_class_ids), reservations=len(approved_rows))
+        return snapshot
+
+    @staticmethod
+    def _class_spec(school_class: SchoolClass) -> ClassSpec:
+        # Turmas da mesma disciplina e mês de oferta são agrupadas (alocação cooperativa)
+        group_key = None
+        required_room_type = None
+        if school_class.subject_id and school_class.subject:
+            required_room_type = school_class.subject.required_room_type
+            if school_class.subject.offered_month:
+                group_key = (school_class.subject.id, school_class.subject.offered_month)
+        return ClassSpec(
+            id=school_class.id,
+            students_count=school_class.students_count,
+            group_key=group_key,
+            required_room_type=required_room_type,
+            subject_id=school_class.subject_id,
+            campus=school_class.campus,
+        )
+
+    @staticmethod
+    async def _incremental_snapshot(
+        db: AsyncSession, snapshot: SchedulingSnapshot, changes: ChangeSet
+    ) -> Tuple[SchedulingSnapshot, List[UUID], int]:
+        """
+        Restringe o snapshot às turmas afetadas pelas alterações. As propostas pending
+        não afetadas viram ocupação fixa; retorna também os ids das propostas a substituir.
+        """
+        pending_result = await db.execute(
+            select(
+                Schedule.id,
+                Schedule.school_class_id,
+                Schedule.room_id,
+                Schedule.days_of_week,
+                Schedule.start_time,
+                Schedule.end_time,
+            ).filter(Schedule.status == "pending")
+        )
+        pending_rows = pending_result.all()
+
+        specs = {spec.id: spec for spec in snapshot.classes}
+        affected = affected_classes(
+            snapshot.classes,
+            {room.id for room in snapshot.rooms},
+            [(row.school_class_id, row.room_id) for row in pending_rows],
+            changes,
         )
-        for row in approved_schedules_details.all():
-            room_id, count = row
-            room_occupancy[room_id] += (count or 0)
-
-        # 7. Agrupamento Cooperativo (Cooperative Allocation)
-        # Agrupar turmas por (subject_id, offered_month)
-        grouped_classes = defaultdict(list)
-        single_classes = []
-
-        for school_class in classes:
-            if school_class.subject_id and school_class.subject and school_class.subject.offered_month:
-                key = (school_class.subject.id, school_class.subject.offered_month)
-                grouped_classes[key].append(school_class)
+
+        replaced_ids = []
+        kept = []
+        for row in pending_rows:
+            # Propostas de turmas removidas ou já aprovadas também saem
+            if row.school_class_id in affected or row.school_class_id not in specs:
+                replaced_ids.append(row.id)
             else:
-                single_classes.append(school_class)
+                kept.append(Reservation(
+                    row.room_id, tuple(row.days_of_week or []), row.start_time, row.end_time,
+                    specs[row.school_class_id].students_count,
+                ))
 
-        # Criar fila de alocação: Grupos e Turmas Individuais
-        allocation_queue = []
-        for group in grouped_classes.values():
-            allocation_queue.append(group)
-        for cls in single_classes:
-            allocation_queue.append([cls])
+        work = SchedulingSnapshot(
+            rooms=snapshot.rooms,
+            classes=[spec for spec in snapshot.classes if spec.id in affected],
+            reservations=snapshot.reservations + kept,
+            patterns=snapshot.patterns,
+        )
+        return work, replaced_ids, len(kept)
 
-        # Ordenar fila por Total de Alunos (menor para maior) para que grupos menores
-        # garantam suas salas "na medida" antes que os grandes grupos ocupem tudo.
-        allocation_queue.sort(key=lambda group: sum(c.students_count for c in group), reverse=False)
+    @staticmethod
+    def run_options(
+        algorithm: str = "greedy",
+        time_budget_ms: int = 0,
+        incremental: bool = False,
+        partition_by: Optional[str] = None,
+        portfolio: int = 0,
+        seed: int = 0,
+    ) -> Dict[str, Any]:
+        """Parâmetros que, junto com as versões das entradas, determinam o resultado."""
+        return {
+            "algorithm": algorithm,
+            "time_budget_ms": time_budget_ms,
+            "mode": "incremental" if incremental else "full",
+            "partition_by": partition_by,
+            "portfolio": portfolio,
+            "seed": seed,
+            "patterns": settings.SCHEDULE_MEETING_PATTERNS,
+        }
 
-        new_schedules = []
+    @staticmethod
+    def input_fingerprint(versions: Dict[str, int], options: Dict[str, Any]) -> str:
+        payload = json.dumps({"versions": versions, "options": options}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
 
-        # 8. Executar Alocação
-        for group in allocation_queue:
-            group_students = sum(c.students_count for c in group)
-            allocated_room = None
-            
-            # --- TENTATIVA 1: Alocar o GRUPO INTEIRO em uma sala (Exclusiva) ---
-            
-            # Estratégia Best Fit: Validar todas as salas vazias e pegar a que deixa menos espaço sobrando
-            best_fit_room = None
-            min_waste = float('inf')
-
-            for room in rooms_sorted:
-                if room_occupancy[room.id] == 0 and room.capacity >= group_students:
-                    waste = room.capacity - group_students
-                    if waste < min_waste:
-                        min_waste = waste
-                        best_fit_room = room
-            
-            allocated_room = best_fit_room
-
-            if allocated_room:
-                # SUCESSO DE GRUPO: Alocar todas as turmas nesta sala
-                for school_class in group:
-                    room_occupancy[allocated_room.id] += school_class.students_count
-                    schedule = Schedule(
-                        days_of_week=days_of_week,
-                        start_time=start_time,
-                        end_time=end_time,
-                        room_id=allocated_room.id,
-                        school_class_id=school_class.id
-                    )
-                    db.add(schedule)
-                    new_schedules.append(schedule)
-            else:
-                # FALHA DE GRUPO: Desmembrar e alocar individualmente
-                # Rastrear salas usadas por ESTE grupo para tentar agrupa-los (Cooperative Packing)
-                rooms_used_by_group = set()
-                
-                for school_class in group:
-                    cls_room = None
-
-                    # 1. Tentar alocar em sala JÁ USADA pelo grupo (Packing)
-                    # Verifica se cabe perfeitamente
-                    for r_id in rooms_used_by_group:
-                        # Precisamos achar o objeto 'room' pelo ID. O rooms_sorted tem os objetos.
-                        # Otimização: Podia ter map, mas N é pequeno.
-                        r_obj = next((r for r in rooms_sorted if r.id == r_id), None)
-                        if r_obj:
-                             remaining = r_obj.capacity - room_occupancy[r_id]
-                             if remaining >= school_class.students_count:
-                                 cls_room = r_obj
-                                 break
-                    
-                    if not cls_room:
-                        # 2. Se não coube nas salas do grupo, buscar sala VAZIA (Best Fit)
-                        best_cls_room = None
-                        cls_min_waste = float('inf')
-
-                        for room in rooms_sorted:
-                            if room_occupancy[room.id] == 0 and room.capacity >= school_class.students_count:
-                                 waste = room.capacity - school_class.students_count
-                                 if waste < cls_min_waste:
-                                     cls_min_waste = waste
-                                     best_cls_room = room
-                        
-                        if best_cls_room:
-                            cls_room = best_cls_room
-                            rooms_used_by_group.add(cls_room.id)
-
-                    if not cls_room:
-                         # 3. Fallback: Sem sala vazia e sem sala do grupo com espaço.
-                         # Tentar sala PARCIALMENTE OCUPADA (Sharing Globa) 
-                         # Priorizar salas do PRÓPRIO GRUPO mesmo que não caiba? (Superlotação contida)
-                         # OU priorizar qualquer sala com espaço?
-                         # O usuário sugeriu que "ES-2026-2 deveria ter conflito", mas não "Invadir Sala 1".
-                         # Então vamos priorizar: 1) Sala com espaço (qualquer uma), 2) Sala do Grupo (Superlotação).
-                         
-                         best_share_room = None
-                         max_remaining = -1
-                         
-                         for r in rooms_sorted:
-                             remaining = r.capacity - room_occupancy[r.id]
-                             if remaining > max_remaining:
-                                 max_remaining = remaining
-                                 best_share_room = r
-                         
-                         if best_share_room:
-                             cls_room = best_share_room
-                             # Se for compartilhada, adicionamos ao "used" para tentar mandar os próximos para cá também?
-                             rooms_used_by_group.add(cls_room.id)
-                         else:
-                             cls_room = rooms_sorted[0]
-
-                    room_occupancy[cls_room.id] += school_class.students_count
-                    schedule = Schedule(
-                        days_of_week=days_of_week,
-                        start_time=start_time,
-                        end_time=end_time,
-                        room_id=cls_room.id,
-                        school_class_id=school_class.id
-                    )
-                    db.add(schedule)
-                    new_schedules.append(schedule)
-        
+    @staticmethod
+    async def find_memoized(db: AsyncSession, options: Dict[str, Any]) -> Optional[AllocationResult]:
+        """
+        Se nada mudou desde a última execução (mesmas versões de salas, turmas,
+        disciplinas e alocações, mesmos parâmetros), devolve o resultado dela sem
+        recalcular. Custa a leitura dos contadores e da última execução.
+        """
+        versions = await VersionService.current(db, SCHEDULING_INPUTS)
+        result = await db.execute(
+            select(ScheduleRun)
+            .filter(ScheduleRun.status == "published")
+            .order_by(ScheduleRun.id.desc())
+            .limit(1)
+        )
+        last_run = result.scalar_one_or_none()
+        if not last_run or last_run.fingerprint != ScheduleService.input_fingerprint(versions, options):
+            return None
+
+        from sqlalchemy import func
+        pending = await db.execute(select(func.count(Schedule.id)).filter(Schedule.status == "pending"))
+        return AllocationResult(
+            last_run.algorithm,
+            [],
+            PlanMetrics(**(last_run.metrics or {})),
+            reused=pending.scalar_one(),
+            memoized=True,
+        )
+
+    @staticmethod
+    async def prepare_run(
+        db: AsyncSession, incremental: bool = False, options: Optional[Dict[str, Any]] = None
+    ) -> PreparedRun:
+        """
+        Fase de leitura do ensalamento: monta o snapshot (restrito às turmas afetadas no
+        modo incremental) e decide quais propostas pending serão substituídas.
+        Com options, a execução é registrada com o fingerprint das entradas (ver find_memoized).
+        """
+        report = RunReport()
+        # Versões lidas antes do snapshot: escritas concorrentes invalidam o fingerprint
+        with report.phase("load.versions"):
+            versions = await VersionService.current(db, SCHEDULING_INPUTS) if options is not None else {}
+        snapshot = await ScheduleService.load_snapshot(db, report)
+        with report.phase("load.change_log"):
+            changes = await ChangeLogService.pending(db)
+        if not incremental:
+            return PreparedRun(snapshot=snapshot, changes=changes, versions=versions, options=options, report=report)
+
+        with report.phase("load.incremental"):
+            snapshot, replaced_ids, reused = await ScheduleService._incremental_snapshot(db, snapshot, changes)
+        return PreparedRun(
+            snapshot=snapshot, changes=changes, replaced_ids=replaced_ids, reused=reused,
+            versions=versions, options=options, report=report,
+        )
+
+    @staticmethod
+    def solve_prepared(
+        prepared: PreparedRun, algorithm: str = "greedy", time_budget_ms: int = 0, seed: int = 0
+    ) -> AllocationResult:
+        """Fase de cálculo (CPU, sem banco)."""
+        if not prepared.snapshot.rooms or not prepared.snapshot.classes:
+            result = AllocationResult(algorithm, [], PlanMetrics(), seed=seed)
+        else:
+            result = solve(prepared.snapshot, algorithm, time_budget_ms, seed)
+        result.reused = prepared.reused
+        return result
+
+    @staticmethod
+    async def solve_in_executor(
+        prepared: PreparedRun,
+        executor: Executor,
+        algorithm: str = "greedy",
+        time_budget_ms: int = 0,
+        partition_by: Optional[str] = None,
+        portfolio: int = 0,
+        seed: int = 0,
+    ) -> AllocationResult:
+        """
+        Fase de cálculo fora do event loop; com partition_by, uma tarefa por partição;
+        com portfolio=N, N variantes (seeds seed..seed+N-1) e o melhor plano vence.
+        """
+        ScheduleService._check_strategy(partition_by, portfolio)
+        has_work = prepared.snapshot.rooms and prepared.snapshot.classes
+        if partition_by and has_work:
+            result = await solve_partitioned(prepared.snapshot, executor, algorithm, time_budget_ms, partition_by)
+            result.reused = prepared.reused
+            return result
+        if portfolio and has_work:
+            seeds = range(seed, seed + portfolio)
+            result = await solve_portfolio(prepared.snapshot, executor, seeds, algorithm, time_budget_ms)
+            result.reused = prepared.reused
+            return result
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, ScheduleService.solve_prepared, prepared, algorithm, time_budget_ms, seed
+        )
+
+    @staticmethod
+    def _check_strategy(partition_by: Optional[str], portfolio: int) -> None:
+        if partition_by and portfolio:
+            raise ValueError("partition_by e portfolio não podem ser combinados")
+        if portfolio < 0:
+            raise ValueError("portfolio deve ser maior ou igual a zero")
+
+    @staticmethod
+    async def persist_run(db: AsyncSession, prepared: PreparedRun, result: AllocationResult) -> int:
+        """
+        Fase de escrita, em duas transações para que leitores nunca vejam um plano vazio
+        ou pela metade:
+
+        1. staging: as novas propostas são inseridas em lote com status "staged" e o id
+           da execução (ScheduleRun), invisíveis para get_all e para o dashboard;
+        2. publicação: em uma transação curta, remove as propostas substituídas, promove
+           as "staged" desta execução a "pending" e consome o log de alterações.
+
+        Se a publicação falhar, as propostas "staged" da execução são descartadas; as que
+        sobraram de uma execução interrompida entre as fases são descartadas no início da
+        próxima. Retorna o id da execução registrada.
+        """
+        from sqlalchemy import delete, update
+        report = prepared.report
+        report.merge(result.report.timings_ms, result.report.counters)
+        result.report = report
+        for group in result.infeasible:
+            logger.warning(
+                "Grupo inviável (%s): %d turma(s), %d alunos, tipo exigido %s",
+                group.reason, len(group.class_ids), group.students, group.required_room_type,
+            )
+
+        options = prepared.options
+        with report.phase("persist.cleanup"):
+            await ScheduleService._lock_publication(db)
+            stale = await ScheduleService._discard_stale_runs(db)
+            if stale:
+                logger.warning("Execução(ões) interrompida(s) antes da publicação descartada(s): %s", stale)
+        run = ScheduleRun(
+            algorithm=result.algorithm,
+            mode=options["mode"] if options else ("full" if prepared.replaced_ids is None else "incremental"),
+            status="staging",
+        )
+        db.add(run)
+
+        # Inserção em lote: um único executemany em vez de um objeto ORM por proposta
+        with report.phase("persist.insert"):
+            await db.flush()
+            run_id = run.id
+            if result.assignments:
+                await db.execute(insert(Schedule), [
+                    {
+                        "id": uuid4(),
+                        "days_of_week": list(assignment.pattern.days_of_week),
+                        "start_time": assignment.pattern.start_time,
+                        "end_time": assignment.pattern.end_time,
+                        "status": STAGED,
+                        "room_id": assignment.room_id,
+                        "school_class_id": assignment.school_class_id,
+                        "run_id": run_id,
+                    }
+                    for assignment in result.assignments
+                ])
+            await db.commit()
+
+        try:
+            with report.phase("persist.publish"):
+                await ScheduleService._lock_publication(db)
+                # Outro processo pode ter descartado esta execução entre as duas fases
+                status = await db.scalar(select(ScheduleRun.status).filter(ScheduleRun.id == run_id))
+                if status != "staging":
+                    raise RuntimeError(f"Execução {run_id} descartada antes da publicação")
+                if prepared.replaced_ids is None:
+                    replaced = Schedule.status == "pending"
+                else:
+                    replaced = Schedule.id.in_(prepared.replaced_ids)
+                with report.phase("persist.stats"):
+                    removed = await StatsService.contribution(db, schedules=replaced)
+                with report.phase("persist.delete"):
+                    if prepared.replaced_ids is None or prepared.replaced_ids:
+                        await db.execute(delete(Schedule).filter(replaced))
+                await db.execute(
+                    update(Schedule)
+                    .filter(Schedule.run_id == run_id, Schedule.status == STAGED)
+                    .values(status="pending")
+                )
+                # Contadores do dashboard: propostas publicadas menos as substituídas
+                with report.phase("persist.stats"):
+                    published = await StatsService.contribution(db, schedules=Schedule.run_id == run_id)
+                    published.subtract(removed)
+                    await StatsService.apply(db, published)
+                with report.phase("persist.change_log"):
+                    await ChangeLogService.consume(db, prepared.changes)
+                    await VersionService.bump(db, "schedules")
+
+                run.status = "published"
+                run.metrics = asdict(result.metrics)
+                if options is not None:
+                    # Fingerprint do estado após esta escrita; qualquer outra escrita no meio o invalida
+                    versions = dict(prepared.versions, schedules=prepared.versions.get("schedules", 0) + 1)
+                    run.fingerprint = ScheduleService.input_fingerprint(versions, options)
+                with report.phase("persist.commit"):
+                    await db.commit()
+                await cache.invalidate("dashboard")
+        except Exception:
+            await db.rollback()
+            await db.execute(delete(Schedule).filter(Schedule.run_id == run_id, Schedule.status == STAGED))
+            await db.execute(update(ScheduleRun).filter(ScheduleRun.id == run_id).values(status="failed"))
+            await db.commit()
+            raise
+
+        logger.info("Ensalamento concluído (execução %s): %s", run_id, json.dumps(report.as_dict()))
+        # O relatório inclui o tempo do commit, então é gravado logo depois dele
+        run.report = report.as_dict()
+        await db.commit()
+        result.run_id = run_id
+        return run_id
+
+    @staticmethod
+    async def _discard_stale_runs(db: AsyncSession) -> List[int]:
+        """
+        Remove as propostas "staged" de execuções que ficaram em staging (ex.: o processo
+        caiu antes da publicação) e marca essas execuções como failed. Deve ser chamada com
+        _lock_publication; as propostas "staged" não entram nos contadores do dashboard.
+        """
+        from sqlalchemy import delete, update
+        result = await db.execute(select(ScheduleRun.id).filter(ScheduleRun.status == "staging"))
+        stale = list(result.scalars().all())
+        if stale:
+            await db.execute(delete(Schedule).filter(Schedule.run_id.in_(stale), Schedule.status == STAGED))
+            await db.execute(update(ScheduleRun).filter(ScheduleRun.id.in_(stale)).values(status="failed"))
+        return stale
+
+    @staticmethod
+    async def _lock_publication(db: AsyncSession) -> None:
+        """Serializa publicações entre processos (PostgreSQL); no processo, ver run_lock."""
+        if db.bind.dialect.name == "postgresql":
+            await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PUBLISH_LOCK_KEY})
+
+    @staticmethod
+    def run_lock() -> asyncio.Lock:
+        """Uma execução do ensalamento por vez neste processo (por event loop)."""
+        loop = asyncio.get_running_loop()
+        lock = _run_locks.get(loop)
+        if lock is None:
+            lock = _run_locks[loop] = asyncio.Lock()
+        return lock
+
+    @staticmethod
+    async def generate(
+        db: AsyncSession,
+        algorithm: str = "greedy",
+        time_budget_ms: int = 0,
+        incremental: bool = False,
+        partition_by: Optional[str] = None,
+        portfolio: int = 0,
+        seed: int = 0,
+        force: bool = False,
+        on_phase: Optional[Callable[[str], None]] = None,
+    ) -> AllocationResult:
+        """
+        Algoritmo de ensalamento automático sobre a grade de horários configurada
+        (SCHEDULE_MEETING_PATTERNS; padrão: Seg-Qua 19h-22h).
+        Implementa alocação cooperativa: turmas da mesma disciplina e período são agrupadas.
+        Substitui as propostas pending e retorna o plano com suas métricas.
+        Com time_budget_ms > 0, aplica busca local limitada no tempo sobre o plano.
+        Com incremental=True, realoca apenas as turmas afetadas por alterações desde a
+        última execução; as demais propostas pending são preservadas.
+        Com partition_by (ex.: "campus"), cada partição é resolvida em paralelo no pool.
+        Com portfolio=N, N variantes do alocador rodam em paralelo e o melhor plano vence.
+        Se as entradas e os parâmetros não mudaram desde a última execução, as propostas
+        existentes são mantidas sem recálculo (memoized=True), a menos que force=True.
+
+        Chamadas simultâneas com os mesmos parâmetros compartilham uma única execução
+        (shared=True para quem esperou); execuções diferentes rodam uma de cada vez.
+        on_phase é chamado ao entrar em cada fase (loading, solving, persisting) de uma
+        execução própria; quem compartilha a execução de outro não recebe as fases.
+        A conexão da sessão é devolvida ao pool durante o cálculo.
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Algoritmo deve ser um de: {', '.join(ALGORITHMS)}")
+        ScheduleService._check_strategy(partition_by, portfolio)
+
+        options = ScheduleService.run_options(algorithm, time_budget_ms, incremental, partition_by, portfolio, seed)
+        key = json.dumps(dict(options, force=force), sort_keys=True, default=str)
+        inflight = _inflight.get(key)
+        if inflight is not None:
+            return replace(await asyncio.shield(inflight), shared=True)
+
+        future = asyncio.get_running_loop().create_future()
+        # Evita o aviso de exceção não lida quando ninguém estava esperando
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        _inflight[key] = future
+        try:
+            async with ScheduleService.run_lock():
+                result = await ScheduleService._generate(db, options, force, on_phase or (lambda phase: None))
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            _inflight.pop(key, None)
+
+    @staticmethod
+    async def _generate(
+        db: AsyncSession, options: Dict[str, Any], force: bool, on_phase: Callable[[str], None]
+    ) -> AllocationResult:
+        on_phase("loading")
+        if not force:
+            memoized = await ScheduleService.find_memoized(db, options)
+            if memoized is not None:
+                return memoized
+
+        prepared = await ScheduleService.prepare_run(db, options["mode"] == "incremental", options)
+        # Encerra a transação de leitura: nenhuma conexão fica presa durante o cálculo
         await db.commit()
+        on_phase("solving")
+        # Todo cálculo roda no pool: greedy, optimal e annealing também são CPU pura
+        # e bloqueariam as demais requisições se rodassem no event loop
+        with prepared.report.phase("solve"):
+            result = await ScheduleService.solve_in_executor(
+                prepared, get_executor(), options["algorithm"], options["time_budget_ms"],
+                options["partition_by"], options["portfolio"], options["seed"],
+            )
+        on_phase("persisting")
+        await ScheduleService.persist_run(db, prepared, result)
+        return result
+
+    @staticmethod
+    async def run_auto_scheduling(
+        db: AsyncSession, algorithm: str = "greedy", time_budget_ms: int = 0, incremental: bool = False
+    ) -> List[Schedule]:
+        """Gera novas propostas (ver generate; sem recálculo se nada mudou) e retorna todas as alocações."""
+        await ScheduleService.generate(db, algorithm, time_budget_ms, incremental)
         return await ScheduleService.get_all(db)
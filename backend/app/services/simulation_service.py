@@ -0,0 +1,193 @@
+"""
+Simulação (what-if) do ensalamento: roda o alocador em memória sobre uma cópia do
+snapshot atual com alterações hipotéticas em salas e turmas, sem gravar nada.
+
+O snapshot fica em cache no processo, indexado pelas versões das coleções de entrada
+(VersionService): simulações seguidas sobre os mesmos dados não voltam ao banco além
+da leitura dos contadores. O plano de referência (sem alterações) também fica em cache
+por parâmetros, para comparar cada simulação com o plano atual.
+"""
+import asyncio
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models.models import Room, RoomType
+from app.schemas.schedule_schemas import ClassOverride, RoomOverride
+from app.services.allocation_engine import (
+    AllocationResult, Assignment, RoomSpec, SchedulingSnapshot
+)
+from app.services.incremental_scheduling import ChangeSet
+from app.services.run_report import RunReport
+from app.services.schedule_service import PreparedRun, ScheduleService
+from app.services.version_service import SCHEDULING_INPUTS, VersionService
+
+
+@dataclass
+class CachedSnapshot:
+    key: str
+    snapshot: SchedulingSnapshot
+    # Salas inativas, para simular a reabertura (is_active=True)
+    inactive_rooms: Dict[UUID, RoomSpec]
+    loaded_at: float
+    # Plano sem alterações por (algoritmo, time_budget_ms, seed)
+    references: Dict[Tuple[str, int, int], AllocationResult] = field(default_factory=dict)
+
+
+@dataclass
+class SimulationResult:
+    result: AllocationResult
+    reference: AllocationResult
+    # Turmas cuja sala ou horário difere do plano de referência
+    moved: int
+    snapshot_cached: bool
+    report: RunReport
+
+
+_cache: Optional[CachedSnapshot] = None
+
+
+def apply_overrides(
+    cached: CachedSnapshot,
+    room_overrides: Sequence[RoomOverride] = (),
+    class_overrides: Sequence[ClassOverride] = (),
+) -> SchedulingSnapshot:
+    """
+    Cópia do snapshot com as alterações aplicadas; o snapshot em cache não muda.
+    Campos omitidos ou enviados como null ficam como estão.
+    """
+    rooms = {room.id: room for room in cached.snapshot.rooms}
+    for override in room_overrides:
+        spec = rooms.get(override.id) or cached.inactive_rooms.get(override.id)
+        if spec is None:
+            raise ValueError(f"Sala não encontrada: {override.id}")
+        changes = override.model_dump(exclude_unset=True, exclude_none=True, exclude={"id"})
+        if changes.pop("is_active", True) is False:
+            rooms.pop(override.id, None)
+            continue
+        if "type" in changes:
+            changes["room_type"] = RoomType(changes.pop("type"))
+        rooms[override.id] = replace(spec, **changes)
+
+    classes = {spec.id: spec for spec in cached.snapshot.classes}
+    for override in class_overrides:
+        spec = classes.get(override.id)
+        if spec is None:
+            raise ValueError(f"Turma não encontrada ou já aprovada: {override.id}")
+        changes = override.model_dump(exclude_unset=True, exclude_none=True, exclude={"id"})
+        if changes.pop("removed", False):
+            del classes[override.id]
+            continue
+        if "required_room_type" in changes:
+            changes["required_room_type"] = RoomType(changes["required_room_type"])
+        classes[override.id] = replace(spec, **changes)
+
+    return SchedulingSnapshot(
+        rooms=list(rooms.values()),
+        classes=list(classes.values()),
+        reservations=cached.snapshot.reservations,
+        patterns=cached.snapshot.patterns,
+    )
+
+
+def count_moved(reference: List[Assignment], simulated: List[Assignment]) -> int:
+    placed = {a.school_class_id: (a.room_id, a.pattern) for a in reference}
+    moved = sum(1 for a in simulated if placed.pop(a.school_class_id, None) != (a.room_id, a.pattern))
+    # Turmas que tinham sala e deixaram de ser alocadas também contam
+    return moved + len(placed)
+
+
+class SimulationService:
+    @staticmethod
+    def clear_cache() -> None:
+        global _cache
+        _cache = None
+
+    @staticmethod
+    async def cached_snapshot(db: AsyncSession, report: Optional[RunReport] = None) -> Tuple[CachedSnapshot, bool]:
+        """
+        Snapshot atual das entradas do alocador. Recarrega do banco quando alguma coleção
+        de entrada mudou de versão ou o cache passou de SIMULATION_SNAPSHOT_TTL_S
+        (escritas feitas fora dos serviços não incrementam as versões).
+        Retorna o snapshot e se ele veio do cache.
+        """
+        global _cache
+        report = report or RunReport()
+        with report.phase("simulate.versions"):
+            versions = await VersionService.current(db, SCHEDULING_INPUTS)
+        key = ScheduleService.input_fingerprint(versions, {"patterns": settings.SCHEDULE_MEETING_PATTERNS})
+        cached = _cache
+        if (
+            cached is not None
+            and cached.key == key
+            and time.monotonic() - cached.loaded_at < settings.SIMULATION_SNAPSHOT_TTL_S
+        ):
+            return cached, True
+
+        snapshot = await ScheduleService.load_snapshot(db, report)
+        with report.phase("load.inactive_rooms"):
+            inactive = await db.execute(select(Room).filter(Room.is_active == False))
+            inactive_rooms = {
+                room.id: RoomSpec(id=room.id, capacity=room.capacity, room_type=room.type, campus=room.campus)
+                for room in inactive.scalars().all()
+            }
+        _cache = CachedSnapshot(key, snapshot, inactive_rooms, time.monotonic())
+        return _cache, False
+
+    @staticmethod
+    async def _solve(
+        snapshot: SchedulingSnapshot, executor: Optional[Executor], algorithm: str, time_budget_ms: int, seed: int
+    ) -> AllocationResult:
+        prepared = PreparedRun(snapshot=snapshot, changes=ChangeSet())
+        if executor is None:
+            return ScheduleService.solve_prepared(prepared, algorithm, time_budget_ms, seed)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, ScheduleService.solve_prepared, prepared, algorithm, time_budget_ms, seed
+        )
+
+    @staticmethod
+    async def simulate(
+        db: AsyncSession,
+        room_overrides: Sequence[RoomOverride] = (),
+        class_overrides: Sequence[ClassOverride] = (),
+        algorithm: str = "greedy",
+        time_budget_ms: int = 0,
+        seed: int = 0,
+        executor: Optional[Executor] = None,
+    ) -> SimulationResult:
+        """
+        Executa o alocador sobre o snapshot atual com as alterações informadas e compara
+        com o plano sem alterações. Nada é gravado: propostas, execuções, log de
+        alterações e versões permanecem como estão. Com executor, o cálculo roda fora
+        do event loop.
+        """
+        report = RunReport()
+        cached, hit = await SimulationService.cached_snapshot(db, report)
+        with report.phase("simulate.overrides"):
+            snapshot = apply_overrides(cached, room_overrides, class_overrides)
+
+        options = (algorithm, time_budget_ms, seed)
+        reference = cached.references.get(options)
+        if reference is None:
+            with report.phase("simulate.reference"):
+                reference = await SimulationService._solve(cached.snapshot, executor, *options)
+            cached.references[options] = reference
+
+        with report.phase("simulate.solve"):
+            result = await SimulationService._solve(snapshot, executor, *options)
+        report.merge(result.report.timings_ms, result.report.counters)
+        report.count(snapshot_cached=int(hit))
+        return SimulationResult(
+            result=result,
+            reference=reference,
+            moved=count_moved(reference.assignments, result.assignments),
+            snapshot_cached=hit,
+            report=report,
+        )
@@ -0,0 +1,137 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import case, delete, func, insert, true, update
+from sqlalchemy.exc import IntegrityError
+from app.core.cache import cache
+from app.models.models import STAGED, DashboardCounter, Room, Schedule, SchoolClass
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+
+# Marca de contadores já construídos; sem ela, a primeira leitura reconstrói tudo
+BUILT = "built"
+BLOCK_ROOMS = "block.rooms:"
+BLOCK_CAPACITY = "block.capacity:"
+BLOCK_SCHEDULED = "block.scheduled:"
+
+class StatsService:
+    """
+    Contadores materializados do dashboard: totais de salas, turmas e alocações,
+    conflitos de capacidade e ocupação por bloco.
+
+    Cada escrita mede a contribuição das linhas que toca (salas, turmas ou alocações
+    filtradas pela chave alterada) antes e depois da alteração e soma a diferença aos
+    contadores, na mesma transação. O dashboard lê os contadores em uma única consulta.
+    reconcile recalcula tudo do zero e aponta divergências.
+    """
+
+    @staticmethod
+    async def contribution(db: AsyncSession, rooms: Any = None, classes: Any = None, schedules: Any = None) -> Counter:
+        """Valor dos contadores restrito às linhas de cada filtro (None = escopo ignorado)."""
+        counters: Counter = Counter()
+        if rooms is not None:
+            result = await db.execute(
+                select(Room.block, func.count(Room.id), func.sum(Room.capacity))
+                .filter(rooms)
+                .group_by(Room.block)
+            )
+            for block, count, capacity in result.all():
+                counters["rooms"] += count
+                counters[BLOCK_ROOMS + block] += count
+                counters[BLOCK_CAPACITY + block] += capacity or 0
+        if classes is not None:
+            result = await db.execute(select(func.count(SchoolClass.id)).filter(classes))
+            counters["classes"] += result.scalar() or 0
+        if schedules is not None:
+            result = await db.execute(
+                select(
+                    Room.block,
+                    func.count(Schedule.id),
+                    func.sum(case((SchoolClass.students_count > Room.capacity, 1), else_=0)),
+                )
+                .select_from(Schedule)
+                .join(Room, Schedule.room_id == Room.id)
+                .join(SchoolClass, Schedule.school_class_id == SchoolClass.id)
+                .filter(Schedule.status != STAGED, schedules)
+                .group_by(Room.block)
+            )
+            for block, count, conflicts in result.all():
+                counters["schedules"] += count
+                counters["conflicts"] += conflicts or 0
+                counters[BLOCK_SCHEDULED + block] += count
+        return counters
+
+    @staticmethod
+    async def apply(db: AsyncSession, deltas: Counter) -> None:
+        """Soma as diferenças aos contadores (o commit é feito pelo chamador)."""
+        for name, delta in deltas.items():
+            if not delta:
+                continue
+            result = await db.execute(
+                update(DashboardCounter)
+                .where(DashboardCounter.name == name)
+                .values(value=DashboardCounter.value + delta)
+            )
+            if result.rowcount == 0:
+                await db.execute(insert(DashboardCounter).values(name=name, value=delta))
+
+    @staticmethod
+    async def add(db: AsyncSession, **scopes: Any) -> None:
+        """Soma a contribuição de linhas recém-criadas (chamar após o flush, que gera os ids)."""
+        await StatsService.apply(db, await StatsService.contribution(db, **scopes))
+
+    @staticmethod
+    @asynccontextmanager
+    async def track(db: AsyncSession, **scopes: Any):
+        """Aplica aos contadores o efeito das alterações feitas dentro do bloco."""
+        before = await StatsService.contribution(db, **scopes)
+        yield
+        await db.flush()
+        after = await StatsService.contribution(db, **scopes)
+        after.subtract(before)
+        await StatsService.apply(db, after)
+
+    @staticmethod
+    async def get(db: AsyncSession) -> Dict[str, int]:
+        result = await db.execute(select(DashboardCounter.name, DashboardCounter.value))
+        counters = dict(result.all())
+        if BUILT not in counters:
+            try:
+                counters = await StatsService.rebuild(db)
+                await db.commit()
+            except IntegrityError:
+                # Outra sessão construiu os contadores ao mesmo tempo
+                await db.rollback()
+                result = await db.execute(select(DashboardCounter.name, DashboardCounter.value))
+                counters = dict(result.all())
+        return counters
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> Dict[str, int]:
+        """Recalcula todos os contadores do zero (o commit é feito pelo chamador)."""
+        counters = await StatsService.contribution(db, rooms=true(), classes=true(), schedules=true())
+        counters[BUILT] = 1
+        counters = {name: value for name, value in counters.items() if value}
+        await db.execute(delete(DashboardCounter))
+        await db.execute(insert(DashboardCounter), [{"name": name, "value": value} for name, value in counters.items()])
+        return counters
+
+    @staticmethod
+    async def reconcile(db: AsyncSession, fix: bool = True) -> Dict[str, Tuple[Optional[int], int]]:
+        """
+        Compara os contadores gravados com um recálculo completo e devolve as
+        divergências {nome: (gravado, real)}. Com fix=True, regrava os contadores.
+        """
+        result = await db.execute(select(DashboardCounter.name, DashboardCounter.value))
+        stored = {name: value for name, value in result.all() if name != BUILT}
+        actual = await StatsService.contribution(db, rooms=true(), classes=true(), schedules=true())
+        drift = {
+            name: (stored.get(name), actual[name])
+            for name in sorted(set(stored) | set(actual))
+            if stored.get(name, 0) != actual[name]
+        }
+        if fix:
+            await StatsService.rebuild(db)
+            await db.commit()
+            await cache.invalidate("dashboard")
+        return drift
@@ -0,0 +1,38 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import update
+from app.models.models import CollectionVersion
+from typing import Dict, Iterable
+
+# Coleções que alimentam o ensalamento
+SCHEDULING_INPUTS = ("rooms", "school_classes", "subjects", "schedules")
+
+class VersionService:
+    """
+    Contadores de versão por coleção. Toda escrita incrementa o contador da coleção na
+    mesma transação (o commit é feito pelo chamador), então comparar versões custa uma
+    única consulta pequena, sem carregar as linhas.
+    """
+
+    @staticmethod
+    async def bump(db: AsyncSession, *names: str) -> None:
+        for name in names:
+            result = await db.execute(
+                update(CollectionVersion)
+                .where(CollectionVersion.name == name)
+                .values(version=CollectionVersion.version + 1)
+            )
+            if result.rowcount == 0:
+                db.add(CollectionVersion(name=name, version=1))
+                await db.flush()
+
+    @staticmethod
+    async def current(db: AsyncSession, names: Iterable[str]) -> Dict[str, int]:
+        names = list(names)
+        result = await db.execute(
+            select(CollectionVersion.name, CollectionVersion.version)
+            .filter(CollectionVersion.name.in_(names))
+        )
+        versions = dict.fromkeys(names, 0)
+        versions.update({name: version for name, version in result.all()})
+        return versions
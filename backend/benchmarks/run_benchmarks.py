@@ -0,0 +1,186 @@
+"""
+Benchmark do ensalamento automático sobre dados sintéticos em SQLite em memória.
+
+Para cada escala e algoritmo, mede o tempo total de ScheduleService.generate, o pico
+de memória (tracemalloc, em uma execução separada para não distorcer o tempo), o número
+de idas ao banco e a qualidade do plano. O resultado é um JSON comparável entre versões.
+
+O cálculo roda em uma thread deste processo (EXECUTOR), não no pool de processos da
+aplicação: assim o tracemalloc enxerga a memória do algoritmo e o tempo não inclui a
+criação do pool. Uma execução de aquecimento precede as medições.
+
+Uso (na pasta backend):
+    python -m benchmarks.run_benchmarks --scale 1k --scale 10k --output bench.json
+    python -m benchmarks.run_benchmarks --scale 1k --compare bench-anterior.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.session import Base
+from app.services.allocation_engine import ALGORITHMS
+from app.services import schedule_service
+from app.services.schedule_service import ScheduleService
+from benchmarks.synthetic_data import MEETING_PATTERNS, SCALES, generate_dataset, load_dataset
+
+
+# Registrado no relatório: o pool de processos (padrão da aplicação) esconderia a memória do cálculo
+EXECUTOR = "thread"
+
+
+class RoundTripCounter:
+    """Conta os comandos enviados ao banco (um executemany conta como uma ida)."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs) -> None:
+        self.count += 1
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _generate(session_factory, algorithm: str, time_budget_ms: int):
+    async with session_factory() as db:
+        return await ScheduleService.generate(db, algorithm, time_budget_ms, force=True)
+
+
+async def run_case(scale: str, algorithm: str, time_budget_ms: int = 0, seed: int = 42,
+                   measure_memory: bool = True) -> Dict[str, Any]:
+    n_classes = SCALES.get(scale) or int(scale)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    configured_patterns = settings.SCHEDULE_MEETING_PATTERNS
+    settings.SCHEDULE_MEETING_PATTERNS = MEETING_PATTERNS
+    configured_executor = schedule_service.get_executor
+    pool = ThreadPoolExecutor(max_workers=1)
+    schedule_service.get_executor = lambda: pool
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        data = generate_dataset(n_classes, seed)
+        async with session_factory() as db:
+            await load_dataset(db, data)
+
+        # Aquecimento: imports tardios, caches e a thread do pool ficam fora da medição
+        await _generate(session_factory, algorithm, time_budget_ms)
+
+        counter = RoundTripCounter(engine)
+        started = time.perf_counter()
+        result = await _generate(session_factory, algorithm, time_budget_ms)
+        wall_ms = (time.perf_counter() - started) * 1000.0
+        round_trips = counter.count
+
+        peak_memory_mb = None
+        if measure_memory:
+            tracemalloc.start()
+            try:
+                await _generate(session_factory, algorithm, time_budget_ms)
+                peak_memory_mb = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            finally:
+                tracemalloc.stop()
+    finally:
+        settings.SCHEDULE_MEETING_PATTERNS = configured_patterns
+        schedule_service.get_executor = configured_executor
+        pool.shutdown()
+        await engine.dispose()
+
+    return {
+        "scale": scale,
+        "algorithm": algorithm,
+        "time_budget_ms": time_budget_ms,
+        "seed": seed,
+        "executor": EXECUTOR,
+        "dataset": dict(data.counts(), meeting_patterns=len(MEETING_PATTERNS)),
+        "wall_ms": round(wall_ms, 1),
+        "peak_memory_mb": peak_memory_mb,
+        "db_round_trips": round_trips,
+        "quality": asdict(result.metrics),
+        "infeasible_groups": len(result.infeasible),
+    }
+
+
+def compare(current: List[Dict[str, Any]], previous: List[Dict[str, Any]]) -> List[str]:
+    """Linhas legíveis com a variação de tempo, memória e qualidade por caso."""
+    key = lambda case: (case["scale"], case["algorithm"], case["time_budget_ms"], case["seed"])
+    before = {key(case): case for case in previous}
+    lines = []
+    for case in current:
+        old = before.get(key(case))
+        if old is None:
+            continue
+        delta = (case["wall_ms"] - old["wall_ms"]) / old["wall_ms"] * 100 if old["wall_ms"] else 0.0
+        lines.append(
+            f"{case['scale']:>6} {case['algorithm']:<8} tempo {old['wall_ms']:.0f} -> {case['wall_ms']:.0f} ms "
+            f"({delta:+.1f}%), idas ao banco {old['db_round_trips']} -> {case['db_round_trips']}, "
+            f"desperdício {old['quality']['total_waste']} -> {case['quality']['total_waste']}, "
+            f"superlotação {old['quality']['overcapacity_rows']} -> {case['quality']['overcapacity_rows']}"
+        )
+    return lines
+
+
+async def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark do ensalamento automático")
+    parser.add_argument("--scale", action="append", help="1k, 10k, 50k ou número de turmas (repetível)")
+    parser.add_argument("--algorithm", action="append", choices=ALGORITHMS, help="repetível; padrão: greedy")
+    parser.add_argument("--time-budget-ms", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="não medir o pico de memória")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    cases = []
+    for scale in args.scale or ["1k"]:
+        for algorithm in args.algorithm or ["greedy"]:
+            case = await run_case(scale, algorithm, args.time_budget_ms, args.seed, not args.no_memory)
+            print(f"{scale:>6} {algorithm:<8} {case['wall_ms']:.0f} ms", file=sys.stderr)
+            cases.append(case)
+
+    report = {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "executor": EXECUTOR,
+        "cases": cases,
+    }
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)["cases"]
+        for line in compare(cases, previous):
+            print(line, file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,6 +2,7 @@ import asyncio
 import pytest
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.db.session import Base
+from app.core.cache import cache
 from typing import AsyncGenerator
 
 # Usar SQLite em memória para testes
@@ -30,6 +31,12 @@ async def setup_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
+@pytest.fixture(scope="function", autouse=True)
+async def clear_cache():
+    # O cache é do processo: cada teste começa sem entradas de bancos anteriores
+    await cache.clear()
+    yield
+
 @pytest.fixture
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
@@ -0,0 +1,149 @@
+from uuid import uuid4
+from app.services.allocation_engine import (
+    AllocationEngine, CapacityIndex, ClassSpec, MeetingPattern, RoomOccupancy, RoomSpec,
+    SchedulingSnapshot, TimeGrid, solve
+)
+
+
+def _by_class(assignments):
+    return {a.school_class_id: a.room_id for a in assignments}
+
+
+def test_capacity_index_best_fit():
+    index = CapacityIndex([(50, 2), (100, 0), (50, 1), (30, 3)])
+    assert index.best_fit(40) == 1  # menor capacidade suficiente, menor rank no empate
+    assert index.best_fit(101) is None
+    index.discard(50, 1)
+    assert index.best_fit(40) == 2
+
+
+def test_group_best_fit_in_empty_room():
+    small = RoomSpec(id=uuid4(), capacity=60)
+    large = RoomSpec(id=uuid4(), capacity=200)
+    c1 = ClassSpec(id=uuid4(), students_count=25, group_key="G")
+    c2 = ClassSpec(id=uuid4(), students_count=30, group_key="G")
+
+    result = _by_class(AllocationEngine([large, small]).allocate([c1, c2]))
+
+    assert result[c1.id] == small.id
+    assert result[c2.id] == small.id
+
+
+def test_group_split_packs_into_group_rooms():
+    r1 = RoomSpec(id=uuid4(), capacity=50)
+    r2 = RoomSpec(id=uuid4(), capacity=50)
+    classes = [ClassSpec(id=uuid4(), students_count=n, group_key="G") for n in (30, 20, 40)]
+
+    result = _by_class(AllocationEngine([r1, r2]).allocate(classes))
+
+    # 30 vai para r1, 20 empacota junto em r1, 40 abre r2
+    assert result[classes[0].id] == result[classes[1].id]
+    assert result[classes[2].id] != result[classes[0].id]
+
+
+def test_share_fallback_uses_room_with_most_remaining_space():
+    r1 = RoomSpec(id=uuid4(), capacity=40)
+    r2 = RoomSpec(id=uuid4(), capacity=100)
+    c1 = ClassSpec(id=uuid4(), students_count=35)
+    c2 = ClassSpec(id=uuid4(), students_count=50)
+    c3 = ClassSpec(id=uuid4(), students_count=45)
+
+    engine = AllocationEngine([r1, r2])
+    result = _by_class(engine.allocate([c1, c2, c3]))
+
+    assert result[c1.id] == r1.id
+    assert result[c2.id] == r2.id
+    # Nenhuma sala vazia: compartilha a que tem mais vagas restantes (r2, 50 livres)
+    assert result[c3.id] == r2.id
+    assert engine.occupancy()[r2.id] == 95
+    # Salas examinadas: uma por encaixe e, no compartilhamento, a entrada obsoleta de r2 e a atual
+    assert engine.report.counters["candidates_scanned"] == 4
+
+
+def test_approved_occupancy_blocks_room():
+    busy = RoomSpec(id=uuid4(), capacity=50)
+    free = RoomSpec(id=uuid4(), capacity=80)
+    c1 = ClassSpec(id=uuid4(), students_count=40)
+
+    engine = AllocationEngine([busy, free])
+    engine.reserve(busy.id, [1], "19:00", "22:00", 10)
+    result = _by_class(engine.allocate([c1]))
+
+    assert result[c1.id] == free.id
+
+
+MON_WED = MeetingPattern(days_of_week=(1, 2, 3), start_time="19:00", end_time="22:00")
+THU_SAT = MeetingPattern(days_of_week=(4, 5, 6), start_time="19:00", end_time="22:00")
+
+
+def test_time_grid_splits_overlapping_slots():
+    grid = TimeGrid([
+        MeetingPattern(days_of_week=(1,), start_time="19:00", end_time="22:00"),
+        MeetingPattern(days_of_week=(1,), start_time="20:40", end_time="22:00"),
+    ])
+    assert grid.slots == [(1140, 1240), (1240, 1320)]
+    # O padrão longo cobre as duas faixas; o curto só a segunda
+    assert grid.pattern_masks[0] & grid.pattern_masks[1] == grid.pattern_masks[1]
+    # Horário fora da grade não ocupa células
+    assert grid.cells([7], "19:00", "22:00") == []
+
+
+def test_room_occupancy_bitset():
+    occupancy = RoomOccupancy(4)
+    occupancy.add([0, 1], 30)
+    assert not occupancy.is_free(0b0011)
+    assert occupancy.is_free(0b1100)
+    assert occupancy.peak([0, 2]) == 30
+
+
+def test_room_reused_in_other_days():
+    room = RoomSpec(id=uuid4(), capacity=50)
+    c1 = ClassSpec(id=uuid4(), students_count=40)
+    c2 = ClassSpec(id=uuid4(), students_count=45)
+
+    assignments = AllocationEngine([room], TimeGrid([MON_WED, THU_SAT])).allocate([c1, c2])
+
+    # Mesma sala, padrões diferentes: nenhuma superlotação
+    assert {a.room_id for a in assignments} == {room.id}
+    assert {a.pattern for a in assignments} == {MON_WED, THU_SAT}
+
+
+def test_approved_schedule_only_blocks_its_days():
+    room = RoomSpec(id=uuid4(), capacity=50)
+    c1 = ClassSpec(id=uuid4(), students_count=40)
+
+    engine = AllocationEngine([room], TimeGrid([MON_WED, THU_SAT]))
+    engine.reserve(room.id, [2], "19:00", "21:00", 50)
+    (assignment,) = engine.allocate([c1])
+
+    assert assignment.pattern == THU_SAT
+
+
+def test_room_type_is_a_constraint():
+    common = RoomSpec(id=uuid4(), capacity=40, room_type="Sala Comum")
+    lab = RoomSpec(id=uuid4(), capacity=80, room_type="Laboratório")
+    lab_class = ClassSpec(id=uuid4(), students_count=35, required_room_type="Laboratório")
+    common_class = ClassSpec(id=uuid4(), students_count=35, required_room_type="Sala Comum")
+    overflow = ClassSpec(id=uuid4(), students_count=20, required_room_type="Sala Comum")
+
+    result = _by_class(AllocationEngine([common, lab]).allocate([lab_class, common_class, overflow]))
+
+    # A sala comum fica melhor para a turma de laboratório, mas o tipo é obrigatório
+    assert result[lab_class.id] == lab.id
+    # Sem sala comum livre, a turma compartilha a sala comum em vez de ocupar o laboratório
+    assert result[common_class.id] == common.id
+    assert result[overflow.id] == common.id
+
+
+def test_solve_reports_infeasible_groups():
+    room = RoomSpec(id=uuid4(), capacity=40, room_type="Sala Comum")
+    no_auditorium = ClassSpec(id=uuid4(), students_count=100, required_room_type="Auditório")
+    too_big = ClassSpec(id=uuid4(), students_count=60, required_room_type="Sala Comum")
+    fine = ClassSpec(id=uuid4(), students_count=30)
+
+    result = solve(SchedulingSnapshot(rooms=[room], classes=[no_auditorium, too_big, fine]))
+
+    reasons = {group.class_ids: group.reason for group in result.infeasible}
+    assert reasons == {(no_auditorium.id,): "room_type", (too_big.id,): "capacity"}
+    # Sem sala compatível a turma fica de fora; a grande demais é alocada superlotada
+    assert set(_by_class(result.assignments)) == {too_big.id, fine.id}
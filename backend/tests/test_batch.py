@@ -0,0 +1,143 @@
+import pytest
+from app.models.models import Course, Room, Schedule, SchoolClass
+from app.schemas.batch_schemas import BatchRequest
+from app.services.academic_service import SchoolClassService, SubjectService
+from app.services.room_service import RoomService
+from app.services.stats_service import StatsService
+
+
+def room(number, capacity=40):
+    return {"campus": "C", "building": "B", "block": "A", "floor": 1, "number": number, "capacity": capacity}
+
+
+def statuses(result):
+    return [(item["op"], item["index"], item["status"]) for item in result["items"]]
+
+
+@pytest.mark.asyncio
+async def test_room_batch_writes_valid_items_and_reports_errors(db_session):
+    busy = Room(**room("100"))
+    spare = Room(**room("200"))
+    twice = Room(**room("300"))
+    course = Course(name="C1", code="C1")
+    db_session.add_all([busy, spare, twice, course])
+    await db_session.flush()
+    school_class = SchoolClass(name="T1", shift="N", semester=1, students_count=20, course_id=course.id)
+    db_session.add(school_class)
+    await db_session.flush()
+    db_session.add(Schedule(days_of_week=[1], start_time="19:00", end_time="22:00",
+                            room_id=busy.id, school_class_id=school_class.id))
+    await db_session.commit()
+    await StatsService.get(db_session)
+
+    result = await RoomService.batch(db_session, BatchRequest(
+        create=[room("101"), room("101"), room("100"), {"number": "102"}, room("200", 30)],
+        update=[{"id": str(busy.id), "capacity": 10}, {"capacity": 5}, {"id": str(twice.id), "floor": 2}],
+        delete=[busy.id, spare.id, twice.id],
+    ))
+    assert statuses(result) == [
+        ("create", 0, "error"), ("create", 1, "error"),  # número repetido no lote
+        ("create", 2, "error"),                          # número de outra sala
+        ("create", 3, "error"),                          # campos obrigatórios
+        ("create", 4, "created"),                        # número liberado pela remoção
+        ("update", 0, "error"), ("update", 1, "error"), ("update", 2, "error"),
+        ("delete", 0, "error"), ("delete", 1, "deleted"), ("delete", 2, "error"),
+    ]
+    assert result["created"] == 1 and result["deleted"] == 1 and result["failed"] == 9
+    assert [item["errors"] for item in result["items"][5:8]] == [
+        ["Registro repetido no lote"], ["id: campo obrigatório"], ["Registro repetido no lote"],
+    ]
+    assert result["items"][8]["errors"] == ["Registro repetido no lote"]
+    created_id = result["items"][4]["id"]
+
+    result = await RoomService.batch(db_session, BatchRequest(
+        update=[{"id": str(busy.id), "capacity": 10}], delete=[busy.id],
+    ))
+    assert result["items"][1]["errors"] == ["Registro repetido no lote"]
+    result = await RoomService.batch(db_session, BatchRequest(
+        update=[{"id": str(busy.id), "capacity": 10}], delete=[twice.id],
+    ))
+    assert result["updated"] == 1 and result["deleted"] == 1
+    result = await RoomService.batch(db_session, BatchRequest(delete=[busy.id]))
+    assert result["items"][0]["errors"] == ["Sala possui alocações"]
+
+    rooms = await RoomService.get_all(db_session)
+    assert [(r.number, r.capacity) for r in rooms] == [("100", 10), ("200", 30)]
+    assert rooms[1].id == created_id
+    # A sala encolheu abaixo da turma alocada: o contador de conflitos acompanha
+    assert await StatsService.reconcile(db_session, fix=False) == {}
+
+
+@pytest.mark.asyncio
+async def test_atomic_batch_writes_nothing_on_error(db_session):
+    result = await RoomService.batch(db_session, BatchRequest(
+        create=[room("101"), room("102", capacity="muitos")], atomic=True,
+    ))
+    assert statuses(result) == [("create", 0, "skipped"), ("create", 1, "error")]
+    assert result["items"][0]["id"] is None
+    assert await RoomService.get_all(db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_database_error_rolls_back_the_batch(db_session):
+    from sqlalchemy.exc import DataError
+    from app.schemas.schemas import RoomCreate, RoomUpdate
+    from app.services.batch import Batch
+
+    batch = Batch(BatchRequest(create=[room("101")]), RoomCreate, RoomUpdate)
+    with pytest.raises(ValueError):
+        async with batch.write(db_session) as (creates, _, _):
+            db_session.add(Room(**creates[0].values()))
+            await db_session.flush()
+            # Ex.: valor fora do intervalo da coluna no PostgreSQL
+            raise DataError("INSERT INTO rooms ...", {}, Exception("value out of range"))
+
+    assert not db_session.in_transaction()
+    assert not batch.written
+    assert await RoomService.get_all(db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_class_and_subject_batches(db_session):
+    course = Course(name="C1", code="C1")
+    other = Course(name="C2", code="C2")
+    db_session.add_all([course, other])
+    await db_session.commit()
+    await StatsService.get(db_session)
+
+    subjects = await SubjectService.batch(db_session, BatchRequest(create=[
+        {"code": "MAT1", "name": "Cálculo", "workload": 60, "offered_month": "Mar", "course_ids": [str(course.id)]},
+        {"code": "FIS1", "name": "Física", "workload": 60, "offered_month": "Mar",
+         "course_ids": [str(course.id), "00000000-0000-0000-0000-000000000000"]},
+    ]))
+    assert statuses(subjects) == [("create", 0, "created"), ("create", 1, "error")]
+    subject_id = subjects["items"][0]["id"]
+
+    classes = await SchoolClassService.batch(db_session, BatchRequest(create=[
+        {"name": f"T{n}", "shift": "N", "semester": 1, "students_count": 30,
+         "course_id": str(course.id), "subject_id": str(subject_id)}
+        for n in range(3)
+    ]))
+    assert classes["created"] == 3
+    first = classes["items"][0]["id"]
+
+    result = await SchoolClassService.batch(db_session, BatchRequest(
+        update=[{"id": str(first), "students_count": 45}],
+        delete=[classes["items"][1]["id"]],
+    ))
+    assert result["updated"] == 1 and result["deleted"] == 1
+    assert [(c.name, c.students_count) for c in await SchoolClassService.get_all(db_session)] == [("T0", 45), ("T2", 30)]
+
+    # Disciplina ainda usada por turmas não pode sair; os cursos são regravados
+    result = await SubjectService.batch(db_session, BatchRequest(
+        update=[{"id": str(subject_id), "name": "Cálculo I", "course_ids": [str(other.id)]}],
+        delete=[subject_id],
+    ))
+    assert result["failed"] == 2
+    result = await SubjectService.batch(db_session, BatchRequest(
+        update=[{"id": str(subject_id), "name": "Cálculo I", "course_ids": [str(other.id)]}],
+    ))
+    assert result["updated"] == 1
+    subject = await SubjectService.get_by_id(db_session, subject_id)
+    assert subject["name"] == "Cálculo I" and subject["course_ids"] == [other.id]
+    assert await StatsService.reconcile(db_session, fix=False) == {}
@@ -0,0 +1,30 @@
+from benchmarks.run_benchmarks import compare, run_case
+from benchmarks.synthetic_data import generate_dataset
+
+
+def test_synthetic_dataset_is_deterministic():
+    first, second = generate_dataset(200, seed=7), generate_dataset(200, seed=7)
+
+    assert first.classes == second.classes
+    assert first.rooms == second.rooms
+    assert first.counts() == {"rooms": 40, "courses": 2, "subjects": 50, "classes": 200}
+    assert generate_dataset(200, seed=8).classes != first.classes
+
+
+async def test_benchmark_case_reports_metrics():
+    case = await run_case("200", "greedy", measure_memory=False)
+
+    assert case["dataset"]["classes"] == 200
+    assert case["quality"]["allocated"] <= 200
+    assert case["db_round_trips"] > 0
+    assert case["wall_ms"] > 0
+    assert case["executor"] == "thread"
+    assert len(compare([case], [case])) == 1
+
+
+async def test_benchmark_memory_includes_the_solver():
+    # O cálculo roda no processo: o pico do optimal (matriz NumPy) aparece no tracemalloc
+    greedy = await run_case("300", "greedy")
+    optimal = await run_case("300", "optimal")
+
+    assert optimal["peak_memory_mb"] > greedy["peak_memory_mb"]
@@ -0,0 +1,62 @@
+import pytest
+from app.core.cache import Cache, MemoryCacheBackend, cache
+from app.schemas.schemas import RoomCreate, RoomUpdate
+from app.services.room_service import RoomService
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+@pytest.mark.asyncio
+async def test_ttl_and_lru_eviction():
+    now = [0.0]
+    store = Cache(MemoryCacheBackend(max_entries=2, clock=lambda: now[0]), ttl_s=10)
+    load = Loader()
+
+    assert await store.get_or_load("rooms", "a", load) == 1
+    assert await store.get_or_load("rooms", "a", load) == 1
+    now[0] = 10
+    assert await store.get_or_load("rooms", "a", load) == 2
+
+    # "a" é a entrada usada mais recentemente: "b" sai quando "c" entra
+    await store.get_or_load("rooms", "b", load)
+    await store.get_or_load("rooms", "a", load)
+    await store.get_or_load("rooms", "c", load)
+    assert await store.get_or_load("rooms", "a", load) == 2
+    assert await store.get_or_load("rooms", "b", load) == 5
+
+    stats = store.stats()
+    assert stats["evictions"] == 2
+    assert stats["namespaces"]["rooms"] == {"hits": 3, "misses": 5, "invalidations": 0}
+
+
+@pytest.mark.asyncio
+async def test_invalidation_discards_loads_started_before_the_write():
+    store = Cache(MemoryCacheBackend(), ttl_s=60)
+
+    async def slow_load():
+        # Escrita concorrente termina enquanto a leitura antiga ainda carrega
+        await store.invalidate("rooms")
+        return "antigo"
+
+    assert await store.get_or_load("rooms", "all", slow_load) == "antigo"
+    assert await store.get_or_load("rooms", "all", Loader()) == 1
+    assert await store.get_or_load("dashboard", "all", Loader()) == 1
+
+
+@pytest.mark.asyncio
+async def test_room_writes_invalidate_cached_list(db_session):
+    room = await RoomService.create(db_session, RoomCreate(
+        campus="C", building="B", block="A", floor=1, number="101", capacity=40))
+    assert [r.capacity for r in await RoomService.get_all_cached(db_session)] == [40]
+    assert [r.capacity for r in await RoomService.get_all_cached(db_session)] == [40]
+
+    await RoomService.update(db_session, room.id, RoomUpdate(capacity=60))
+    assert [r.capacity for r in await RoomService.get_all_cached(db_session)] == [60]
+    assert cache.stats()["namespaces"]["rooms"] == {"hits": 1, "misses": 2, "invalidations": 2}
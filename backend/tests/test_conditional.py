@@ -0,0 +1,38 @@
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+from app.api.v1.conditional import _matches, etag_for
+from app.schemas.schemas import RoomCreate, RoomUpdate
+from app.services.room_service import RoomService
+
+
+def request(**headers):
+    return Request({"type": "http", "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]})
+
+
+def test_if_none_match_uses_weak_comparison():
+    assert _matches('W/"rooms.1"', 'W/"rooms.1"')
+    assert _matches('"rooms.2", "rooms.1"', 'W/"rooms.1"')
+    assert _matches("*", 'W/"rooms.1"')
+    assert not _matches('W/"rooms.10"', 'W/"rooms.1"')
+
+
+@pytest.mark.asyncio
+async def test_etag_follows_collection_version(db_session):
+    check = etag_for("rooms")
+    response = Response()
+    etag = await check(request(), response, db_session)
+    assert response.headers["etag"] == etag == 'W/"rooms.0"'
+
+    room = await RoomService.create(db_session, RoomCreate(
+        campus="C", building="B", block="A", floor=1, number="101", capacity=40))
+    fresh = await check(request(if_none_match=etag), Response(), db_session)
+    assert fresh == 'W/"rooms.1"'
+
+    # Mesma versão: 304 sem executar a consulta da listagem
+    with pytest.raises(HTTPException) as exc:
+        await check(request(if_none_match=fresh), Response(), db_session)
+    assert exc.value.status_code == 304 and exc.value.headers["ETag"] == fresh
+
+    await RoomService.update(db_session, room.id, RoomUpdate(capacity=60))
+    assert await check(request(if_none_match=fresh), Response(), db_session) == 'W/"rooms.2"'
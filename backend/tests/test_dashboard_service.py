@@ -0,0 +1,146 @@
+import pytest
+from app.models.models import STAGED, Course, Room, Schedule, SchoolClass
+from app.services.dashboard_service import DashboardService
+
+
+@pytest.fixture
+async def setup_data(db_session):
+    small = Room(number="101", capacity=30, campus="C", building="B", block="A", floor=1)
+    large = Room(number="102", capacity=100, campus="C", building="B", block="A", floor=1)
+    course = Course(name="C1", code="C1")
+    db_session.add_all([small, large, course])
+    await db_session.flush()
+
+    classes = [
+        SchoolClass(name=f"T{n}", shift="N", semester=1, students_count=n, course_id=course.id)
+        for n in (20, 40, 60, 80)
+    ]
+    db_session.add_all(classes)
+    await db_session.flush()
+
+    def schedule(school_class, room, status="pending"):
+        return Schedule(
+            days_of_week=[1], start_time="19:00", end_time="22:00", status=status,
+            room_id=room.id, school_class_id=school_class.id,
+        )
+
+    db_session.add_all([
+        schedule(classes[0], small),
+        schedule(classes[1], small),
+        schedule(classes[2], small, status="approved"),
+        schedule(classes[3], large),
+        # Propostas em staging não aparecem no dashboard
+        schedule(classes[3], small, status=STAGED),
+    ])
+    await db_session.commit()
+    return small, large, classes
+
+
+@pytest.mark.asyncio
+async def test_capacity_conflicts_are_counted_and_paginated(db_session, setup_data):
+    stats = await DashboardService.get_stats(db_session)
+    assert stats == {
+        "total_rooms": 2,
+        "active_classes": 4,
+        "pending_conflicts": 2,
+        "completion_rate": "100%",
+    }
+
+    assert await DashboardService.count_conflicts(db_session) == 2
+    conflicts = await DashboardService.get_conflicts(db_session)
+    # Mais superlotado primeiro
+    assert [(c["class_name"], c["students"], c["capacity"]) for c in conflicts] == [
+        ("T60", 60, 30),
+        ("T40", 40, 30),
+    ]
+    page = await DashboardService.get_conflicts(db_session, limit=1, offset=1)
+    assert [c["class_name"] for c in page] == ["T40"]
+
+
+@pytest.mark.asyncio
+async def test_conflicts_without_limit_are_not_truncated(db_session, setup_data):
+    small, _, classes = setup_data
+    db_session.add_all([
+        Schedule(days_of_week=[2], start_time="19:00", end_time="22:00", status="pending",
+                 room_id=small.id, school_class_id=classes[1].id)
+        for _ in range(120)
+    ])
+    await db_session.commit()
+
+    assert len(await DashboardService.get_conflicts(db_session)) == 122
+    total, conflicts = await DashboardService.get_overlap_conflicts(db_session)
+    assert len(conflicts) == total
+
+
+@pytest.mark.asyncio
+async def test_overlap_conflicts_and_incremental_check(db_session, setup_data):
+    small, large, classes = setup_data
+
+    # Em 101, T20, T40 e T60 estão no mesmo horário (a proposta em staging não conta)
+    total, conflicts = await DashboardService.get_overlap_conflicts(db_session)
+    assert total == 1
+    assert conflicts[0]["room_number"] == "101"
+    assert sorted(conflicts[0]["class_names"]) == ["T20", "T40", "T60"]
+    assert conflicts[0]["students"] == 120
+    assert conflicts[0]["severity"] == "Alta"
+
+    # T20 em 102 junto com T80: cabem juntas, mas passam de 90% da capacidade
+    check = await DashboardService.check_schedule(
+        db_session, large.id, classes[0].id, [1, 4], "20:00", "21:00"
+    )
+    assert check["days_of_week"] == [1]
+    assert sorted(check["class_names"]) == ["T20", "T80"]
+    assert check["severity"] == "Média"
+    assert await DashboardService.check_schedule(
+        db_session, large.id, classes[0].id, [1], "22:00", "23:00"
+    ) is None
+
+
+@pytest.mark.asyncio
+async def test_summary_runs_panels_on_separate_sessions(db_session, setup_data):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+    opened = []
+    sessions = async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+    def session_factory():
+        opened.append(1)
+        return sessions()
+
+    summary = await DashboardService.get_summary(session_factory, conflict_limit=1)
+
+    assert len(opened) == 4
+    assert summary["stats"] == await DashboardService.get_stats(db_session)
+    assert summary["occupancy"] == await DashboardService.get_occupancy_data(db_session)
+    assert summary["distribution"] == await DashboardService.get_room_distribution(db_session)
+    assert [c["class_name"] for c in summary["conflicts"]] == ["T60"]
+    assert set(summary["timings_ms"]) == {"stats", "occupancy", "distribution", "conflicts", "total"}
+
+
+@pytest.mark.asyncio
+async def test_occupancy_heatmap_expands_days_in_sql(db_session, setup_data):
+    small, large, classes = setup_data
+    db_session.add(Schedule(
+        days_of_week=[2, 3], start_time="08:00", end_time="10:00", status="approved",
+        room_id=large.id, school_class_id=classes[0].id,
+    ))
+    await db_session.commit()
+
+    heatmap = await DashboardService.get_occupancy_heatmap(db_session)
+    assert heatmap["blocks"] == [{"campus": "C", "building": "B", "block": "A", "capacity": 130, "rooms": 2}]
+    assert heatmap["slots"] == [
+        {"start_time": "19:00", "end_time": "22:00"},
+        {"start_time": "08:00", "end_time": "10:00"},
+    ]
+    columns = heatmap["columns"]
+    cells = list(zip(columns["day"], columns["slot"], columns["students"], columns["rooms_used"], columns["utilization"]))
+    # Dia 1, 19h: T20, T40, T60 (101) e T80 (102); a proposta em staging não conta
+    assert cells == [
+        (1, 0, 200, 2, round(200 / 130, 4)),
+        (2, 1, 20, 1, round(20 / 130, 4)),
+        (3, 1, 20, 1, round(20 / 130, 4)),
+    ]
+    assert heatmap["cells"] == 3
+
+    approved = await DashboardService.get_occupancy_heatmap(db_session, status="approved")
+    assert approved["columns"]["students"] == [60, 20, 20]
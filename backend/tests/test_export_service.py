@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.models.models import STAGED, Course, Room, Schedule, SchoolClass, Subject
+from app.services.export_service import EXPORT_FIELDS, ExportService
+
+
+@pytest.fixture
+async def sessions(db_session):
+    course = Course(name="C1", code="C1")
+    subject = Subject(code="MAT1", name="Cálculo I", workload=60, offered_month="Mar")
+    rooms = [
+        Room(number=f"{n}", capacity=40, campus=campus, building="B", block="A", floor=1)
+        for n, campus in [(101, "Sul"), (102, "Norte"), (103, "Norte")]
+    ]
+    db_session.add_all([course, subject, *rooms])
+    await db_session.flush()
+    classes = [
+        SchoolClass(name=f"T{n}", shift="N", semester=1, students_count=30, course_id=course.id,
+                    subject_id=subject.id if n == 0 else None)
+        for n in range(4)
+    ]
+    db_session.add_all(classes)
+    await db_session.flush()
+    db_session.add_all([
+        Schedule(days_of_week=[1, 3], start_time="19:00", end_time="22:00", status="approved",
+                 room_id=room.id, school_class_id=school_class.id)
+        for room, school_class in zip(rooms, classes)
+    ] + [
+        Schedule(days_of_week=[2], start_time="19:00", end_time="22:00", status=STAGED,
+                 room_id=rooms[0].id, school_class_id=classes[3].id),
+    ])
+    await db_session.commit()
+    return async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_rows_are_streamed_in_batches(sessions):
+    batches = [batch async for batch in ExportService.schedule_rows(sessions, batch_size=2)]
+    # Propostas em staging ficam fora; ordem por campus e sala
+    assert [len(batch) for batch in batches] == [2, 1]
+    rows = [row for batch in batches for row in batch]
+    assert [(row["campus"], row["room"], row["class_name"]) for row in rows] == [
+        ("Norte", "102", "T1"), ("Norte", "103", "T2"), ("Sul", "101", "T0"),
+    ]
+    assert rows[2]["subject_code"] == "MAT1" and rows[0]["subject_code"] is None
+
+    rows = [row async for batch in ExportService.schedule_rows(sessions, 10, campus="Sul") for row in batch]
+    assert [row["class_name"] for row in rows] == ["T0"]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_and_csv_writers(sessions):
+    body = "".join([chunk async for chunk in ExportService.ndjson(ExportService.schedule_rows(sessions, 2))])
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert len(lines) == 3 and lines[0]["days_of_week"] == [1, 3]
+
+    chunks = [chunk async for chunk in ExportService.csv(ExportService.schedule_rows(sessions, 2))]
+    assert len(chunks) == 2
+    reader = csv.DictReader(io.StringIO("".join(chunks)))
+    assert reader.fieldnames == EXPORT_FIELDS
+    assert [(row["room"], row["days_of_week"]) for row in reader][-1] == ("101", "1 3")
+
+    # Sem alocações, só o cabeçalho
+    chunks = [chunk async for chunk in ExportService.csv(ExportService.schedule_rows(sessions, 2, campus="Leste"))]
+    assert chunks == [",".join(EXPORT_FIELDS) + "\r\n"]
@@ -0,0 +1,52 @@
+from uuid import uuid4
+from app.services.allocation_engine import Assignment, ClassSpec, RoomSpec, SchedulingSnapshot, solve
+from app.services.local_search import _SearchState, bin_cost, improve
+
+
+def test_bin_cost():
+    assert bin_cost(0, 0, 50) == 0
+    assert bin_cost(30, 1, 50) == 20
+    assert bin_cost(60, 2, 50) > bin_cost(55, 1, 50)
+
+
+def test_improve_removes_capacity_conflict():
+    big = RoomSpec(id=uuid4(), capacity=100)
+    small = RoomSpec(id=uuid4(), capacity=40)
+    c1 = ClassSpec(id=uuid4(), students_count=35)
+    c2 = ClassSpec(id=uuid4(), students_count=90)
+    snapshot = SchedulingSnapshot(rooms=[big, small], classes=[c1, c2])
+
+    # Plano ruim de propósito: turma grande na sala pequena
+    bad_plan = [Assignment(c1.id, big.id), Assignment(c2.id, small.id)]
+    improved, stats = improve(snapshot, bad_plan, time_budget_ms=50, seed=1)
+
+    by_class = {a.school_class_id: a.room_id for a in improved}
+    assert by_class[c2.id] == big.id
+    assert stats.conflicts_before == 1
+    assert stats.conflicts_removed == 1
+
+
+def test_solve_with_time_budget_reports_search():
+    room = RoomSpec(id=uuid4(), capacity=50)
+    classes = [ClassSpec(id=uuid4(), students_count=20) for _ in range(2)]
+
+    result = solve(SchedulingSnapshot(rooms=[room], classes=classes), time_budget_ms=10)
+
+    assert result.search is not None
+    assert result.metrics.allocated == 2
+
+
+def test_improve_returns_best_plan_seen_not_last():
+    import random
+    rng = random.Random(7)
+    rooms = [RoomSpec(id=uuid4(), capacity=rng.randrange(20, 80)) for _ in range(6)]
+    classes = [ClassSpec(id=uuid4(), students_count=rng.randrange(10, 70)) for _ in range(40)]
+    snapshot = SchedulingSnapshot(rooms=rooms, classes=classes)
+    plan = [Assignment(c.id, rooms[n % len(rooms)].id) for n, c in enumerate(classes)]
+
+    # O annealing aceita pioras: o plano devolvido vem do diário desfeito, não do estado final
+    improved, stats = improve(snapshot, plan, time_budget_ms=30, seed=3)
+
+    assert stats.iterations > len(classes)
+    assert sorted(a.school_class_id for a in improved) == sorted(c.id for c in classes)
+    assert _SearchState(snapshot, improved).total_cost() <= _SearchState(snapshot, plan).total_cost()
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.db.migrations import upgrade_schema
+
+
+async def columns(conn, table):
+    return await conn.run_sync(lambda sync: {c["name"] for c in inspect(sync).get_columns(table)})
+
+
+@pytest.mark.asyncio
+async def test_upgrade_adds_missing_columns_once():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        # Esquema anterior à coluna campus
+        await conn.execute(text(
+            "CREATE TABLE school_classes (id CHAR(32) PRIMARY KEY, name VARCHAR(100), "
+            "shift VARCHAR(50), semester INTEGER, students_count INTEGER, course_id CHAR(32), subject_id CHAR(32))"
+        ))
+        await conn.execute(text("INSERT INTO school_classes (id, name) VALUES ('a', 'T1')"))
+
+        assert "school_classes.campus" in await upgrade_schema(conn)
+        assert "campus" in await columns(conn, "school_classes")
+        assert (await conn.execute(text("SELECT name, campus FROM school_classes"))).all() == [("T1", None)]
+
+        assert await upgrade_schema(conn) == []
+
+        # Alocações anteriores às execuções do ensalamento: run_id entra com FK e índice
+        await conn.execute(text(
+            "CREATE TABLE schedule_runs (id INTEGER PRIMARY KEY, algorithm VARCHAR(20), fingerprint VARCHAR(64))"
+        ))
+        await conn.execute(text("INSERT INTO schedule_runs (id, algorithm, fingerprint) VALUES (1, 'greedy', 'f')"))
+        await conn.execute(text(
+            "CREATE TABLE schedules (id CHAR(32) PRIMARY KEY, days_of_week JSON, start_time VARCHAR(5), "
+            "end_time VARCHAR(5), status VARCHAR(20), room_id CHAR(32), school_class_id CHAR(32))"
+        ))
+        assert await upgrade_schema(conn) == ["schedule_runs.report", "schedules.run_id", "schedule_runs.status"]
+        # Execuções antigas já estavam publicadas
+        assert (await conn.execute(text("SELECT status FROM schedule_runs"))).scalar() == "published"
+        assert "run_id" in await columns(conn, "schedules")
+        indexes = await conn.run_sync(lambda sync: inspect(sync).get_indexes("schedules"))
+        assert [index["name"] for index in indexes] == ["ix_schedules_run_id"]
+        foreign_keys = await conn.run_sync(lambda sync: inspect(sync).get_foreign_keys("schedules"))
+        assert foreign_keys[0]["referred_table"] == "schedule_runs"
+    await engine.dispose()
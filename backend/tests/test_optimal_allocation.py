@@ -0,0 +1,46 @@
+from uuid import uuid4
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from app.services.optimal_allocation import build_cost_matrix
+from app.services.allocation_engine import ClassSpec, RoomSpec, SchedulingSnapshot, solve
+
+
+def test_optimal_respects_room_type_when_greedy_does_not():
+    lab = RoomSpec(id=uuid4(), capacity=40, room_type="Laboratório")
+    common = RoomSpec(id=uuid4(), capacity=40, room_type="Sala Comum")
+    theory = ClassSpec(id=uuid4(), students_count=30, required_room_type="Sala Comum")
+    practice = ClassSpec(id=uuid4(), students_count=35, required_room_type="Laboratório")
+
+    result = solve(SchedulingSnapshot(rooms=[lab, common], classes=[theory, practice]), "optimal")
+    by_class = {a.school_class_id: a.room_id for a in result.assignments}
+
+    assert by_class[theory.id] == common.id
+    assert by_class[practice.id] == lab.id
+    assert result.baseline is not None
+
+
+def test_optimal_falls_back_to_greedy_sharing_when_rooms_run_out():
+    room = RoomSpec(id=uuid4(), capacity=100)
+    classes = [ClassSpec(id=uuid4(), students_count=30) for _ in range(3)]
+
+    result = solve(SchedulingSnapshot(rooms=[room], classes=classes), "optimal")
+
+    assert result.metrics.allocated == 3
+    assert result.metrics.overcapacity_rows == 0
+    assert result.metrics.total_waste == 10
+
+
+def test_room_type_is_never_traded_for_capacity():
+    # Grupo 0 exige sala comum; a única comum o superlota, mas o laboratório não é opção
+    cost = build_cost_matrix(
+        np.array([30, 20]), [{"Sala Comum"}, set()],
+        np.array([20, 30, 30]), ["Sala Comum", "Laboratório", "Laboratório"],
+    )
+    rows, cols = linear_sum_assignment(cost)
+    assert dict(zip(rows.tolist(), cols.tolist()))[0] == 0
+
+    # Turmas de tipos diferentes no mesmo grupo: só a sala sem tipo é compatível
+    cost = build_cost_matrix(
+        np.array([30]), [{"Sala Comum", "Laboratório"}], np.array([30, 30, 60]), ["Sala Comum", "Laboratório", None],
+    )
+    assert linear_sum_assignment(cost)[1].tolist() == [2]
@@ -0,0 +1,69 @@
+import random
+from itertools import combinations
+from uuid import uuid4
+
+from app.services.overlap_detection import check_candidate, expand, find_overlaps
+
+
+def test_overlaps_are_grouped_by_room_and_days():
+    room, other_room = uuid4(), uuid4()
+    a, b, c, d = uuid4(), uuid4(), uuid4(), uuid4()
+    intervals = (
+        expand(a, room, [1, 2], "19:00", "21:00", 30)
+        + expand(b, room, [1, 2, 3], "20:00", "22:00", 25)
+        # Começa quando A termina: não sobrepõe A, mas sobrepõe B
+        + expand(c, room, [4], "21:00", "22:00", 10)
+        + expand(d, other_room, [1], "19:00", "22:00", 40)
+    )
+    conflicts = find_overlaps(intervals, {room: 50, other_room: 40})
+
+    assert len(conflicts) == 1
+    conflict = conflicts[0]
+    assert set(conflict.schedule_ids) == {a, b}
+    assert conflict.days == [1, 2]
+    assert (conflict.start, conflict.end) == (19 * 60, 22 * 60)
+    assert conflict.peak_students == 55
+    assert conflict.severity == "Alta"
+
+
+def test_severity_follows_combined_capacity():
+    room = uuid4()
+    intervals = expand(uuid4(), room, [1], "19:00", "22:00", 20) + expand(uuid4(), room, [1], "19:00", "22:00", 25)
+    assert find_overlaps(intervals, {room: 50})[0].severity == "Baixa"
+    assert find_overlaps(intervals, {room: 48})[0].severity == "Média"
+    assert find_overlaps(intervals, {room: 44})[0].severity == "Alta"
+
+
+def test_sweep_matches_pairwise_check():
+    rng = random.Random(7)
+    rooms = [uuid4() for _ in range(5)]
+    intervals = []
+    for _ in range(200):
+        start = rng.randrange(7 * 60, 21 * 60, 30)
+        end = start + rng.choice([60, 90, 120, 180])
+        intervals += expand(uuid4(), rng.choice(rooms), [rng.randint(1, 6)],
+                            f"{start // 60:02d}:{start % 60:02d}", f"{end // 60:02d}:{end % 60:02d}", 10)
+
+    overlapping = set()
+    for x, y in combinations(intervals, 2):
+        if x.room_id == y.room_id and x.day == y.day and x.start < y.end and y.start < x.end:
+            overlapping.update({x.schedule_id, y.schedule_id})
+
+    conflicts = find_overlaps(intervals, {room: 100 for room in rooms})
+    assert {schedule_id for conflict in conflicts for schedule_id in conflict.schedule_ids} == overlapping
+
+
+def test_check_candidate_uses_peak_inside_its_window():
+    room = uuid4()
+    morning, evening = uuid4(), uuid4()
+    existing = (
+        expand(morning, room, [1], "08:00", "12:00", 30)
+        + expand(evening, room, [1, 2], "19:00", "22:00", 30)
+    )
+    assert check_candidate(expand(None, room, [1], "13:00", "19:00", 30), existing, 40) is None
+
+    conflict = check_candidate(expand(None, room, [1, 2, 3], "20:00", "21:00", 15), existing, 40)
+    assert set(conflict.schedule_ids) == {None, evening}
+    assert conflict.days == [1, 2]
+    assert conflict.peak_students == 45
+    assert conflict.severity == "Alta"
@@ -0,0 +1,99 @@
+import datetime
+import pytest
+from app.models.models import STAGED, AuditLog, Course, Room, Schedule, SchoolClass
+from app.services.audit_service import AuditService
+from app.services.pagination import split_page
+from app.services.room_service import RoomService
+from app.services.schedule_service import ScheduleService
+
+
+async def all_pages(fetch, order, limit):
+    """Percorre as páginas seguindo o cursor, como faria um cliente."""
+    pages, cursor = [], None
+    while True:
+        page, cursor = split_page(await fetch(cursor=cursor, limit=limit + 1), order, limit)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.asyncio
+async def test_room_filters_and_keyset_pages(db_session):
+    db_session.add_all([
+        Room(number=f"{n:03d}", capacity=10 * n, campus="Norte" if n % 2 else "Sul",
+             building="B", block="A", floor=1, is_active=n != 5)
+        for n in range(1, 8)
+    ])
+    await db_session.commit()
+
+    pages = await all_pages(
+        lambda **page: RoomService.get_all(db_session, campus="Norte", is_active=True, **page),
+        RoomService.ORDER, limit=2,
+    )
+    assert [[r.number for r in page] for page in pages] == [["001", "003"], ["007"]]
+    rooms = await RoomService.get_all(db_session, min_capacity=60)
+    assert [r.number for r in rooms] == ["006", "007"]
+
+    with pytest.raises(ValueError):
+        await RoomService.get_all(db_session, cursor="não-é-cursor", limit=2)
+
+
+@pytest.mark.asyncio
+async def test_schedule_filters_run_in_sql(db_session):
+    north = Room(number="101", capacity=40, campus="Norte", building="B", block="A", floor=1)
+    south = Room(number="201", capacity=40, campus="Sul", building="B", block="A", floor=1)
+    course = Course(name="C1", code="C1")
+    db_session.add_all([north, south, course])
+    await db_session.flush()
+    classes = [SchoolClass(name=f"T{n}", shift="N", semester=1, students_count=20, course_id=course.id) for n in range(4)]
+    db_session.add_all(classes)
+    await db_session.flush()
+    db_session.add_all([
+        Schedule(days_of_week=[1, 3], start_time="19:00", end_time="22:00", status="approved",
+                 room_id=north.id, school_class_id=classes[0].id),
+        Schedule(days_of_week=[2], start_time="19:00", end_time="22:00", status="pending",
+                 room_id=north.id, school_class_id=classes[1].id),
+        Schedule(days_of_week=[3], start_time="19:00", end_time="22:00", status="pending",
+                 room_id=south.id, school_class_id=classes[2].id),
+        Schedule(days_of_week=[3], start_time="19:00", end_time="22:00", status=STAGED,
+                 room_id=north.id, school_class_id=classes[3].id),
+    ])
+    await db_session.commit()
+
+    def names(schedules):
+        return sorted(s.school_class.name for s in schedules)
+
+    assert names(await ScheduleService.get_all(db_session, day=3)) == ["T0", "T2"]
+    assert names(await ScheduleService.get_all(db_session, campus="Norte", day=3)) == ["T0"]
+    assert names(await ScheduleService.get_all(db_session, status="pending", room_id=north.id)) == ["T1"]
+
+    pages = await all_pages(
+        lambda **page: ScheduleService.get_all(db_session, **page), ScheduleService.ORDER, limit=2
+    )
+    assert [len(page) for page in pages] == [2, 1]
+    assert names([s for page in pages for s in page]) == ["T0", "T1", "T2"]
+
+
+@pytest.mark.asyncio
+async def test_audit_pages_newest_first_within_time_range(db_session):
+    start = datetime.datetime(2024, 3, 1, 8, 0)
+    # Dois registros no mesmo instante: o id desempata sem repetir nem pular linhas
+    db_session.add_all([
+        AuditLog(timestamp=start + datetime.timedelta(hours=hour), user=user, action="UPDATE",
+                 context="Salas", ip="127.0.0.1", impact="Baixa")
+        for hour, user in [(0, "ana"), (1, "ana"), (1, "bia"), (2, "ana"), (5, "ana")]
+    ])
+    await db_session.commit()
+
+    pages = await all_pages(
+        lambda **page: AuditService.get_all(
+            db_session, since=start, until=start + datetime.timedelta(hours=5), **page
+        ),
+        AuditService.ORDER, limit=2,
+    )
+    logs = [log for page in pages for log in page]
+    assert [log.timestamp.hour for log in logs] == [10, 9, 9, 8]
+    assert len({log.id for log in logs}) == 4
+
+    logs = await AuditService.get_all(db_session, user="bia")
+    assert [log.user for log in logs] == ["bia"]
@@ -0,0 +1,41 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+from app.services.allocation_engine import ClassSpec, RoomSpec, SchedulingSnapshot
+from app.services.partitioned_scheduling import partition_snapshot, solve_partitioned
+
+
+def _snapshot():
+    north = RoomSpec(id=uuid4(), capacity=60, campus="Norte")
+    south = RoomSpec(id=uuid4(), capacity=60, campus="Sul")
+    classes = [
+        ClassSpec(id=uuid4(), students_count=40, campus="Norte"),
+        ClassSpec(id=uuid4(), students_count=40, campus="Sul"),
+        ClassSpec(id=uuid4(), students_count=10),  # sem campus: residual
+    ]
+    return SchedulingSnapshot(rooms=[north, south], classes=classes), north, south
+
+
+def test_partition_snapshot_by_campus():
+    snapshot, north, south = _snapshot()
+
+    partitions, residual = partition_snapshot(snapshot)
+
+    assert [p.rooms for p in partitions] == [[north], [south]]
+    assert [len(p.classes) for p in partitions] == [1, 1]
+    assert [c.students_count for c in residual] == [10]
+
+
+@pytest.mark.asyncio
+async def test_solve_partitioned_keeps_classes_on_their_campus():
+    snapshot, north, south = _snapshot()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = await solve_partitioned(snapshot, executor)
+
+    by_class = {a.school_class_id: a.room_id for a in result.assignments}
+    assert by_class[snapshot.classes[0].id] == north.id
+    assert by_class[snapshot.classes[1].id] == south.id
+    assert result.metrics.allocated == 3
+    # A turma residual compartilha uma sala já usada, sem superlotar
+    assert result.metrics.overcapacity_rows == 0
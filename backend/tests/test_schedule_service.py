@@ -1,6 +1,7 @@
 import pytest
 from uuid import uuid4
 from app.services.schedule_service import ScheduleService
+from app.schemas.schedule_schemas import ScheduleRunSchema
 from app.models.models import Room, SchoolClass, Subject, Course, RoomType
 
 @pytest.fixture
@@ -87,3 +88,237 @@ async def test_auto_scheduling_cooperative(db_session):
     # Ambas devem estar na mesma sala (somam 80 < 100)
     assert len(schedules) == 2
     assert schedules[0].room_id == schedules[1].room_id
+
+@pytest.mark.asyncio
+async def test_incremental_scheduling_keeps_unaffected_proposals(db_session):
+    from app.services.academic_service import SchoolClassService
+    from app.schemas.schemas import SchoolClassUpdate
+
+    db_session.add_all([
+        Room(number="301", capacity=40, campus="C", building="B", block="C", floor=3),
+        Room(number="302", capacity=90, campus="C", building="B", block="C", floor=3),
+    ])
+    course = Course(name="C3", code="C3")
+    db_session.add(course)
+    await db_session.flush()
+
+    stable = SchoolClass(name="T1", shift="N", semester=1, students_count=30, course_id=course.id)
+    growing = SchoolClass(name="T2", shift="N", semester=1, students_count=35, course_id=course.id)
+    db_session.add_all([stable, growing])
+    await db_session.commit()
+
+    first = await ScheduleService.run_auto_scheduling(db_session)
+    stable_row = next(s for s in first if s.school_class_id == stable.id)
+
+    await SchoolClassService.update(db_session, growing.id, SchoolClassUpdate(students_count=80))
+    result = await ScheduleService.generate(db_session, incremental=True)
+
+    assert result.reused == 1
+    assert [a.school_class_id for a in result.assignments] == [growing.id]
+    schedules = await ScheduleService.get_all(db_session)
+    assert len(schedules) == 2
+    assert any(s.id == stable_row.id and s.room_id == stable_row.room_id for s in schedules)
+    # Nada mudou desde a última execução: nenhuma turma é realocada
+    again = await ScheduleService.generate(db_session, incremental=True)
+    assert again.assignments == [] and again.reused == 2
+
+@pytest.mark.asyncio
+async def test_auto_scheduling_job(db_session, setup_data, monkeypatch):
+    from app.core.config import settings
+    from app.core import executor
+    from app.services.job_service import JobService
+    from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+    monkeypatch.setattr(settings, "SCHEDULER_EXECUTOR", "thread")
+    monkeypatch.setattr(executor, "_executor", None)
+
+    session_factory = async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    job = JobService.submit(session_factory=session_factory)
+    assert job.state == "queued"
+
+    finished = await JobService.wait(job.id)
+    executor.shutdown_executor()
+
+    assert finished.state == "succeeded", finished.error
+    assert finished.progress == 1.0
+    assert finished.metrics["allocated"] == 1
+    assert {"loading", "solving", "persisting", "total"} <= set(finished.timings_ms)
+    assert finished.result["created"] == 1 and finished.result["run_id"] == finished.run_id
+    schedules = await ScheduleService.get_all(db_session)
+    assert len(schedules) == 1
+
+@pytest.mark.asyncio
+async def test_job_and_direct_call_share_one_execution(db_session, setup_data, monkeypatch):
+    import asyncio
+    from app.services.job_service import JobService
+    from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+    solves = []
+    original = ScheduleService.solve_in_executor
+
+    async def counting(*args, **kwargs):
+        solves.append(1)
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(ScheduleService, "solve_in_executor", staticmethod(counting))
+    session_factory = async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    job = JobService.submit(force=True, session_factory=session_factory)
+    direct = asyncio.ensure_future(ScheduleService.generate(db_session, force=True))
+    finished, result = await JobService.wait(job.id), await direct
+
+    assert finished.state == "succeeded", finished.error
+    assert len(solves) == 1
+    assert finished.run_id == result.run_id
+
+@pytest.mark.asyncio
+async def test_auto_scheduling_memoized_until_inputs_change(db_session, setup_data):
+    from app.services.room_service import RoomService
+    from app.schemas.schemas import RoomUpdate
+
+    room, school_class, _ = setup_data
+    first = await ScheduleService.generate(db_session)
+    assert not first.memoized and len(first.assignments) == 1
+    first_ids = {s.id for s in await ScheduleService.get_all(db_session)}
+
+    # Mesmas entradas e parâmetros: nada é recalculado nem regravado
+    again = await ScheduleService.generate(db_session)
+    assert again.memoized and again.reused == 1
+    assert again.metrics == first.metrics
+    assert {s.id for s in await ScheduleService.get_all(db_session)} == first_ids
+
+    # Outro algoritmo ou uma escrita em salas invalidam o fingerprint
+    assert not (await ScheduleService.generate(db_session, algorithm="optimal")).memoized
+    await RoomService.update(db_session, room.id, RoomUpdate(capacity=60))
+    assert not (await ScheduleService.generate(db_session, algorithm="optimal")).memoized
+    assert (await ScheduleService.generate(db_session, algorithm="optimal")).memoized
+
+@pytest.mark.asyncio
+async def test_auto_scheduling_stores_run_report(db_session, setup_data):
+    result = await ScheduleService.generate(db_session)
+
+    runs = await ScheduleService.get_runs(db_session)
+    assert [run.id for run in runs] == [result.run_id]
+    schema = ScheduleRunSchema.model_validate(runs[0])
+    assert schema.status == "published" and schema.fingerprint is not None
+    report = runs[0].report
+    assert {"load.classes", "solve.allocation", "persist.insert", "persist.commit"} <= set(report["timings_ms"])
+    assert report["counters"]["groups"] == 1
+    assert report["counters"]["group_fits"] == 1
+    assert report["counters"]["split_groups"] == 0
+    assert report["counters"]["share_fallbacks"] == 0
+
+@pytest.mark.asyncio
+async def test_auto_scheduling_publishes_atomically(db_session, setup_data, monkeypatch):
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+    from app.models.models import Schedule, ScheduleRun
+    from app.services.change_log_service import ChangeLogService
+
+    await ScheduleService.generate(db_session)
+    old_ids = {s.id for s in await ScheduleService.get_all(db_session)}
+    readers = async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    seen_during_publish = []
+
+    async def observe(db):
+        # Novas propostas já gravadas como "staged": leitores continuam vendo o plano anterior
+        async with readers() as other:
+            seen_during_publish.append({s.id for s in await ScheduleService.get_all(other)})
+
+    async def fail(db, changes):
+        raise RuntimeError("falha na publicação")
+
+    monkeypatch.setattr(ScheduleService, "_lock_publication", staticmethod(observe))
+    monkeypatch.setattr(ChangeLogService, "consume", fail)
+    with pytest.raises(RuntimeError):
+        await ScheduleService.generate(db_session, force=True)
+
+    # Antes do staging (limpeza) e durante a publicação
+    assert seen_during_publish == [old_ids, old_ids]
+    rows = (await db_session.execute(select(Schedule.id, Schedule.status))).all()
+    assert {row.id for row in rows} == old_ids
+    assert {row.status for row in rows} == {"pending"}
+    statuses = (await db_session.execute(select(ScheduleRun.status).order_by(ScheduleRun.id))).scalars().all()
+    assert statuses == ["published", "failed"]
+
+@pytest.mark.asyncio
+async def test_interrupted_staging_is_discarded_by_next_run(db_session, setup_data):
+    from sqlalchemy import select
+    from app.models.models import STAGED, Schedule, ScheduleRun
+
+    room, school_class, _ = setup_data
+    # Execução que caiu entre o staging e a publicação
+    stale = ScheduleRun(algorithm="greedy", mode="full", status="staging")
+    db_session.add(stale)
+    await db_session.flush()
+    db_session.add(Schedule(days_of_week=[1], start_time="19:00", end_time="22:00", status=STAGED,
+                            room_id=room.id, school_class_id=school_class.id, run_id=stale.id))
+    await db_session.commit()
+
+    run_id = (await ScheduleService.generate(db_session, force=True)).run_id
+
+    rows = (await db_session.execute(select(Schedule.run_id, Schedule.status))).all()
+    assert [(row.run_id, row.status) for row in rows] == [(run_id, "pending")]
+    runs = (await db_session.execute(select(ScheduleRun.id, ScheduleRun.status).order_by(ScheduleRun.id))).all()
+    assert [tuple(run) for run in runs] == [(stale.id, "failed"), (run_id, "published")]
+
+@pytest.mark.asyncio
+async def test_discarded_run_is_not_published(db_session, setup_data, monkeypatch):
+    from sqlalchemy import select
+    from app.models.models import Schedule, ScheduleRun
+
+    await ScheduleService.generate(db_session)
+    old_ids = {s.id for s in await ScheduleService.get_all(db_session)}
+    calls = []
+
+    async def discard_between_phases(db):
+        # Na segunda chamada (publicação), outro processo já descartou a execução em staging
+        calls.append(db)
+        if len(calls) == 2:
+            await ScheduleService._discard_stale_runs(db)
+
+    monkeypatch.setattr(ScheduleService, "_lock_publication", staticmethod(discard_between_phases))
+    with pytest.raises(RuntimeError):
+        await ScheduleService.generate(db_session, force=True)
+
+    assert {s.id for s in await ScheduleService.get_all(db_session)} == old_ids
+    statuses = (await db_session.execute(select(ScheduleRun.status).order_by(ScheduleRun.id))).scalars().all()
+    assert statuses == ["published", "failed"]
+
+@pytest.mark.asyncio
+async def test_concurrent_auto_scheduling_is_single_flight(db_session, setup_data):
+    import asyncio
+    from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+    other = async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)()
+    leader, follower = await asyncio.gather(
+        ScheduleService.generate(db_session, force=True),
+        ScheduleService.generate(other, force=True),
+    )
+    await other.close()
+
+    assert not leader.shared and follower.shared
+    assert follower.run_id == leader.run_id
+    assert len(await ScheduleService.get_runs(db_session)) == 1
+    assert len(await ScheduleService.get_all(db_session)) == 1
+
+@pytest.mark.asyncio
+async def test_every_algorithm_solves_off_the_event_loop(db_session, setup_data, monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services import allocation_engine, schedule_service
+
+    solver_threads = []
+    original = allocation_engine.solve
+
+    def recording_solve(*args, **kwargs):
+        solver_threads.append(threading.current_thread())
+        return original(*args, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        monkeypatch.setattr(schedule_service, "get_executor", lambda: pool)
+        monkeypatch.setattr(schedule_service, "solve", recording_solve)
+        for algorithm in ("greedy", "optimal"):
+            await ScheduleService.generate(db_session, algorithm=algorithm, force=True)
+
+    assert len(solver_threads) == 2
+    assert threading.main_thread() not in solver_threads
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import func, select
+from app.models.models import Course, Room, RoomType, Schedule, ScheduleRun, SchoolClass
+from app.schemas.schedule_schemas import ClassOverride, RoomOverride
+from app.services.simulation_service import SimulationService
+
+
+@pytest.fixture
+async def setup_data(db_session):
+    SimulationService.clear_cache()
+    small = Room(number="101", capacity=40, campus="C", building="B", block="A", floor=1)
+    large = Room(number="102", capacity=90, campus="C", building="B", block="A", floor=1)
+    closed = Room(number="103", capacity=120, campus="C", building="B", block="A", floor=1,
+                  type=RoomType.AUDITORIUM, is_active=False)
+    course = Course(name="C1", code="C1")
+    db_session.add_all([small, large, closed, course])
+    await db_session.flush()
+
+    c1 = SchoolClass(name="T1", shift="N", semester=1, students_count=35, course_id=course.id)
+    c2 = SchoolClass(name="T2", shift="N", semester=1, students_count=80, course_id=course.id)
+    db_session.add_all([c1, c2])
+    await db_session.commit()
+    yield small, large, closed, c1, c2
+    SimulationService.clear_cache()
+
+
+@pytest.mark.asyncio
+async def test_simulation_applies_overrides_without_writing(db_session, setup_data):
+    small, large, closed, c1, c2 = setup_data
+
+    # E se a sala 102 fechar?
+    closing = await SimulationService.simulate(db_session, [RoomOverride(id=large.id, is_active=False)])
+    assert not closing.snapshot_cached
+    assert closing.reference.metrics.overcapacity_rows == 0
+    assert {a.room_id for a in closing.result.assignments} == {small.id}
+    assert closing.result.metrics.overcapacity_rows == 2
+    assert closing.moved == 1
+
+    # E se a turma T1 crescer para 80 e o auditório reabrir? O snapshot vem do cache
+    growing = await SimulationService.simulate(
+        db_session,
+        [RoomOverride(id=closed.id, is_active=True)],
+        [ClassOverride(id=c1.id, students_count=80)],
+    )
+    assert growing.snapshot_cached
+    assert growing.result.metrics.overcapacity_rows == 0
+    rooms = {a.school_class_id: a.room_id for a in growing.result.assignments}
+    assert closed.id in rooms.values()
+
+    with pytest.raises(ValueError):
+        await SimulationService.simulate(db_session, class_overrides=[ClassOverride(id=small.id)])
+
+    # Nada foi gravado
+    assert (await db_session.execute(select(func.count(Schedule.id)))).scalar_one() == 0
+    assert (await db_session.execute(select(func.count(ScheduleRun.id)))).scalar_one() == 0
+
+
+@pytest.mark.asyncio
+async def test_simulation_ignores_null_overrides(db_session, setup_data):
+    small, large, closed, c1, c2 = setup_data
+
+    # null explícito não apaga o valor atual (antes: TypeError no alocador)
+    simulation = await SimulationService.simulate(
+        db_session,
+        [RoomOverride.model_validate({"id": large.id, "capacity": None, "type": None, "is_active": None})],
+        [ClassOverride.model_validate({"id": c2.id, "students_count": None, "required_room_type": None})],
+    )
+    assert simulation.moved == 0
+    assert simulation.result.metrics == simulation.reference.metrics
+
+
+@pytest.mark.asyncio
+async def test_simulation_snapshot_follows_input_versions(db_session, setup_data):
+    from app.services.room_service import RoomService
+    from app.schemas.schemas import RoomUpdate
+
+    small, large, _, c1, _ = setup_data
+    assert not (await SimulationService.simulate(db_session)).snapshot_cached
+    assert (await SimulationService.simulate(db_session)).snapshot_cached
+
+    # Uma escrita pelos serviços incrementa a versão de salas e invalida o snapshot
+    await RoomService.update(db_session, large.id, RoomUpdate(is_active=False))
+    simulation = await SimulationService.simulate(db_session)
+    assert not simulation.snapshot_cached
+    assert {a.room_id for a in simulation.result.assignments} == {small.id}
@@ -0,0 +1,72 @@
+import pytest
+from app.models.models import Course, Room
+from app.schemas.schemas import RoomCreate, RoomUpdate, SchoolClassCreate, SchoolClassUpdate
+from app.services.academic_service import SchoolClassService
+from app.services.dashboard_service import DashboardService
+from app.services.room_service import RoomService
+from app.services.schedule_service import ScheduleService
+from app.services.stats_service import StatsService
+
+
+def room_in(number, capacity, block="A"):
+    return RoomCreate(campus="C", building="B", block=block, floor=1, number=number, capacity=capacity)
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_write_paths(db_session):
+    # Primeira leitura constrói os contadores
+    assert (await DashboardService.get_stats(db_session))["total_rooms"] == 0
+
+    course = Course(name="C1", code="C1")
+    db_session.add(course)
+    await db_session.commit()
+
+    small = await RoomService.create(db_session, room_in("101", 30))
+    await RoomService.create(db_session, room_in("201", 60, block="B"))
+    t1 = await SchoolClassService.create(db_session, SchoolClassCreate(
+        name="T1", shift="N", semester=1, students_count=25, course_id=course.id))
+    await SchoolClassService.create(db_session, SchoolClassCreate(
+        name="T2", shift="N", semester=1, students_count=50, course_id=course.id))
+    await ScheduleService.generate(db_session)
+    assert await StatsService.reconcile(db_session, fix=False) == {}
+
+    # A turma cresce, a sala encolhe, uma alocação manual entra e outra sai
+    await SchoolClassService.update(db_session, t1.id, SchoolClassUpdate(students_count=40))
+    await RoomService.update(db_session, small.id, RoomUpdate(capacity=20, block="C"))
+    manual = await ScheduleService.create(db_session, {
+        "room_id": small.id, "school_class_id": t1.id,
+        "days_of_week": [4], "start_time": "19:00", "end_time": "22:00",
+    })
+    await ScheduleService.update(db_session, manual.id, {"start_time": "18:00"})
+    await ScheduleService.generate(db_session, incremental=True)
+    assert await StatsService.reconcile(db_session, fix=False) == {}
+    await ScheduleService.delete(db_session, manual.id)
+    t3 = await SchoolClassService.create(db_session, SchoolClassCreate(
+        name="T3", shift="N", semester=1, students_count=10, course_id=course.id))
+    await SchoolClassService.delete(db_session, t3.id)
+    assert await StatsService.reconcile(db_session, fix=False) == {}
+
+    stats = await DashboardService.get_stats(db_session)
+    assert stats["total_rooms"] == 2 and stats["active_classes"] == 2
+    assert stats["pending_conflicts"] == 1
+    occupancy = await DashboardService.get_occupancy_data(db_session)
+    assert [(row["name"], row["capacidade"]) for row in occupancy] == [("B", 60), ("C", 20)]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_detects_and_fixes_drift(db_session):
+    from app.commands.reconcile_stats import main
+    from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+    await RoomService.create(db_session, room_in("101", 30))
+    await DashboardService.get_stats(db_session)
+    # Escrita direta no banco, fora dos serviços: os contadores ficam para trás
+    db_session.add(Room(campus="C", building="B", block="A", floor=1, number="102", capacity=40))
+    await db_session.commit()
+
+    sessions = async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    assert await main(["--check"], sessions) == 1
+    assert await main([], sessions) == 0
+    assert await main(["--check"], sessions) == 0
+    stats = await DashboardService.get_stats(db_session)
+    assert stats["total_rooms"] == 2
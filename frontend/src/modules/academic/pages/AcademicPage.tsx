@@ -73,8 +73,8 @@ const AcademicPage: React.FC = () => {
     try {
       const [coursesData, classesData, subjectsData] = await Promise.all([
         api.get('/courses/'),
-        api.get('/classes/'),
-        api.get('/subjects/')
+        api.getAll('/classes/'),
+        api.getAll('/subjects/')
       ]);
 
       setCourses(coursesData);
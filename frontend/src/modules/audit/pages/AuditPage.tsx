@@ -45,11 +45,13 @@ const AuditPage: React.FC = () => {
   const [filterAction, setFilterAction] = useState<string>('ALL');
 
   const [logs, setLogs] = useState<AuditLog[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
-  const fetchLogs = async () => {
+  // Mais recentes primeiro, uma página por vez; "Carregar mais" segue o cursor
+  const fetchLogs = async (cursor: string | null = null) => {
     try {
-      const data = await api.get('/audit/');
-      setLogs(data.map((l: any) => ({
+      const page = await api.getPage('/audit/', cursor);
+      const data = page.items.map((l: any) => ({
         id: l.id,
         timestamp: new Date(l.timestamp).toLocaleString(),
         user: l.user,
@@ -63,7 +65,9 @@ const AuditPage: React.FC = () => {
           impact: l.impact,
           rawData: l.details || {}
         }
-      })));
+      }));
+      setLogs(prev => cursor ? [...prev, ...data] : data);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error("Erro ao buscar logs:", error);
     }
@@ -80,7 +84,7 @@ const AuditPage: React.FC = () => {
       const matchesAction = filterAction === 'ALL' || log.action === filterAction;
       return matchesUser && matchesImpact && matchesAction;
     });
-  }, [searchUser, filterImpact, filterAction]);
+  }, [logs, searchUser, filterImpact, filterAction]);
 
   const resetFilters = () => {
     setSearchUser('');
@@ -241,6 +245,16 @@ const AuditPage: React.FC = () => {
             </div>
           )}
         </div>
+        {nextCursor && (
+          <div className="p-4 border-t border-gray-100 text-center">
+            <button
+              onClick={() => fetchLogs(nextCursor)}
+              className="text-sm text-indigo-600 font-bold hover:underline"
+            >
+              Carregar mais registros ({logs.length} exibidos)
+            </button>
+          </div>
+        )}
       </div>
 
       {/* MODAL DE DETALHES DE AUDITORIA */}
@@ -25,6 +25,8 @@ interface DistributionItem {
   [key: string]: any;
 }
 
+const CONFLICT_PREVIEW = 20;
+
 const Dashboard: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [statsData, setStatsData] = useState<StatsData>({
@@ -36,20 +38,18 @@ const Dashboard: React.FC = () => {
   const [occupancyData, setOccupancyData] = useState<OccupancyItem[]>([]);
   const [pieData, setPieData] = useState<DistributionItem[]>([]);
   const [conflicts, setConflicts] = useState<any[]>([]);
+  const [loadingConflicts, setLoadingConflicts] = useState(false);
 
   const fetchData = async () => {
     setLoading(true);
     try {
-      const [stats, occupancy, distribution, alerts] = await Promise.all([
-        api.get('/dashboard/stats'),
-        api.get('/dashboard/occupancy'),
-        api.get('/dashboard/distribution'),
-        api.get('/dashboard/conflicts')
-      ]);
-      setStatsData(stats);
-      setOccupancyData(occupancy);
-      setPieData(distribution);
-      setConflicts(alerts);
+      // Os quatro painéis em uma única chamada (consultados em paralelo no backend)
+      // O resumo traz só os conflitos mais graves; o total vem em stats.pending_conflicts
+      const summary = await api.get(`/dashboard/summary?conflict_limit=${CONFLICT_PREVIEW}`);
+      setStatsData(summary.stats);
+      setOccupancyData(summary.occupancy);
+      setPieData(summary.distribution);
+      setConflicts(summary.conflicts);
     } catch (error) {
       console.error("Erro ao buscar dados do dashboard:", error);
     } finally {
@@ -57,10 +57,25 @@ const Dashboard: React.FC = () => {
     }
   };
 
+  // Sem limit, /dashboard/conflicts devolve todos os conflitos a partir do offset
+  const fetchRemainingConflicts = async () => {
+    setLoadingConflicts(true);
+    try {
+      const rest = await api.get(`/dashboard/conflicts?offset=${conflicts.length}`);
+      setConflicts(prev => [...prev, ...rest]);
+    } catch (error) {
+      console.error("Erro ao buscar conflitos:", error);
+    } finally {
+      setLoadingConflicts(false);
+    }
+  };
+
   useEffect(() => {
     fetchData();
   }, []);
 
+  const totalConflicts = Math.max(statsData.pending_conflicts || 0, conflicts.length);
+
   const stats = [
     { label: 'Total de Salas', value: (statsData.total_rooms || 0).toString(), icon: DoorOpen, color: 'bg-blue-500' },
     { label: 'Turmas Ativas', value: (statsData.active_classes || 0).toString(), icon: Users, color: 'bg-green-500' },
@@ -149,12 +164,26 @@ const Dashboard: React.FC = () => {
       {/* Alertas de Conflito */}
       <div className="bg-white p-6 rounded-xl border border-gray-100 shadow-sm">
         <div className="flex items-center justify-between mb-6">
-          <h3 className="text-lg font-bold text-gray-800">Alertas de Conflito de Ensalamento</h3>
-          <button className="text-indigo-600 hover:text-indigo-800 text-sm font-semibold transition-colors">Ver todos</button>
+          <div>
+            <h3 className="text-lg font-bold text-gray-800">Alertas de Conflito de Ensalamento</h3>
+            {totalConflicts > 0 && (
+              <p className="text-xs text-gray-500 mt-1">Exibindo {conflicts.length} de {totalConflicts} conflitos</p>
+            )}
+          </div>
+          {conflicts.length < totalConflicts && (
+            <button
+              onClick={fetchRemainingConflicts}
+              disabled={loadingConflicts}
+              className="flex items-center text-indigo-600 hover:text-indigo-800 text-sm font-semibold transition-colors disabled:opacity-50"
+            >
+              {loadingConflicts && <Loader2 className="w-4 h-4 mr-2 animate-spin" />}
+              Ver todos ({totalConflicts})
+            </button>
+          )}
         </div>
         <div className="space-y-4">
           {conflicts && conflicts.length > 0 ? conflicts.map((conflict, i) => (
-            <div key={conflict.id || i} className="flex items-center p-4 bg-red-50 border border-red-100 rounded-lg animate-in slide-in-from-left-4 duration-300" style={{ animationDelay: `${i * 100}ms` }}>
+            <div key={conflict.id || i} className="flex items-center p-4 bg-red-50 border border-red-100 rounded-lg animate-in slide-in-from-left-4 duration-300" style={{ animationDelay: `${Math.min(i, CONFLICT_PREVIEW) * 100}ms` }}>
               <AlertTriangle className="text-red-500 mr-4 shrink-0" size={20} />
               <div className="flex-1">
                 <p className="text-sm font-bold text-red-800">
@@ -26,7 +26,7 @@ const RoomsPage: React.FC = () => {
 
   const fetchRooms = async () => {
     try {
-      const data = await api.get('/rooms/');
+      const data = await api.getAll('/rooms/');
       // Mapeamento de is_active (backend) para isActive (frontend)
       const mappedRooms = data.map((room: any) => ({
         ...room,
@@ -47,7 +47,7 @@ const RoomsPage: React.FC = () => {
 
   const fetchOccupancy = async () => {
     try {
-      const schedules = await api.get('/schedules/');
+      const schedules = await api.getAll('/schedules/');
       const map: Record<string, number> = {};
       schedules.forEach((s: any) => {
         // Usar room_id se disponível, ou s.room.id
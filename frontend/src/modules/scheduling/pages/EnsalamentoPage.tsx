@@ -58,7 +58,7 @@ const EnsalamentoPage: React.FC = () => {
   useEffect(() => {
     const loadRooms = async () => {
       try {
-        const data = await api.get('/rooms/');
+        const data = await api.getAll('/rooms/');
         setRooms(data.filter((r: any) => r.is_active));
       } catch (error) {
         console.error("Erro ao carregar salas:", error);
@@ -79,7 +79,7 @@ const EnsalamentoPage: React.FC = () => {
 
   const fetchProposals = async () => {
     try {
-      const data = await api.get('/schedules/');
+      const data = await api.getAll('/schedules/');
       // 1. Calcular ocupação TOTAL de cada sala ANTES de mapear
       const usageMap: Record<string, number> = {};
       data.forEach((s: any) => {
@@ -159,7 +159,15 @@ const EnsalamentoPage: React.FC = () => {
   const handleStartProcess = async () => {
     setIsProcessing(true);
     try {
-      await api.post('/schedules/auto-generate', {});
+      // Ensalamento roda como job no backend; acompanhar até terminar
+      let job = await api.post('/schedules/auto-generate', {});
+      while (job.state === 'queued' || job.state === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        job = await api.get(`/schedules/jobs/${job.id}`);
+      }
+      if (job.state === 'failed') {
+        throw new Error(job.error || 'Falha no ensalamento');
+      }
       await fetchProposals();
     } catch (error) {
       alert("Erro ao processar ensalamento.");
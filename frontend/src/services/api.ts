@@ -10,6 +10,31 @@ export const api = {
         return response.json();
     },
 
+    // Uma página de listagem paginada por cursor; o cursor da seguinte vem em X-Next-Cursor
+    async getPage(endpoint: string, cursor?: string | null, limit = 100): Promise<{ items: any[]; nextCursor: string | null }> {
+        const params = new URLSearchParams({ limit: String(limit) });
+        if (cursor) params.set('cursor', cursor);
+        const separator = endpoint.includes('?') ? '&' : '?';
+        const response = await fetch(`${API_URL}${endpoint}${separator}${params}`);
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.detail || 'API request failed');
+        }
+        return { items: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') || null };
+    },
+
+    // Todas as páginas de uma listagem, seguindo o cursor (para telas que precisam da lista inteira)
+    async getAll(endpoint: string): Promise<any[]> {
+        const items: any[] = [];
+        let cursor: string | null = null;
+        do {
+            const page: { items: any[]; nextCursor: string | null } = await api.getPage(endpoint, cursor, 500);
+            items.push(...page.items);
+            cursor = page.nextCursor;
+        } while (cursor);
+        return items;
+    },
+
     async post(endpoint: string, data: any) {
         const response = await fetch(`${API_URL}${endpoint}`, {
             method: 'POST',